@@ -0,0 +1,40 @@
+"""
+Benchmark of checking a cheap property whose test data is expensive
+to generate in pure Python, in the main process and in worker processes.
+
+Usage::
+
+    $ python benchmarks/generator_processes.py [count]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyqcy import qc, regex, list_, str_
+
+
+def cheap_check(emails=list_(of=regex(r'[a-z0-9\.\+]{1,32}@[a-z]{1,16}'
+                                      r'(\.[a-z]{2,8}){1,3}'),
+                             min_length=50, max_length=200),
+                blob=str_(min_length=1 << 16, max_length=1 << 17)):
+    assert all('@' in e for e in emails)
+
+
+def main(count=200):
+    print "%-12s %12s %12s" % ("processes", "ms per case", "exec. waited")
+    for processes in (None, 2, 4):
+        prop = qc(processes=processes)(cheap_check)
+        results = []
+        seconds = min(timeit.repeat(
+            lambda: results.append(prop.check(count, seed=0)),
+            number=1, repeat=3))
+        blocked = results[-1].execution_blocked
+        print "%-12s %12.3f %12s" % (
+            processes or '-', seconds / count * 1e3,
+            '-' if blocked is None else '%.2fs' % blocked)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
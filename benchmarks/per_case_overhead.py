@@ -0,0 +1,79 @@
+"""
+Benchmark of the overhead that pyqcy adds to every test case,
+measured on properties which do (almost) nothing themselves.
+
+Usage::
+
+    $ python benchmarks/per_case_overhead.py [count]
+
+Microseconds per case on a single (rather noisy) CPU, best of runs
+interleaved with those of ec86f41 - the last revision which didn't seed
+the random number generator for test cases:
+
+    ====================  =======  =====
+    property              ec86f41  now
+    ====================  =======  =====
+    no_arguments          3.2      2.8
+    constant_arguments    6.4      2.9
+    int_arguments         7.5      7.1
+    yielding_tags         7.5      7.2
+    (bare generation)     2.7      1.5
+    ====================  =======  =====
+
+Seeding the generator takes about 6 us, which is why it's seeded
+for every block of :data:`~pyqcy.properties.SEEDING_BLOCK` test cases
+rather than for every one of them.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyqcy import qc, int_, collect
+
+
+@qc
+def no_arguments():
+    pass
+
+
+@qc
+def constant_arguments(x=1, y='foo'):
+    pass
+
+
+@qc
+def int_arguments(x=int_(min=0, max=1000), y=int_(min=0, max=1000)):
+    pass
+
+
+@qc
+def yielding_tags(x=int_(min=0, max=1000)):
+    yield collect(x % 2)
+
+
+def bare_generation(count):
+    """Generates the same values as ``int_arguments`` without pyqcy,
+    for comparison.
+    """
+    x, y = int_(min=0, max=1000), int_(min=0, max=1000)
+    for _ in xrange(count):
+        next(x), next(y)
+
+
+def main(count=100000):
+    print "%-20s %12s" % ("property", "us per case")
+    for prop in (no_arguments, constant_arguments, int_arguments,
+                 yielding_tags):
+        seconds = min(timeit.repeat(lambda: prop.check(count, seed=0),
+                                    number=1, repeat=3))
+        print "%-20s %12.2f" % (prop.func.__name__, seconds / count * 1e6)
+
+    seconds = min(timeit.repeat(lambda: bare_generation(count),
+                                number=1, repeat=3))
+    print "%-20s %12.2f" % ("(bare generation)", seconds / count * 1e6)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,45 @@
+"""
+Benchmark of checking a property with prefetched test data,
+where generating the data and checking it both release the GIL
+(simulated by sleeping) and take similar time.
+
+Usage::
+
+    $ python benchmarks/prefetching.py [count] [milliseconds]
+"""
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyqcy import qc, int_, map_
+
+
+def slow_property(delay):
+    def slow_check(x=map_(int_(), lambda x: time.sleep(delay) or x)):
+        time.sleep(delay)
+    return slow_check
+
+
+def main(count=500, milliseconds=2):
+    func = slow_property(milliseconds / 1000.0)
+    print "%-12s %12s %12s %12s" % ("prefetch", "ms per case",
+                                    "gen. waited", "exec. waited")
+    for prefetch in (None, 1, 4, 16):
+        prop = qc(prefetch=prefetch)(func)
+        results = []
+        seconds = min(timeit.repeat(
+            lambda: results.append(prop.check(count, seed=0)),
+            number=1, repeat=3))
+        generation = results[-1].generation_blocked
+        execution = results[-1].execution_blocked
+        print "%-12s %12.3f %12s %12s" % (
+            prefetch or '-', seconds / count * 1e3,
+            '-' if generation is None else '%.2fs' % generation,
+            '-' if execution is None else '%.2fs' % execution)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -9,9 +9,13 @@ __license__ = "Simplified BSD"
 
 
 from .arbitraries import *
+from .fixtures import *
 from .properties import *
 from .results import *
 from .statistics import *
 
+from .cache import *
+from .progress import *
+from .reporters import *
 from .integration import *
 from .runner import *
@@ -0,0 +1,253 @@
+"""
+Command line test runner, discovering properties
+within given modules, packages or directories::
+
+    $ python -m pyqcy tests/
+    $ python -m pyqcy --shard 2/4 --durations durations.json myproject.tests
+
+It can also check properties in a distributed manner, using one
+coordinator and any number of workers::
+
+    $ python -m pyqcy --coordinator :4242 tests/
+    $ python -m pyqcy --worker coordinator.example.com:4242 tests/
+"""
+import json
+import optparse
+import os
+import sys
+
+from pyqcy.cache import ResultCache
+from pyqcy.discovery import discover, shard
+from pyqcy.distributed import Coordinator, work
+from pyqcy.progress import ProgressMonitor
+from pyqcy.reporters import JSONReporter, JUnitReporter, Reporter
+from pyqcy.runner import report_results, run_tests
+
+
+def parse_args(argv):
+    """Parses command line arguments.
+    :return: Tuple of (options, targets)
+    """
+    parser = optparse.OptionParser(
+        usage="python -m pyqcy [options] [module|package|path ...]")
+    parser.add_option('-v', '--verbose', action='store_const', const=2,
+                      dest='verbosity', default=1,
+                      help="print statistics for passing properties")
+    parser.add_option('-q', '--quiet', action='store_const', const=0,
+                      dest='verbosity', help="print nothing")
+    parser.add_option('-f', '--failfast', action='store_true',
+                      help="stop on the first failing property")
+    parser.add_option('-p', '--pattern', default='test*',
+                      help="pattern for names of modules to look for "
+                           "in directories (default: %default)")
+    parser.add_option('-l', '--list', action='store_true',
+                      help="only list the properties that would be checked")
+    parser.add_option('--shard', metavar='I/N',
+                      help="check only the I-th of N shards of properties")
+    parser.add_option('--durations', metavar='FILE', action='append',
+                      default=[],
+                      help="JSON file with durations of properties, used to "
+                           "balance the shards (can be given multiple times)")
+    parser.add_option('--record-durations', metavar='FILE',
+                      help="write durations of checked properties "
+                           "to given JSON file")
+    parser.add_option('--cache', metavar='FILE',
+                      help="skip properties which have passed before "
+                           "according to given cache file")
+    parser.add_option('--cache-mode', choices=['skip', 'reduce'],
+                      default='skip',
+                      help="what to do with cached properties: "
+                           "skip or reduce (default: %default)")
+    parser.add_option('--cache-salt', default='',
+                      help="identifier of the code under test, "
+                           "e.g. a VCS revision (required to skip "
+                           "properties)")
+    parser.add_option('--json', metavar='FILE',
+                      help="write results of properties to given file "
+                           "as JSON lines, as soon as they are checked")
+    parser.add_option('--junit-xml', metavar='FILE',
+                      help="write results of properties to given file "
+                           "in JUnit XML format")
+    parser.add_option('--progress', metavar='SECONDS', type='float',
+                      help="print progress of the property being checked "
+                           "to standard error every SECONDS")
+    parser.add_option('--metrics', metavar='FILE',
+                      help="periodically write metrics of the run to given "
+                           "file, in the text format of Prometheus")
+    parser.add_option('--coordinator', metavar='[HOST]:PORT',
+                      help="hand out test cases to workers connecting "
+                           "to given address")
+    parser.add_option('--worker', metavar='HOST:PORT',
+                      help="check test cases handed out by the coordinator "
+                           "at given address")
+    parser.add_option('--seed', type='int',
+                      help="seed for test data in distributed mode")
+    parser.add_option('--replay', metavar='PROPERTY=TOKEN',
+                      help="execute only the single test case of given "
+                           "property with given replay token, as printed "
+                           "for a failure")
+    parser.add_option('--unit-size', type='int', default=1000,
+                      help="number of test cases in a single unit of work "
+                           "in distributed mode (default: %default)")
+
+    options, targets = parser.parse_args(argv)
+    if options.coordinator and options.worker:
+        parser.error("cannot be both a coordinator and a worker")
+    for opt in ('coordinator', 'worker'):
+        address = getattr(options, opt)
+        if address:
+            host, _, port = address.rpartition(':')
+            if not port.isdigit():
+                parser.error("invalid address: %s" % address)
+            setattr(options, opt, (host, int(port)))
+    if options.replay:
+        name, _, token = options.replay.partition('=')
+        if not (name and token):
+            parser.error("invalid replay: %s" % options.replay)
+        options.replay = (name, token)
+    # (checked here too, to report it as an error of the options)
+    if (options.cache and options.cache_mode == 'skip'
+            and not options.cache_salt):
+        parser.error("--cache-salt is required to skip cached properties")
+    if options.progress is not None and not options.progress > 0:
+        parser.error("progress interval must be positive")
+    if options.shard:
+        try:
+            index, count = map(int, options.shard.split('/'))
+            if not (1 <= index <= count):
+                raise ValueError()
+        except ValueError:
+            parser.error("invalid shard: %s" % options.shard)
+        options.shard = (index, count)
+    return options, targets
+
+
+def load_durations(filenames):
+    """Loads and merges durations of properties from given JSON files."""
+    durations = {}
+    for filename in filenames:
+        if os.path.exists(filename):
+            with open(filename) as f:
+                durations.update(json.load(f))
+    return durations
+
+
+def main(argv=None):
+    """Entry point of the command line test runner.
+    :return: Exit code
+    """
+    options, targets = parse_args(sys.argv[1:] if argv is None else argv)
+
+    props = discover(*targets, pattern=options.pattern)
+    if options.shard:
+        index, count = options.shard
+        props = shard(props, index, count,
+                      durations=load_durations(options.durations))
+
+    if options.list:
+        for name, _ in props:
+            print name
+        return 0
+    if options.replay:
+        return replay(props, *options.replay)
+
+    if not (options.progress or options.metrics):
+        return run(options, props)
+    with ProgressMonitor(interval=options.progress or 10,
+                         stream=sys.stderr if options.progress else None,
+                         metrics_file=options.metrics):
+        return run(options, props)
+
+
+def replay(props, name, token):
+    """Executes a single test case of the property with given name
+    (or the last part of it), identified by its replay token.
+    :return: Exit code
+    """
+    matching = [(n, p) for n, p in props
+                if n == name or n.endswith('.' + name)]
+    if len(matching) != 1:
+        print >>sys.stderr, "%s property: %s" % (
+            "Ambiguous" if matching else "Unknown", name)
+        return 2
+
+    _, prop = matching[0]
+    try:
+        result = prop.replay(token)
+    except ValueError as e:
+        print >>sys.stderr, e
+        return 2
+    if not report_results(prop, [result], verbosity=1):
+        return 1
+    print "%s: passed the replayed test case." % prop.func.__name__
+    return 0
+
+
+def run(options, props):
+    """Checks given properties, as a worker of distributed checking,
+    or reporting their results.
+    :return: Exit code
+    """
+    if options.worker:
+        work(options.worker, props)
+        return 0
+
+    reporters = []
+    if options.json:
+        reporters.append(JSONReporter(options.json))
+    if options.junit_xml:
+        reporters.append(JUnitReporter(options.junit_xml))
+    try:
+        return check(options, props, reporters)
+    finally:
+        for reporter in reporters:
+            reporter.close()
+
+
+def check(options, props, reporters):
+    """Checks given properties, either locally or as a coordinator
+    of distributed checking.
+    :return: Exit code
+    """
+    if options.coordinator:
+        coordinator = Coordinator(props, options.coordinator,
+                                  seed=options.seed,
+                                  unit_size=options.unit_size)
+        print >>sys.stderr, "Coordinator listening on %s:%s (seed: %s)" % (
+            coordinator.address + (coordinator.seed,))
+        success = coordinator.run(verbosity=options.verbosity,
+                                  reporters=reporters)
+        return 0 if success else 1
+
+    cache = None
+    if options.cache:
+        cache = ResultCache(options.cache, mode=options.cache_mode,
+                            salt=options.cache_salt)
+
+    # (a single run, so that the cache is saved just once)
+    durations = _DurationsRecorder(props)
+    success = run_tests([prop for _, prop in props],
+                        verbosity=options.verbosity, failfast=options.failfast,
+                        cache=cache, reporters=reporters + [durations])
+
+    if options.record_durations:
+        with open(options.record_durations, 'w') as f:
+            json.dump(durations.durations, f, indent=1, sort_keys=True)
+
+    return 0 if success else 1
+
+
+class _DurationsRecorder(Reporter):
+    """Reporter recording durations of checked properties,
+    by the names they have been discovered under.
+    """
+    def __init__(self, props):
+        self.names = dict((id(prop), name) for name, prop in props)
+        self.durations = {}
+
+    def report(self, prop, results, duration):
+        self.durations[self.names[id(prop)]] = duration
+
+
+if __name__ == '__main__':
+    sys.exit(main())
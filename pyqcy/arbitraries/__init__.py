@@ -1,6 +1,7 @@
 """
 Generators of arbitrary values.
 """
+import atexit
 import functools
 import inspect
 
@@ -14,6 +15,10 @@ class arbitrary(object):
     of given type.
 
     :param type_: Type of values generated by the function
+    :param functions: Names of arguments of the function which are
+                      functions themselves, and should be passed as they
+                      are - rather than turned into generators of values,
+                      like other arguments that can be (e.g. ``str``)
 
     The ``type_`` argument is optional. If provided,
     objects returned by the function will be checked against
@@ -36,11 +41,23 @@ class arbitrary(object):
     # generators of arbitrary values for those types
     registry = {}
 
-    def __init__(self, type_=None):
+    # Code objects of functions that wrap the decorated ones
+    wrapper_codes = set()
+
+    # Dictionary mapping decorated functions into functions
+    # which enumerate all values they can produce
+    enumerators = {}
+
+    # Dictionary mapping decorated functions into functions
+    # which return their boundary values
+    boundaries = {}
+
+    def __init__(self, type_=None, functions=()):
         if type_ is not None and not isinstance(type_, type):
             raise TypeError("%r (a `%s`) is not a type" % (
                 type_, type(type_).__name__))
         self.type_ = type_
+        self.functions = frozenset(functions)
 
     def __call__(self, func):
         """Applies the @arbitrary decorator to given function.
@@ -49,62 +66,83 @@ class arbitrary(object):
         the resulting generator will be remembered in global registry
         for easy reference.
         """
-        if self.type_ is None:
-            gen_func = self.__arbitrary_generator(func)
-        else:
-            def validate(value):
-                if not isinstance(value, self.type_):
-                    raise TypeError(
-                        "arbitrary value %r is of type %s; expected %s" % (
-                            value, type(value).__name__, self.type_.__name__))
-                return value
-
-            gen_func = self.__arbitrary_generator(func, validate)
+        gen_func = self.__arbitrary_generator(func)
+        if self.type_ is not None:
             self.registry.setdefault(self.type_, [])
             self.registry[self.type_].append(gen_func)
 
         gen_func._arbitrary = True  # marker attribute
+        gen_func._arbitrary_func = func
         return gen_func
 
-    def __arbitrary_generator(self, gen, value_func=None):
+    def __arbitrary_generator(self, gen):
         """Constructs arbitrary generator based on given object.
 
         It can be a function that returns a single value,
         a generator function (that uses ``yield``) or a generator class
         (with ``__iter__`` and ``next`` methods).
-        """
-        if value_func is None:
-            value_func = lambda v: v  # identity function
 
+        If ``type_`` has been given, the values are checked against it.
+        """
+        type_ = self.type_
+        validate = self.__validate
+        positions = frozenset()     # of the functions among arguments
+        if self.functions:
+            arg_names = inspect.getargspec(gen).args
+            positions = frozenset(i for i, name in enumerate(arg_names)
+                                  if name in self.functions)
+
+        # (original arguments are kept intact, for arbitrary_origin(),
+        # and values are checked inline, as that's done for every one)
         if inspect.isgeneratorfunction(gen) or inspect.isclass(gen):
             @functools.wraps(gen)
             def wrapper(*args, **kwargs):
-                args, kwargs = self.__coerce_to_arbitraries(args, kwargs)
-                for obj in gen(*args, **kwargs):
-                    yield value_func(obj)
+                args_, kwargs_ = self.__coerce_to_arbitraries(args, kwargs,
+                                                              positions)
+                for obj in gen(*args_, **kwargs_):
+                    if type_ is not None and not isinstance(obj, type_):
+                        validate(obj)
+                    yield obj
         else:
             @functools.wraps(gen)
             def wrapper(*args, **kwargs):
-                args, kwargs = self.__coerce_to_arbitraries(args, kwargs)
+                args_, kwargs_ = self.__coerce_to_arbitraries(args, kwargs,
+                                                              positions)
                 while True:
-                    yield value_func(gen(*args, **kwargs))
+                    obj = gen(*args_, **kwargs_)
+                    if type_ is not None and not isinstance(obj, type_):
+                        validate(obj)
+                    yield obj
 
+        self.wrapper_codes.add(wrapper.func_code)
         return wrapper
 
-    def __coerce_to_arbitraries(self, args=None, kwargs=None):
+    def __validate(self, value):
+        """Raises :exc:`TypeError` if given value is not of the type
+        of values generated by the function.
+        """
+        if not isinstance(value, self.type_):
+            raise TypeError(
+                "arbitrary value %r is of type %s; expected %s" % (
+                    value, type(value).__name__, self.type_.__name__))
+
+    def __coerce_to_arbitraries(self, args=None, kwargs=None,
+                                positions=frozenset()):
         """Ensures given list and dictionary of positional and keyword
         arguments contains appropriate arbitrary values' generators.
 
         Elements that cannot be reasonably coerced into arbitraries
-        are left unchanged.
+        are left unchanged, and so are the :attr:`functions`
+        (at given ``positions``, if passed as positional arguments).
 
         Returns a tuple of (args, kwargs) with coerced arguments.
         """
         args = args or []
         kwargs = kwargs or {}
-        args = [to_arbitrary(arg) if is_arbitrary(arg) else arg
-                for arg in args]
-        kwargs = dict((k, to_arbitrary(v) if is_arbitrary(v) else v)
+        args = [to_arbitrary(arg) if is_arbitrary(arg) and i not in positions
+                else arg for i, arg in enumerate(args)]
+        kwargs = dict((k, to_arbitrary(v) if is_arbitrary(v)
+                       and k not in self.functions else v)
                       for (k, v) in kwargs.iteritems())
         return args, kwargs
 
@@ -126,6 +164,25 @@ def is_arbitrary(obj):
     return False
 
 
+def arbitrary_origin(gen):
+    """Returns the function which has created given generator
+    of arbitrary values, along with arguments that were passed to it.
+
+    :param gen: Generator of arbitrary values
+    :return: Tuple of (function, args, kwargs), or ``None``
+             if ``gen`` has not been created by a function decorated
+             with :func:`arbitrary`. Note that ``function`` can also be
+             a generator function or class, depending on what was decorated.
+    """
+    if not inspect.isgenerator(gen):
+        return None
+    if gen.gi_code not in arbitrary.wrapper_codes or gen.gi_frame is None:
+        return None
+
+    frame_locals = gen.gi_frame.f_locals
+    return frame_locals['gen'], frame_locals['args'], frame_locals['kwargs']
+
+
 def to_arbitrary(obj):
     """Ensures that given object is a generator of arbitrary values.
 
@@ -161,8 +218,177 @@ def to_arbitrary(obj):
             obj, type(obj).__name__))
 
 
+# Sizing of generated values
+
+#: Size of generated values at the end of a test run.
+#: Generators which support sizing span the full range
+#: of their parameters only when given this size.
+MAX_SIZE = 100
+
+
+class GenerationError(Exception):
+    """Exception raised when test data cannot be generated,
+    e.g. because a filter rejects too many values.
+    """
+
+
+class _Generation(object):
+    """State of test data generation, shared by all generators."""
+    size = None     # values are not sized outside of test runs
+    discards = 0    # number of values rejected by filters so far
+    cleanups = None # functions releasing resources of generated values
+
+_generation = _Generation()
+
+
+def current_size():
+    """Returns the size of values that generators should currently produce,
+    as a number between 0 and :data:`MAX_SIZE`.
+
+    If values are currently not sized (e.g. because generators are invoked
+    outside of a test run), ``None`` is returned.
+    """
+    return _generation.size
+
+
+class sized(object):
+    """Context manager which makes generators produce values
+    of given size within its block.
+
+    :param size: Size of values, between 0 and :data:`MAX_SIZE`,
+                 or ``None`` to turn off sizing
+    """
+    # (a class rather than @contextmanager, since it's entered
+    # for every test case and this is a few times faster)
+    __slots__ = ['size', 'previous']
+
+    def __init__(self, size):
+        if size is not None and not (0 <= size <= MAX_SIZE):
+            raise ValueError("size must be between 0 and %s" % MAX_SIZE)
+        self.size = size
+
+    def __enter__(self):
+        self.previous, _generation.size = _generation.size, self.size
+
+    def __exit__(self, *exc_info):
+        _generation.size = self.previous
+
+
+def discard(count=1):
+    """Records that a generated value (or given number of them)
+    has been discarded, e.g. because it didn't satisfy a filter.
+    """
+    _generation.discards += count
+
+
+def discard_count():
+    """Returns the number of generated values discarded so far."""
+    return _generation.discards
+
+
+def on_cleanup(func):
+    """Registers a function which releases resources held by the value
+    being generated (like a temporary file), to be called once the test
+    case it's generated for has been executed.
+
+    Outside of test runs, the function is called when the program exits.
+    """
+    if _generation.cleanups is None:
+        atexit.register(func)
+    else:
+        _generation.cleanups.append(func)
+
+
+class collect_cleanups(object):
+    """Context manager which collects functions registered
+    through :func:`on_cleanup` within its block
+    into the list it returns.
+    """
+    __slots__ = ['previous']
+
+    def __enter__(self):
+        self.previous, _generation.cleanups = _generation.cleanups, []
+        return _generation.cleanups
+
+    def __exit__(self, *exc_info):
+        _generation.cleanups = self.previous
+
+
+class generating_cases(object):
+    """Context manager for generating test data of test cases one by one,
+    cheaper than entering :class:`sized` and :class:`collect_cleanups`
+    for every one of them.
+
+    Within its block, the function it returns starts every test case:
+    it makes generators produce values of given size (or unsized,
+    if it's ``None``), and returns the list which functions registered
+    through :func:`on_cleanup` are then collected into.
+    """
+    __slots__ = ['previous']
+
+    def __enter__(self):
+        self.previous = _generation.size, _generation.cleanups
+        _generation.cleanups = []
+        return _start_case
+
+    def __exit__(self, *exc_info):
+        _generation.size, _generation.cleanups = self.previous
+
+
+def _start_case(size):
+    _generation.size = size
+    # (the list is only replaced if the previous test case has kept it)
+    if _generation.cleanups:
+        _generation.cleanups = []
+    return _generation.cleanups
+
+
+def sized_length(min_length, max_length):
+    """Returns the maximum length of a collection that should be generated
+    at current size. It grows linearly from ``min_length`` at size 0
+    to ``max_length`` at :data:`MAX_SIZE`.
+    """
+    size = _generation.size
+    if size is None:
+        return max_length
+    return min_length + (max_length - min_length) * size // MAX_SIZE
+
+
+def sized_range(lower, upper):
+    """Returns a subrange of ``[lower, upper]`` that numbers generated
+    at current size should come from.
+
+    The subrange is centered on the value closest to zero and grows
+    exponentially with size, so that it contains only small numbers at first
+    and covers the whole ``[lower, upper]`` range at :data:`MAX_SIZE`.
+
+    :return: Tuple of (lower, upper) bounds of the subrange
+    """
+    size = _generation.size
+    if size is None or size == MAX_SIZE:
+        return lower, upper
+
+    # (this is called for every generated number, so it avoids
+    # any conversions and calls that aren't strictly necessary)
+    center = lower if lower > 0 else upper if upper < 0 else 0
+    limit = (float(upper - lower) + 1) ** (size * _SIZE_EXPONENT)
+    limit = type(lower)(limit if limit > size else size)
+    lower_limit, upper_limit = center - limit, center + limit
+    return (lower if lower > lower_limit else lower_limit,
+            upper if upper < upper_limit else upper_limit)
+
+
+_SIZE_EXPONENT = 1.0 / MAX_SIZE
+
+
+from .enumeration import *
+from .boundaries import *
+
 from .numbers import *
 from .strings import *
+from .binary import *
+from .files import *
 from .collections import *
 
 from .combinators import *
+from .batches import *
@@ -0,0 +1,189 @@
+"""
+Columnar generation of many records at once, for testing vectorised code.
+"""
+from __future__ import absolute_import
+
+from array import array
+import inspect
+import itertools
+import random
+import struct
+import sys
+
+from collections import Mapping
+try:
+    from collections import OrderedDict
+except ImportError:
+    OrderedDict = dict  # fallback for Python 2.6
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pyqcy.arbitraries import (arbitrary, arbitrary_origin, is_arbitrary,
+                               to_arbitrary, sized_range)
+from pyqcy.arbitraries.collections import tuple_
+from pyqcy.arbitraries.numbers import (int_, float_, _ordinal,
+                                       _special_values)
+
+
+__all__ = ['columns']
+
+
+def columns(schema, rows, numpy=False):
+    """Generator that outputs batches of records in columnar form:
+    one sequence of values per field, rather than one object per record.
+
+    :param schema: Fields of the records. This can be a :func:`tuple_`
+                   generator, or a flat list, tuple or dictionary
+                   of generators and immediate values - like those
+                   passed to :func:`data`.
+    :param rows: Number of records in every batch
+    :param numpy: Whether numeric fields should be NumPy arrays
+                  rather than :class:`array.array`\ s.
+                  Requires NumPy to be installed.
+
+    Batches are tuples of columns, or dictionaries mapping field names
+    to columns if ``schema`` is a dictionary. Fields generated by
+    :func:`int_` and :func:`float_` (including ``int`` and ``float``)
+    become arrays that are filled directly, without creating objects
+    for individual records; all other fields become lists.
+
+    Example::
+
+        @qc
+        def mean_is_within_range(
+            batch=columns({'id': int_(min=0), 'price': float_(min=0)},
+                          rows=100000, numpy=True)
+        ):
+            prices = batch['price']
+            assert prices.min() <= prices.mean() <= prices.max()
+
+    As with other generators, values in a batch are sized.
+    """
+    if rows < 0:
+        raise ValueError("number of rows must not be negative")
+    if numpy and np is None:
+        raise ImportError("NumPy is required for numpy=True")
+
+    if isinstance(schema, Mapping):
+        keys = list(schema.keys())
+        fields = [schema[k] for k in keys]
+    else:
+        keys = None
+        fields = _tuple_fields(schema)
+
+    @arbitrary
+    def generator():
+        cols = [_column(field, rows, numpy) for field in fields]
+        if keys is None:
+            return tuple(cols)
+        res = OrderedDict() if isinstance(schema, OrderedDict) else dict()
+        res.update(zip(keys, cols))
+        return res
+    return generator
+
+
+def _tuple_fields(schema):
+    """Returns the list of fields for a non-dictionary schema,
+    which can also be given as a :func:`tuple_` generator.
+    """
+    origin = arbitrary_origin(schema)
+    if origin is None:
+        if inspect.isgenerator(schema) or not isinstance(schema,
+                                                         (list, tuple)):
+            raise TypeError("schema must be a tuple_() generator, "
+                            "or a flat list, tuple or dictionary")
+        return list(schema)
+
+    func, args, kwargs = origin
+    if func is not tuple_._arbitrary_func:
+        raise TypeError("schema must be a tuple_() generator, "
+                        "or a flat list, tuple or dictionary")
+    n = kwargs.get('n')
+    if n is None:
+        return list(args)
+    return [kwargs.get('of') or args[0]] * n
+
+
+def _column(field, rows, use_numpy):
+    """Generates a column of given number of values for a single field."""
+    if not is_arbitrary(field):
+        return [field] * rows
+
+    gen = to_arbitrary(field)
+    origin = arbitrary_origin(gen)
+    if origin is not None:
+        func, args, kwargs = origin
+        if func in (int_._arbitrary_func, float_._arbitrary_func):
+            callargs = inspect.getcallargs(func, *args, **kwargs)
+            if func is int_._arbitrary_func:
+                lower, upper = sized_range(callargs['min'], callargs['max'])
+                return _int_column(lower, upper, rows, use_numpy)
+            return _float_column(rows, use_numpy, **callargs)
+
+    return list(itertools.islice(gen, rows))
+
+
+def _int_column(lower, upper, rows, use_numpy):
+    """Generates a column of integers from the ``[lower, upper]`` range."""
+    if use_numpy:
+        state = np.random.RandomState(random.getrandbits(32))
+        if lower == -sys.maxint - 1 and upper == sys.maxint:
+            # (whole range of int64, which doesn't fit
+            # as an upper bound of RandomState.randint)
+            return np.frombuffer(state.bytes(8 * rows),
+                                 dtype=np.int64).copy()
+        if upper < sys.maxint:
+            return state.randint(lower, upper + 1, size=rows,
+                                 dtype=np.int64)
+        return state.randint(lower - 1, upper, size=rows,
+                             dtype=np.int64) + 1
+
+    if lower < -sys.maxint - 1 or upper > sys.maxint:
+        return [random.randint(lower, upper) for _ in xrange(rows)]
+
+    extent = upper - lower + 1
+    if extent <= 2 ** 32:
+        # (scaling a random float is a lot faster than randint(),
+        # and its bias is negligible for ranges of this size)
+        rand = random.random
+        return array('l', [lower + int(rand() * extent)
+                           for _ in xrange(rows)])
+    randint = random.randint
+    return array('l', [randint(lower, upper) for _ in xrange(rows)])
+
+
+def _float_column(rows, use_numpy, min, max, special, nan, infinity):
+    """Generates a column of floats with the same distribution
+    as values generated by :func:`float_`.
+    """
+    lower, upper = _ordinal(min), _ordinal(max)
+    specials = _special_values(min, max, nan, infinity)
+
+    # (floats are drawn as their ordinals, turned into bit patterns
+    # of IEEE 754 doubles, and reinterpreted as floats all at once)
+    if use_numpy:
+        state = np.random.RandomState(random.getrandbits(32))
+        ordinals = state.randint(lower, upper + 1, size=rows, dtype=np.int64)
+        bits = np.where(ordinals < 0, -ordinals | np.int64(_SIGN), ordinals)
+        column = bits.view(np.float64)
+        if special:
+            replaced = state.random_sample(rows) < special
+            column[replaced] = state.choice(specials, replaced.sum())
+        return column
+
+    randint = random.randint
+    bits = [o if o >= 0 else -o | _SIGN
+            for o in (randint(lower, upper) for _ in xrange(rows))]
+    column = array('d', struct.pack('%dq' % rows, *bits))
+    if special:
+        rand, choice = random.random, random.choice
+        for i in xrange(rows):
+            if rand() < special:
+                column[i] = choice(specials)
+    return column
+
+
+_SIGN = -0x8000000000000000     # sign bit of an int64
@@ -0,0 +1,143 @@
+"""
+Generators of arbitrary binary data (bytes, byte arrays and buffers).
+"""
+import binascii
+import random
+import string
+
+from pyqcy.arbitraries import arbitrary, is_arbitrary, sized_length
+from pyqcy.arbitraries.boundaries import has_boundaries
+from pyqcy.arbitraries.enumeration import enumerable
+from pyqcy.arbitraries.strings import _enumerate_strings, _string_boundaries
+
+
+__all__ = ['bytes_', 'bytearray_', 'memoryview_']
+
+
+@arbitrary(bytes)
+def bytes_(of=None, min_length=0, max_length=1024):
+    """Generator for arbitrary binary strings (``bytes``).
+
+    Unlike :func:`str_`, the bytes are not generated one by one,
+    but all at once from the random number generator,
+    so that payloads of many megabytes are quick to obtain.
+    The length is sized just like for :func:`str_`.
+
+    :param of: Bytes that can occur in generated strings: either
+               a string, or an iterable of bytes or their values.
+               If omitted, all 256 possible bytes can be used.
+    :param min_length: A minimum length of strings to generate
+    :param max_length: A maximum length of strings to generate
+    """
+    length = random.randint(min_length, sized_length(min_length, max_length))
+    return _random_bytes(length, of)
+
+
+@enumerable(bytes_)
+def _enumerate_bytes(of=None, min_length=0, max_length=1024):
+    return _enumerate_strings(of, min_length, max_length, 256, chr, '')
+
+
+@has_boundaries(bytes_)
+def _bytes_boundaries(of=None, min_length=0, max_length=1024):
+    return _string_boundaries(of, min_length, max_length, 255, chr, '')
+
+
+@arbitrary(bytearray)
+def bytearray_(of=None, min_length=0, max_length=1024):
+    """Generator for arbitrary, mutable byte arrays.
+
+    Parameters are the same as for :func:`bytes_`.
+    """
+    length = random.randint(min_length, sized_length(min_length, max_length))
+    return bytearray(_random_bytes(length, of))
+
+
+@enumerable(bytearray_)
+def _enumerate_bytearrays(of=None, min_length=0, max_length=1024):
+    enum = _enumerate_bytes(of, min_length, max_length)
+    return enum and enum.map(bytearray)
+
+
+@has_boundaries(bytearray_)
+def _bytearray_boundaries(of=None, min_length=0, max_length=1024):
+    values = _bytes_boundaries(of, min_length, max_length)
+    return values and map(bytearray, values)
+
+
+@arbitrary(memoryview)
+def memoryview_(of=None, min_length=0, max_length=1024, writable=False):
+    """Generator for arbitrary ``memoryview`` objects,
+    for feeding binary data to code without copying it.
+
+    Views are slices of a slightly larger buffer, so they don't
+    necessarily start at the beginning of the underlying memory;
+    this catches code which makes assumptions about its input
+    that only hold for whole ``bytes`` objects.
+
+    :param writable: Whether the views should be writable,
+                     i.e. backed by a :class:`bytearray`
+                     rather than a read-only string
+
+    Other parameters are the same as for :func:`bytes_`.
+    """
+    length = random.randint(min_length, sized_length(min_length, max_length))
+    before, after = random.randint(0, 16), random.randint(0, 16)
+    data = _random_bytes(before + length + after, of)
+    if writable:
+        data = bytearray(data)
+    return memoryview(data)[before:before + length]
+
+
+def _random_bytes(count, of=None):
+    """Returns a string of ``count`` random bytes,
+    optionally restricted to given bytes.
+    """
+    if of is None:
+        return _random_bits(count)
+    if is_arbitrary(of):
+        return ''.join(_to_byte(next(of)) for _ in xrange(count))
+
+    table, deleted = _translation(of)
+    result = []
+    remaining = count
+    while remaining > 0:
+        # (bytes outside of the table are deleted rather than mapped,
+        # so that every allowed byte remains equally likely)
+        chunk = _random_bits(remaining * 256 // (256 - len(deleted)) + 16)
+        chunk = chunk.translate(table, deleted)[:remaining]
+        result.append(chunk)
+        remaining -= len(chunk)
+    return ''.join(result)
+
+
+def _random_bits(count):
+    """Returns a string of ``count`` bytes drawn from the RNG in one call."""
+    if count == 0:
+        return ''
+    return binascii.unhexlify('%0*x' % (2 * count,
+                                        random.getrandbits(8 * count)))
+
+
+_translations = {}
+
+
+def _translation(of):
+    """Returns the translation table and bytes to delete,
+    for turning uniformly random bytes into bytes from given ones.
+    """
+    allowed = sorted(set(map(_to_byte, of)))
+    if not allowed:
+        raise ValueError("no bytes to generate values from")
+
+    key = ''.join(allowed)
+    if key not in _translations:
+        usable = 256 - 256 % len(allowed)
+        table = ''.join(allowed[i % len(allowed)] if i < usable else '\0'
+                        for i in xrange(256))
+        _translations[key] = (table, string.maketrans('', '')[usable:])
+    return _translations[key]
+
+
+def _to_byte(b):
+    return b if isinstance(b, basestring) else chr(b)
@@ -0,0 +1,146 @@
+"""
+Boundary values of generators of arbitrary values - like empty lists,
+or the minimum and maximum of a range - where bugs tend to lurk.
+"""
+import itertools
+import random
+
+from pyqcy.arbitraries import (arbitrary, arbitrary_origin, is_arbitrary,
+                               to_arbitrary)
+from pyqcy.arbitraries.enumeration import Enumeration, product
+
+
+__all__ = ['has_boundaries', 'boundaries']
+
+
+def has_boundaries(arbitrary_func):
+    """Decorator for functions which return boundary values
+    of given generator of arbitrary values.
+
+    The decorated function is invoked with the same arguments
+    as the generator, and should return a list of values, simplest first,
+    or ``None`` if the generator has no particular boundary values::
+
+        @arbitrary(Color)
+        def color(bright=False):
+            return Color(random.choice(COLORS), bright)
+
+        @has_boundaries(color)
+        def color_boundaries(bright=False):
+            return [Color(COLORS[0], bright), Color(COLORS[-1], bright)]
+
+    Properties are checked on boundary values of their arguments first,
+    before moving on to random ones.
+    """
+    def decorator(func):
+        arbitrary.boundaries[arbitrary_func._arbitrary_func] = func
+        return func
+    return decorator
+
+
+def boundaries(gen):
+    """Returns the list of boundary values of given generator
+    of arbitrary values, or ``None`` if it has none that are known.
+    """
+    if not is_arbitrary(gen):
+        return None
+    origin = arbitrary_origin(to_arbitrary(gen))
+    if origin is None:
+        return None
+
+    func, args, kwargs = origin
+    boundaries_func = arbitrary.boundaries.get(func)
+    if boundaries_func is None:
+        return None
+    values = boundaries_func(*args, **kwargs)
+    return distinct(values) if values else None
+
+
+def boundaries_of(obj):
+    """Returns boundary values of what given argument of a generator
+    stands for: either values produced by a generator, or elements
+    of a collection (its first and last one).
+    """
+    if is_arbitrary(obj):
+        return boundaries(obj)
+    values = list(obj)
+    return distinct(values[:1] + values[-1:]) or None
+
+
+def distinct(values):
+    """Returns given values without repetitions, keeping their order.
+    Values are compared by their representation, so that
+    e.g. ``0.0`` and ``-0.0`` are told apart.
+    """
+    seen = set()
+    result = []
+    for value in values:
+        key = (type(value), repr(value))
+        if key not in seen:
+            seen.add(key)
+            result.append(value)
+    return result
+
+
+def combinations(value_lists, limit):
+    """Returns up to ``limit`` tuples combining values from given lists,
+    one from each, that cover as many combinations of boundaries
+    as possible.
+
+    If all the combinations don't fit within ``limit``, every pair
+    of values is covered instead, and if even that requires too many
+    tuples, a sample of them is taken. The first tuple always combines
+    the first (simplest) values of all lists.
+    """
+    if limit <= 0:
+        return []
+
+    value_lists = map(list, value_lists)
+    size = reduce(lambda a, b: a * b, map(len, value_lists), 1)
+    if size <= limit:
+        return list(product(map(Enumeration.of, value_lists)))
+
+    if len(value_lists) == 1:
+        rows = [(i,) for i in xrange(len(value_lists[0]))]
+    else:
+        rows = _pairwise(map(len, value_lists))
+    if len(rows) > limit:
+        # (the sample is deterministic, so that test runs split
+        # into parts agree on which tuples they consist of)
+        sample = random.Random(len(rows)).sample(xrange(1, len(rows)),
+                                                 limit - 1)
+        rows = [rows[0]] + [rows[i] for i in sorted(sample)]
+
+    return [tuple(values[i] for values, i in zip(value_lists, row))
+            for row in rows]
+
+
+def _pairwise(sizes):
+    """Returns tuples of indices into sequences of given sizes,
+    such that every pair of indices into two different sequences
+    occurs in at least one of the tuples.
+
+    This is the greedy construction of a covering array:
+    every tuple starts with a pair that isn't covered yet,
+    and is filled with indices which cover most of the other ones.
+    """
+    uncovered = set(((i, a), (j, b))
+                    for i, j in itertools.combinations(xrange(len(sizes)), 2)
+                    for a in xrange(sizes[i]) for b in xrange(sizes[j]))
+    rows = []
+    while uncovered:
+        (i, a), (j, b) = min(uncovered)
+        row = [None] * len(sizes)
+        row[i], row[j] = a, b
+        for k in xrange(len(sizes)):
+            if row[k] is not None:
+                continue
+            row[k] = max(xrange(sizes[k]), key=lambda v: (sum(
+                (((m, row[m]), (k, v)) if m < k else ((k, v), (m, row[m])))
+                in uncovered
+                for m in xrange(len(sizes)) if row[m] is not None), -v))
+        uncovered.difference_update(
+            ((p, row[p]), (q, row[q]))
+            for p, q in itertools.combinations(xrange(len(sizes)), 2))
+        rows.append(tuple(row))
+    return rows
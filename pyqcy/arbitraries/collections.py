@@ -1,10 +1,19 @@
 """
 Generators for arbitrary collections (tuples, lists, dictionaries).
 """
+import inspect
 import random
 import functools
+import sys
 
-from pyqcy.arbitraries import arbitrary, is_arbitrary
+from pyqcy.arbitraries import (arbitrary, arbitrary_origin, is_arbitrary,
+                               to_arbitrary, current_size, sized,
+                               sized_length, GenerationError, MAX_SIZE)
+from pyqcy.arbitraries.boundaries import (boundaries, boundaries_of,
+                                          combinations, has_boundaries)
+from pyqcy.arbitraries.enumeration import (enumerable, enumeration,
+                                           enumeration_of, product, sequences)
+from pyqcy.arbitraries.numbers import int_
 
 
 @arbitrary
@@ -44,6 +53,34 @@ def tuple_(*args, **kwargs):
     return tuple(next(of) for _ in xrange(n))
 
 
+@enumerable(tuple_)
+def _enumerate_tuples(*args, **kwargs):
+    n = kwargs.get('n')
+    if n is not None:
+        args = [kwargs.get('of') or args[0]] * n
+
+    elements = map(enumeration, args)
+    if None in elements:
+        return None
+    return product(elements)
+
+
+@has_boundaries(tuple_)
+def _tuple_boundaries(*args, **kwargs):
+    n = kwargs.get('n')
+    if n is not None:
+        args = [kwargs.get('of') or args[0]] * n
+
+    elements = map(boundaries, args)
+    if None in elements:
+        return None
+    return combinations(elements, limit=TUPLE_BOUNDARIES)
+
+
+#: Maximum number of boundary values of :func:`tuple_`
+TUPLE_BOUNDARIES = 16
+
+
 #: Generator for arbitrary pairs, combining two values
 #: coming from a single generator into tuple of length 2.
 two = functools.partial(tuple_, n=2)
@@ -63,6 +100,8 @@ def list_(of, min_length=0, max_length=1024):
 
     Parameters for this generator allow for adjusting the length
     of resulting list and elements they contain.
+    During a test run, the length is sized: it's close to ``min_length``
+    at first and grows up to ``max_length`` as the run progresses.
 
     :param of: Generator for list elements
     :param min_length: A minimum length of list to generate
@@ -78,27 +117,69 @@ def list_(of, min_length=0, max_length=1024):
             average = sum(l) / len(l)
             assert min(l) <= average <= max(l)
     """
-    length = random.randint(min_length, max_length)
+    length = random.randint(min_length, sized_length(min_length, max_length))
     if is_arbitrary(of):
         return [next(of) for _ in xrange(length)]
     return [random.choice(of) for _ in xrange(length)]
 
 
+@enumerable(list_)
+def _enumerate_lists(of, min_length=0, max_length=1024):
+    elements = enumeration_of(of)
+    if elements is None:
+        return None
+    return sequences(elements, min_length, max_length).map(list)
+
+
+@has_boundaries(list_)
+def _list_boundaries(of, min_length=0, max_length=1024):
+    elements = boundaries_of(of)
+    if elements is None:
+        return None
+
+    values = [[elements[0]] * min_length]
+    if min_length <= 1 <= max_length:
+        values.extend([e] for e in elements)
+    values.append([elements[-1]] * max_length)
+    return values
+
+
 @arbitrary
 def set_(of, min_length=0, max_length=1024):
     """Generator for arbitrary sets.
 
     Parameters for this generator allow for adjusting the size
     of resulting set and elements they contain.
+    During a test run, the size is sized just like length of :func:`list_`.
+
+    Sets always have exactly the chosen number of elements. If ``of``
+    has a small number of possible values (like :func:`elements`,
+    a bounded :func:`int_` or a list of values), they are sampled
+    without replacement, and the size is limited to their number.
+    Otherwise, duplicate elements are generated anew, and
+    :exc:`GenerationError` is raised if too many of them occur.
 
-    :param of: Generator for set elements
+    :param of: Generator for set elements,
+               or a collection of possible elements
     :param min_length: A minimum size of set to generate
     :param max_length: A maximum size of set to generate
     """
-    size = random.randint(min_length, max_length)
-    if is_arbitrary(of):
-        return set(next(of) for _ in xrange(size))
-    return set(random.choice(of) for _ in xrange(size))
+    for values in _unique_values(of, min_length, max_length, 'set_()'):
+        yield set(values)
+
+
+@has_boundaries(set_)
+def _set_boundaries(of, min_length=0, max_length=1024):
+    elements = boundaries_of(of)
+    if elements is None:
+        return None
+
+    lengths = [min_length, min(len(elements), max_length)]
+    values = [set(elements[:n]) for n in lengths
+              if min_length <= n <= len(elements)]
+    if min_length <= 1 <= max_length:
+        values.extend(set([e]) for e in elements)
+    return values
 
 
 @arbitrary
@@ -116,6 +197,11 @@ def dict_(keys=None, values=None, items=None,
         dict_(items=two(str_(max_length=64)))
 
     Those two styles are mutually exclusive - only one can be used at a time.
+    During a test run, the number of items is sized just like
+    length of :func:`list_`.
+
+    Dictionaries always have exactly the chosen number of items,
+    with unique keys obtained the same way as elements of :func:`set_`.
 
     :param keys: Generator for dictionary keys
     :param values: Generator for dictionary values
@@ -133,7 +219,113 @@ def dict_(keys=None, values=None, items=None,
         raise ValueError("ambiguous invocation - "
                          "provide either keys and values, or items")
 
-    next_item = ((lambda: next(items)) if items_provided else
-                 (lambda: (next(keys), next(values))))
-    length = random.randint(min_length, max_length)
-    return dict(next_item() for _ in xrange(length))
+    if items_provided:
+        for dict_items in _unique_values(items, min_length, max_length,
+                                         'dict_()', key=lambda item: item[0]):
+            yield dict(dict_items)
+    else:
+        for dict_keys in _unique_values(keys, min_length, max_length,
+                                        'dict_()'):
+            yield dict((key, next(values)) for key in dict_keys)
+
+
+@has_boundaries(dict_)
+def _dict_boundaries(keys=None, values=None, items=None,
+                     min_length=0, max_length=1024):
+    return [{}] if min_length == 0 else None
+
+
+#: Maximum number of possible values of a generator
+#: for them to be sampled without replacement
+SAMPLE_LIMIT = 10000
+
+
+def _unique_values(of, min_length, max_length, what, key=None):
+    """Generates lists of values from given generator (or collection)
+    which are unique with respect to ``key`` function, with their number
+    sized between ``min_length`` and ``max_length``.
+
+    Possible values to sample from, if there are few enough of them,
+    are found only once, rather than for every list.
+    """
+    domain = None
+    if key is None:
+        domain = _int_range(of)
+        if domain is None:
+            elements = enumeration_of(of)
+            if not is_arbitrary(of) or (elements is not None and
+                                        elements.size <= SAMPLE_LIMIT):
+                domain = _distinct(elements)
+        if domain is not None:
+            if len(domain) < min_length:
+                raise GenerationError(
+                    "%s cannot have %s elements, as there are only %s "
+                    "distinct values to choose from" % (
+                        what, min_length, len(domain)))
+            max_length = min(max_length, len(domain))
+
+    while True:
+        length = random.randint(min_length,
+                                sized_length(min_length, max_length))
+        if domain is not None:
+            yield random.sample(domain, length)
+        else:
+            yield _generate_unique(of, length, what, key)
+
+
+def _generate_unique(of, length, what, key=None):
+    """Returns a list of given number of values from given generator
+    which are unique with respect to ``key`` function.
+    """
+    # duplicates are generated anew with increasing size,
+    # in case small values don't make for enough unique ones
+    key = key or (lambda value: value)
+    values = {}
+    size = current_size()
+    duplicates = 0
+    max_duplicates = 100 + 10 * length
+    while len(values) < length:
+        if size is None:
+            value = next(of)
+        else:
+            with sized(min(MAX_SIZE, size + duplicates)):
+                value = next(of)
+        if key(value) in values:
+            duplicates += 1
+            if duplicates > max_duplicates:
+                raise GenerationError(
+                    "%s could only get %s unique elements out of %s "
+                    "after %s duplicates" % (what, len(values), length,
+                                             duplicates))
+            continue
+        values[key(value)] = value
+    return values.values()
+
+
+def _int_range(of):
+    """Returns the range of integers that given generator produces,
+    if it's a bounded :func:`int_`, so that they can be sampled
+    without enumerating them all.
+    """
+    if not is_arbitrary(of):
+        return None
+    origin = arbitrary_origin(to_arbitrary(of))
+    if origin is None or origin[0] is not int_._arbitrary_func:
+        return None
+    func, args, kwargs = origin
+    bounds = inspect.getcallargs(func, *args, **kwargs)
+    lower, upper = bounds['min'], bounds['max']
+    if not (0 <= upper - lower < sys.maxint):
+        return None     # too many for xrange()
+    return xrange(lower, upper + 1)
+
+
+def _distinct(values):
+    """Returns a list of distinct values, in their original order."""
+    seen = set()
+    distinct = []
+    for value in values:
+        if value not in seen:
+            seen.add(value)
+            distinct.append(value)
+    return distinct
@@ -5,6 +5,7 @@ from __future__ import absolute_import
 
 import functools
 import inspect
+import itertools
 import random
 
 from collections import Iterable, Mapping
@@ -13,7 +14,12 @@ try:
 except ImportError:
     OrderedDict = dict  # fallback for Python 2.6
 
-from pyqcy.arbitraries import arbitrary, is_arbitrary, to_arbitrary
+from pyqcy.arbitraries import (arbitrary, is_arbitrary, to_arbitrary,
+                               current_size, discard, sized, sized_length,
+                               GenerationError, MAX_SIZE)
+from pyqcy.arbitraries.boundaries import boundaries, has_boundaries
+from pyqcy.arbitraries.enumeration import (Enumeration, enumerable,
+                                           enumeration, interleave)
 from pyqcy.utils import recursive
 
 
@@ -69,6 +75,9 @@ def data(schema):
        into complex structures. You can have nested dictionaries,
        lists containing lists, dictionaries with lists as values, and so on.
 
+    Values produced by generators within the schema are sized,
+    so the whole data structure grows as the test run progresses.
+
     A typical example of using :func:`data`:
 
     .. code-block:: python
@@ -207,6 +216,41 @@ def elements(*args, **kwargs):
     return random.sample(args, count)
 
 
+@enumerable(elements)
+def _enumerate_elements(*args, **kwargs):
+    args = _flatten(args)
+    if any(is_arbitrary(arg) for arg in args):
+        return None
+
+    count = kwargs.get('count', None)
+    if count is None:
+        return Enumeration.of(args)
+    if is_arbitrary(count):
+        return None
+
+    count = min(count, len(args))
+    size = _binomial(len(args), count)
+    return Enumeration(size, lambda: itertools.imap(
+        list, itertools.combinations(args, count)))
+
+
+@has_boundaries(elements)
+def _elements_boundaries(*args, **kwargs):
+    args = _flatten(args)
+    if any(is_arbitrary(arg) for arg in args):
+        return None
+
+    count = kwargs.get('count', None)
+    if count is None:
+        return args[:1] + args[-1:]
+    if is_arbitrary(count):
+        return None
+    count = min(count, len(args))
+    if count == 0:
+        return [[]]
+    return [args[:count], args[len(args) - count:]]
+
+
 @combinator
 def one_of(*args):
     """Generator that yields values coming from given set of generators.
@@ -228,6 +272,26 @@ def one_of(*args):
     return next(random.choice(args))
 
 
+@enumerable(one_of)
+def _enumerate_one_of(*args):
+    alternatives = map(enumeration, _flatten(args))
+    if None in alternatives:
+        return None
+    return interleave(alternatives)
+
+
+@has_boundaries(one_of)
+def _one_of_boundaries(*args):
+    # (alternatives take turns, so that the simplest values
+    # of every generator come first)
+    alternatives = filter(None, map(boundaries, _flatten(args)))
+    missing = object()
+    values = [v for values in itertools.izip_longest(*alternatives,
+                                                     fillvalue=missing)
+              for v in values if v is not missing]
+    return values or None
+
+
 @combinator
 def frequency(*args):
     """Generator that yields coming from given set of generators,
@@ -261,3 +325,248 @@ def frequency(*args):
         if s <= i < s + p:
             return next(gen)
         s += p
+
+
+
+# Filtering and transforming generators
+
+#: Number of values in a row that :func:`such_that` can discard
+#: before giving up, unless specified otherwise
+MAX_DISCARDS = 100
+
+
+def such_that(gen, pred, max_discards=MAX_DISCARDS):
+    """Generator that yields only those values from given generator
+    which satisfy a predicate::
+
+        even = such_that(int_(min=0), lambda x: x % 2 == 0)
+
+    Values that don't satisfy ``pred`` are discarded and new ones are
+    generated in their place, with increasing size. Discarded values
+    are counted and reported in the statistics of properties.
+
+    :param gen: Generator of values to filter
+    :param pred: Predicate that values should satisfy
+    :param max_discards: Number of values in a row that can be discarded
+                         before :exc:`GenerationError` is raised
+
+    .. note::
+
+       Filters which reject most values are expensive. If possible,
+       generate satisfying values directly, e.g. with :func:`map_`.
+    """
+    return _such_that(gen, pred, max_discards)
+
+
+@arbitrary(functions=['pred'])
+def _such_that(gen, pred, max_discards):
+    size = current_size()
+    for attempt in xrange(max_discards + 1):
+        if size is None:
+            value = next(gen)
+        else:
+            # (much like QuickCheck, grow the size on retries,
+            # in case the predicate requires larger values)
+            with sized(min(MAX_SIZE, size + attempt)):
+                value = next(gen)
+        if pred(value):
+            return value
+        discard()
+
+    raise GenerationError(
+        "such_that(): %s values in a row didn't satisfy predicate %r; "
+        "the filter is too strict" % (max_discards + 1, pred))
+
+
+def map_(gen, func):
+    """Generator that yields results of given function
+    applied to values from given generator::
+
+        even = map_(int_(min=0, max=1000), lambda x: 2 * x)
+
+    Unlike :func:`apply`, the function is invoked
+    for every generated value.
+
+    :param gen: Generator of values to transform
+    :param func: Function to apply to the values
+    """
+    return _map(gen, func)
+
+
+@arbitrary(functions=['func'])
+def _map(gen, func):
+    return func(next(gen))
+
+
+def flat_map(gen, func):
+    """Generator that yields values from generators created by given
+    function, when it's invoked on values from given generator.
+
+    This allows for values which depend on other values,
+    e.g. lists together with one of their elements::
+
+        list_and_element = flat_map(
+            list_(of=int, min_length=1),
+            lambda l: map_(elements(l), lambda x: (l, x)))
+
+    :param gen: Generator of values to create generators from
+    :param func: Function which returns a generator
+                 (or a type) for given value
+    """
+    return _flat_map(gen, func)
+
+
+@arbitrary(functions=['func'])
+def _flat_map(gen, func):
+    return next(to_arbitrary(func(next(gen))))
+
+
+# Recursive structures
+
+def recursive_(base, extend, max_depth=4, max_leaves=100):
+    """Generator of recursive data structures, like trees or
+    nested lists, built from values of ``base`` generator (leaves)
+    by repeatedly applying ``extend`` to them.
+
+    ``extend`` is a function which receives a generator of subtrees
+    and returns a generator of structures composed of them.
+    For example, JSON-like documents could be generated with::
+
+        json_ = recursive_(
+            one_of(int, str_(max_length=8), elements(None, True, False)),
+            lambda children: one_of(
+                list_(of=children, max_length=4),
+                dict_(keys=str_(max_length=8), values=children,
+                      max_length=4)))
+
+    Both the depth and the number of leaves are bounded, and sized:
+    small structures come first, and grow up to the bounds
+    as the test run progresses. Structures are built bottom-up,
+    level by level, without recursion; every subtree is used once.
+
+    :param base: Generator of leaves
+    :param extend: Function which turns a generator of subtrees
+                   into a generator of larger structures
+    :param max_depth: Maximum number of times ``extend``
+                      can be nested in a single structure
+    :param max_leaves: Maximum number of leaves in a single structure,
+                       as well as of applications of ``extend`` to build it
+    """
+    if max_depth < 0:
+        raise ValueError("maximum depth cannot be negative")
+    if max_leaves < 1:
+        raise ValueError("at least one leaf has to be allowed")
+    return _recursive(base, extend, max_depth, max_leaves)
+
+
+class _LimitReached(Exception):
+    """Raised when building a recursive structure
+    has used up its budget of leaves or nodes.
+    """
+
+
+@arbitrary(functions=['extend'])
+def _recursive(base, extend, max_depth, max_leaves):
+    # (depth bound is rounded up, so that the deepest structures
+    # don't have to wait for the very last test cases)
+    size = current_size()
+    depth = random.randint(0, max_depth if size is None else
+                           -(-max_depth * size // MAX_SIZE))
+    budget = {'leaves': sized_length(1, max_leaves),
+              'nodes': sized_length(1, max_leaves)}
+
+    def spend(what):
+        if budget[what] == 0:
+            raise _LimitReached()
+        budget[what] -= 1
+
+    # subtrees of the previous level, to be used as children
+    # of the current one; each is taken at most once
+    pool = []
+
+    def children():
+        while True:
+            if pool:
+                yield pool.pop(random.randrange(len(pool)))
+            else:
+                spend('leaves')
+                yield next(base)
+
+    for i in xrange(depth):
+        # lower levels have random width, so that the structure
+        # can branch out; the top one is the structure itself
+        levels_left = depth - i
+        width = (1 if levels_left == 1 else
+                 random.randint(1, max(1, budget['nodes'] // levels_left)))
+
+        extended = to_arbitrary(extend(children()))
+        level = []
+        try:
+            while len(level) < width or (pool and levels_left > 1):
+                spend('nodes')
+                level.append(next(extended))
+        except _LimitReached:
+            pass
+        if not level:
+            break   # budget is used up
+        pool[:] = level
+
+    if pool:
+        return random.choice(pool)
+    return next(base)
+
+
+@enumerable(_such_that)
+def _enumerate_such_that(gen, pred, max_discards):
+    # the number of satisfying values is only known after
+    # filtering all of them, which is feasible only for small domains
+    values = enumeration(gen)
+    if values is None or values.size > 10000:
+        return None
+    return Enumeration.of(v for v in values if pred(v))
+
+
+@has_boundaries(_such_that)
+def _such_that_boundaries(gen, pred, max_discards):
+    values = boundaries(gen)
+    return values and filter(pred, values)
+
+
+@has_boundaries(_map)
+def _map_boundaries(gen, func):
+    values = boundaries(gen)
+    return values and map(func, values)
+
+
+@has_boundaries(_recursive)
+def _recursive_boundaries(base, extend, max_depth, max_leaves):
+    return boundaries(base)
+
+
+@enumerable(_map)
+def _enumerate_map(gen, func):
+    values = enumeration(gen)
+    if values is None:
+        return None
+    return values.map(func)
+
+
+def _flatten(args):
+    """Flattens arguments of a :func:`combinator` the same way
+    it does itself, so that they can be enumerated.
+    """
+    flat = []
+    for arg in args:
+        if isinstance(arg, Iterable) and not is_arbitrary(arg):
+            flat.extend(arg)
+        else:
+            flat.append(arg)
+    return flat
+
+
+def _binomial(n, k):
+    """Computes the binomial coefficient, i.e. ``n`` choose ``k``."""
+    result = 1
+    for i in xrange(min(k, n - k)):
+        result = result * (n - i) // (i + 1)
+    return result
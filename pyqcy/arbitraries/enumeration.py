@@ -0,0 +1,186 @@
+"""
+Enumeration of all values that generators of arbitrary values
+can produce, for checking properties over small domains exhaustively.
+"""
+import itertools
+
+from pyqcy.arbitraries import (arbitrary, arbitrary_origin, is_arbitrary,
+                               to_arbitrary)
+
+
+__all__ = ['Enumeration', 'enumerable', 'enumeration']
+
+
+class Enumeration(object):
+    """Finite domain of values, enumerated lazily
+    from the smallest values to the largest ones.
+
+    :param size: Number of values in the domain
+    :param values: Function returning an iterator over the values
+    """
+    def __init__(self, size, values):
+        self.size = size
+        self.__values = values
+
+    def __iter__(self):
+        return iter(self.__values())
+
+    @classmethod
+    def of(cls, values):
+        """Creates an enumeration of given sequence of values,
+        in the order they are listed.
+        """
+        values = list(values)
+        return cls(len(values), lambda: iter(values))
+
+    def map(self, func):
+        """Returns enumeration of results of given function
+        applied to values from this one.
+        """
+        return Enumeration(self.size, lambda: itertools.imap(func, self))
+
+
+def product(enumerations):
+    """Returns enumeration of tuples combining values from given
+    enumerations, one from each.
+
+    Tuples are enumerated breadth-first: every value from an enumeration
+    is combined with the first values from others, before the next value
+    is reached. Since values are ordered by size, small combinations
+    come before large ones, even if the domains are enormous.
+    """
+    enumerations = list(enumerations)
+    sizes = [e.size for e in enumerations]
+    size = reduce(lambda a, b: a * b, sizes, 1)
+    if size == 0:
+        return Enumeration(0, lambda: iter([]))
+
+    def values():
+        iterators = [iter(e) for e in enumerations]
+        seen = [[] for _ in enumerations]
+
+        def value(i, index):
+            while len(seen[i]) <= index:
+                seen[i].append(next(iterators[i]))
+            return seen[i][index]
+
+        max_total = sum(s - 1 for s in sizes)
+        for total in itertools.count():
+            if total > max_total:
+                return
+            for indices in _indices_with_sum(sizes, total):
+                yield tuple(value(i, index)
+                            for i, index in enumerate(indices))
+
+    return Enumeration(size, values)
+
+
+def _indices_with_sum(sizes, total):
+    """Yields tuples of indices into sequences of given sizes,
+    which add up to ``total``.
+    """
+    if not sizes:
+        if total == 0:
+            yield ()
+        return
+    for index in xrange(min(sizes[0] - 1, total) + 1):
+        for rest in _indices_with_sum(sizes[1:], total - index):
+            yield (index,) + rest
+
+
+def chain(enumerations):
+    """Returns enumeration of values from all given enumerations,
+    one after another.
+    """
+    enumerations = list(enumerations)
+    return Enumeration(sum(e.size for e in enumerations),
+                       lambda: itertools.chain.from_iterable(enumerations))
+
+
+def sequences(of, min_length, max_length):
+    """Returns enumeration of tuples of values from given enumeration,
+    with lengths between ``min_length`` and ``max_length``.
+    Shorter tuples come before longer ones.
+    """
+    k = of.size
+    if k == 0:
+        size = 1 if min_length == 0 else 0
+        max_length = 0
+    elif k == 1:
+        size = max_length - min_length + 1
+    else:
+        size = (k ** (max_length + 1) - k ** min_length) // (k - 1)
+
+    def values():
+        for length in xrange(min_length, max_length + 1):
+            for value in product([of] * length):
+                yield value
+
+    return Enumeration(size, values)
+
+
+def interleave(enumerations):
+    """Returns enumeration of values from all given enumerations,
+    taking them in turns, so that small values of every
+    enumeration come first.
+    """
+    def values():
+        iterators = [iter(e) for e in enumerations]
+        while iterators:
+            for it in list(iterators):
+                try:
+                    yield next(it)
+                except StopIteration:
+                    iterators.remove(it)
+
+    return Enumeration(sum(e.size for e in enumerations), values)
+
+
+def enumerable(arbitrary_func):
+    """Decorator for functions which enumerate all values
+    that given generator of arbitrary values can produce.
+
+    The decorated function is invoked with the same arguments
+    as the generator, and should return an :class:`Enumeration`,
+    or ``None`` if the values cannot be enumerated::
+
+        @arbitrary(Color)
+        def color(bright=False):
+            return Color(random.choice(COLORS), bright)
+
+        @enumerable(color)
+        def enumerate_colors(bright=False):
+            return Enumeration.of(Color(c, bright) for c in COLORS)
+    """
+    def decorator(func):
+        arbitrary.enumerators[arbitrary_func._arbitrary_func] = func
+        return func
+    return decorator
+
+
+def enumeration(gen):
+    """Returns :class:`Enumeration` of all values that given generator
+    of arbitrary values can produce, or ``None`` if it's not known
+    how to enumerate them.
+    """
+    if not is_arbitrary(gen):
+        return None
+    origin = arbitrary_origin(to_arbitrary(gen))
+    if origin is None:
+        return None
+
+    func, args, kwargs = origin
+    enumerator = arbitrary.enumerators.get(func)
+    if enumerator is None:
+        return None
+    return enumerator(*args, **kwargs)
+
+
+def enumeration_of(obj):
+    """Returns :class:`Enumeration` of values that given argument
+    of a generator stands for: either values produced by a generator,
+    or elements of an iterable.
+    """
+    if is_arbitrary(obj):
+        return enumeration(obj)
+    return Enumeration.of(obj)
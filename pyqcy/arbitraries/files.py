@@ -0,0 +1,190 @@
+"""
+Generators of arbitrary files, for testing parsers of huge inputs.
+"""
+from __future__ import absolute_import
+
+from contextlib import contextmanager
+import errno
+import json
+import mmap
+import os
+import random
+import tempfile
+import threading
+
+from pyqcy.arbitraries import (arbitrary, on_cleanup, sized_length,
+                               GenerationError)
+from pyqcy.arbitraries.binary import _random_bytes
+
+
+__all__ = ['binary_file', 'lines_file']
+
+
+#: Size of chunks in which the content of files is generated and written,
+#: which bounds the memory used regardless of the size of files
+CHUNK_SIZE = 1 << 20
+
+#: Directory to create temporary files in.
+#: If ``None``, the default one from :mod:`tempfile` is used.
+temp_dir = None
+
+
+@arbitrary
+def binary_file(of=None, min_size=0, max_size=CHUNK_SIZE, mmap=False):
+    """Generator of temporary files with arbitrary binary content.
+
+    Rather than the content itself, the property receives the path
+    to the file, or the file mapped into memory if ``mmap`` is true.
+    The file is removed once the test case has been executed.
+
+    :param of: Bytes that the file can consist of,
+               like in :func:`bytes_`
+    :param min_size: A minimum size of files (in bytes)
+    :param max_size: A maximum size of files (in bytes)
+    :param mmap: Whether to pass a read-only :class:`mmap.mmap`
+                 of the file, rather than its path.
+                 Since empty files cannot be mapped,
+                 ``min_size`` has to be positive then.
+
+    The size is sized, so the largest files are generated
+    only at the end of a test run. Their content is written in chunks
+    of :data:`CHUNK_SIZE`, so even files of many gigabytes can be used
+    (provided they fit within :attr:`Property.disk_limit`).
+    """
+    _check_mmap_size(mmap, min_size)
+    size = random.randint(min_size, sized_length(min_size, max_size))
+
+    def chunks():
+        for offset in xrange(0, size, CHUNK_SIZE):
+            yield _random_bytes(min(CHUNK_SIZE, size - offset), of)
+
+    return _temp_file(chunks(), mmap)
+
+
+@arbitrary
+def lines_file(of, min_size=0, max_size=CHUNK_SIZE, mmap=False):
+    """Generator of temporary text files with arbitrary lines.
+
+    :param of: Generator of lines, e.g. :func:`regex`. Values which
+               are not strings (like ones produced by :func:`data`)
+               are written as JSON, one per line.
+    :param min_size: A minimum size of files (in bytes)
+    :param max_size: A maximum size of files (in bytes)
+    :param mmap: Whether to pass the file mapped into memory,
+                 like for :func:`binary_file`
+
+    Lines are written until the file reaches its (sized) size,
+    so the last one can make it slightly larger.
+    Unicode lines are encoded as UTF-8.
+    """
+    _check_mmap_size(mmap, min_size)
+    size = random.randint(min_size, sized_length(min_size, max_size))
+
+    def chunks():
+        written = 0
+        while written < size:
+            chunk, chunk_size = [], 0
+            while chunk_size < CHUNK_SIZE and written + chunk_size < size:
+                line = next(of)
+                if not isinstance(line, basestring):
+                    line = json.dumps(line)
+                if isinstance(line, unicode):
+                    line = line.encode('utf-8')
+                chunk.append(line + '\n')
+                chunk_size += len(line) + 1
+            yield ''.join(chunk)
+            written += chunk_size
+
+    return _temp_file(chunks(), mmap)
+
+
+def _check_mmap_size(mmap_, min_size):
+    if mmap_ and not (min_size > 0):
+        raise ValueError("empty files cannot be memory-mapped "
+                         "(min_size must be positive)")
+
+
+def _temp_file(chunks, mmap_):
+    """Writes given chunks of content into a new temporary file,
+    which is removed once the test case has been executed.
+
+    :return: Path to the file, or the file mapped into memory
+    """
+    fd, path = tempfile.mkstemp(prefix='pyqcy-', dir=temp_dir)
+    state = {'size': 0, 'mmap': None}
+
+    def clean_up():
+        if state['mmap'] is not None:
+            state['mmap'].close()
+        try:
+            os.remove(path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:     # (e.g. removed by the property)
+                raise
+        disk_usage.release(state['size'])
+        state['size'] = 0
+    on_cleanup(clean_up)
+
+    with os.fdopen(fd, 'wb') as f:
+        for chunk in chunks:
+            disk_usage.reserve(len(chunk))
+            state['size'] += len(chunk)
+            f.write(chunk)
+
+    if not mmap_:
+        return path
+    with open(path, 'rb') as f:
+        state['mmap'] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return state['mmap']
+
+
+# Accounting of disk space
+
+class DiskUsage(object):
+    """Disk space taken by temporary files of generated values,
+    with an optional limit on how much of it can be taken at once.
+    """
+    def __init__(self):
+        self.limit = None   # in bytes
+        self.current = 0    # taken by existing files
+        self.peak = 0       # taken at once since the limit was set
+        self.written = 0    # in total
+        self.__lock = threading.Lock()
+
+    def reserve(self, size):
+        """Accounts for given number of bytes about to be written.
+        Raises :exc:`GenerationError` if that would exceed the limit.
+        """
+        with self.__lock:
+            if self.limit is not None and self.current + size > self.limit:
+                raise GenerationError(
+                    "temporary files would take more than %s bytes "
+                    "of disk space" % self.limit)
+            self.current += size
+            self.written += size
+            self.peak = max(self.peak, self.current)
+
+    def release(self, size):
+        """Accounts for given number of bytes that have been freed."""
+        with self.__lock:
+            self.current -= size
+
+
+#: Disk space taken by temporary files of generated values
+disk_usage = DiskUsage()
+
+
+@contextmanager
+def disk_limit(limit):
+    """Context manager which limits the disk space that temporary files
+    of generated values can take at once, within its block.
+
+    :param limit: Maximum number of bytes, or ``None`` for no limit
+    :return: :class:`DiskUsage` whose ``peak`` counts from the block start
+    """
+    previous, disk_usage.limit = disk_usage.limit, limit
+    disk_usage.peak = disk_usage.current
+    try:
+        yield disk_usage
+    finally:
+        disk_usage.limit = previous
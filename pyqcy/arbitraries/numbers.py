@@ -1,10 +1,14 @@
 """
 Arbitrary values generators for Python numeric types.
 """
-import sys
+import itertools
 import random
+import struct
+import sys
 
-from pyqcy.arbitraries import arbitrary
+from pyqcy.arbitraries import arbitrary, sized_range
+from pyqcy.arbitraries.boundaries import has_boundaries
+from pyqcy.arbitraries.enumeration import Enumeration, enumerable
 
 
 @arbitrary(int)
@@ -15,30 +19,102 @@ def int_(min=-sys.maxint - 1, max=sys.maxint):
     supported by operating system; this can be adjusted using
     parameters.
 
+    During a test run, values are sized: at first they come
+    from a small range around zero (or whichever of ``min``, ``max``
+    is closer to it), which grows to the whole ``[min, max]`` range
+    as the test run progresses.
+
     :param min: A minimum value of integer to generate
     :param max: A maximum value of integer to generate
     """
-    return random.randint(min, max)
+    # (a generator rather than a function returning a single value,
+    # as resuming it is cheaper than calling a function with arguments)
+    while True:
+        lower, upper = sized_range(min, max)
+        width = upper - lower + 1
+        if 0 < width < _RANDOM_WIDTH:
+            # (what random.randint() does, without the overhead
+            # of its checks)
+            yield int(lower + int(random.random() * width))
+        else:
+            yield random.randint(lower, upper)
+
+
+#: Width of integer ranges that a single random float
+#: is enough to choose from
+_RANDOM_WIDTH = 1 << random.BPF
+
+
+@enumerable(int_)
+def _enumerate_ints(min=-sys.maxint - 1, max=sys.maxint):
+    """Enumerates integers from the one closest to zero,
+    alternating between larger and smaller ones.
+    """
+    center = min if 0 < min else max if 0 > max else 0
+
+    def values():
+        yield center
+        for distance in itertools.count(1):
+            if center + distance > max and center - distance < min:
+                return
+            if center + distance <= max:
+                yield center + distance
+            if center - distance >= min:
+                yield center - distance
+
+    return Enumeration(max - min + 1, values)
+
+
+@has_boundaries(int_)
+def _int_boundaries(min=-sys.maxint - 1, max=sys.maxint):
+    center = min if 0 < min else max if 0 > max else 0
+    return [v for v in (center, min, max, center + 1, center - 1)
+            if min <= v <= max]
 
 
 @arbitrary(float)
-def float_(min=-float(sys.maxint), max=float(sys.maxint)):
+def float_(min=-float(sys.maxint), max=float(sys.maxint),
+           special=0.1, nan=False, infinity=False):
     """Generator for arbitrary floats.
 
+    Rather than uniformly, values are drawn from all the floats
+    representable within the ``[min, max]`` range, with each of them
+    equally likely. Numbers of every order of magnitude are thus generated
+    as often as the others - including tiny and subnormal ones,
+    which are notoriously hard to get right.
+
+    Additionally, some of the values are special ones: boundaries of
+    the range and numbers right next to them, zeros of both signs, ``1.0``,
+    and the smallest subnormal, normal and the largest finite floats
+    (of those which are within the range).
+
     :param min: A minimum value of float to generate
     :param max: A maximum value of float to generate
+    :param special: Probability of generating one of the special values
+    :param nan: Whether the special values should include NaN
+    :param infinity: Whether the special values should include
+                     both infinities, even if they are outside the range
     """
-    return min + random.random() * (max - min)
+    return _float(min, max, special, nan, infinity)
+
+
+@has_boundaries(float_)
+def _float_boundaries(min=-float(sys.maxint), max=float(sys.maxint),
+                      special=0.1, nan=False, infinity=False):
+    values = _special_values(min, max, nan, infinity)
+    return sorted(values, key=lambda v: v != 0)     # zeros first
 
 
 @arbitrary(complex)
 def complex_(min_real=-float(sys.maxint), max_real=float(sys.maxint),
-             min_imag=-float(sys.maxint), max_imag=float(sys.maxint)):
+             min_imag=-float(sys.maxint), max_imag=float(sys.maxint),
+             special=0.1, nan=False, infinity=False):
     """Generator for arbitrary complex numbers
     of the built-in Python complex type.
 
     Parameters for this generator allow for adjusting the rectangle
     on the complex plane where the values will come from.
+    Both parts of the numbers are generated like by :func:`float_`.
 
     :param min_real: A minimum value for real part of generated numbers
     :param max_real: A maximum value for real part of generated numbers
@@ -46,7 +122,69 @@ def complex_(min_real=-float(sys.maxint), max_real=float(sys.maxint),
                      of generated numbers
     :param max_imag: A maximum value for the imaginary part
                      of generated numbers
+    :param special: Probability of either part being a special value
+    :param nan: Whether the special values should include NaN
+    :param infinity: Whether the special values should include infinities
     """
-    reals = float_(min_real, max_real)
-    imags = float_(min_imag, max_imag)
-    return complex(next(reals), next(imags))
+    return complex(_float(min_real, max_real, special, nan, infinity),
+                   _float(min_imag, max_imag, special, nan, infinity))
+
+
+@has_boundaries(complex_)
+def _complex_boundaries(min_real=-float(sys.maxint),
+                        max_real=float(sys.maxint),
+                        min_imag=-float(sys.maxint),
+                        max_imag=float(sys.maxint),
+                        special=0.1, nan=False, infinity=False):
+    reals = _float_boundaries(min_real, max_real, special, nan, infinity)
+    imags = _float_boundaries(min_imag, max_imag, special, nan, infinity)
+    return ([complex(r, imags[0]) for r in reals] +
+            [complex(reals[0], i) for i in imags[1:]])
+
+
+# Floating point numbers
+
+
+def _float(min, max, special, nan, infinity):
+    """Generates a float for :func:`float_`."""
+    if not (min <= max):
+        raise ValueError("invalid range of floats: [%r, %r]" % (min, max))
+    if special and random.random() < special:
+        return random.choice(_special_values(min, max, nan, infinity))
+    return _from_ordinal(random.randint(_ordinal(min), _ordinal(max)))
+
+
+def _special_values(min, max, nan, infinity):
+    """Returns the list of special floats for given range.
+
+    It's computed anew every time (rather than cached for every range
+    that's ever been used), as it's only needed for some of the values
+    and a handful of floats are quick to compute.
+    """
+    tiny, smallest = 5e-324, sys.float_info.min
+    largest = sys.float_info.max
+    values = [min, max,
+              _from_ordinal(_ordinal(min) + 1),
+              _from_ordinal(_ordinal(max) - 1),
+              0.0, -0.0, 1.0, -1.0, tiny, -tiny,
+              smallest, -smallest, largest, -largest]
+    values = [v for v in values if min <= v <= max]
+    if nan:
+        values.append(float('nan'))
+    if infinity:
+        values.extend([float('inf'), float('-inf')])
+    return values
+
+
+def _ordinal(x):
+    """Returns the position of given float among all the floats,
+    ordered by their value (with zeros of both signs at 0).
+    """
+    bits = struct.unpack('<q', struct.pack('<d', x))[0]
+    return bits if bits >= 0 else -(bits & 0x7fffffffffffffff)
+
+
+def _from_ordinal(ordinal):
+    """Returns the float at given position, as given by :func:`_ordinal`."""
+    bits = ordinal if ordinal >= 0 else -ordinal | -0x8000000000000000
+    return struct.unpack('<d', struct.pack('<q', bits))[0]
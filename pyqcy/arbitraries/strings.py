@@ -1,54 +1,127 @@
 """
 Generators of arbitrary strings.
 """
+import itertools
 import random
 import re
 import string
 
-from pyqcy.arbitraries import arbitrary, is_arbitrary
-from pyqcy.arbitraries.numbers import int_
+from pyqcy.arbitraries import arbitrary, is_arbitrary, sized_length
+from pyqcy.arbitraries.boundaries import boundaries_of, has_boundaries
+from pyqcy.arbitraries.enumeration import (Enumeration, enumerable,
+                                           enumeration_of, sequences)
 
 
 @arbitrary(str)
-def str_(of=int_(min=0, max=255), min_length=1, max_length=64):
+def str_(of=None, min_length=1, max_length=64):
     """Generator for arbitrary strings.
 
     Parameters for this generator allow for adjusting the length
     of resulting strings and the set of characters they are composed of.
+    During a test run, the length is sized: it's close to ``min_length``
+    at first and grows up to ``max_length`` as the run progresses.
 
     :param of: Characters used to construct the strings.
                This can be either an iterable of characters
                (e.g. a string) or a generator that produces them.
+               By default, any of the 256 possible characters can be used.
     :param min_length: A minimum length of string to generate
     :param max_length: A maximum length of string to generate
     """
-    length = random.randint(min_length, max_length)
+    length = random.randint(min_length, sized_length(min_length, max_length))
     char = lambda ch: ch if isinstance(ch, basestring) else chr(ch)
+    if of is None:
+        return ''.join(chr(random.randint(0, 255)) for _ in xrange(length))
     if is_arbitrary(of):
         return ''.join(char(next(of)) for _ in xrange(length))
     return ''.join(char(random.choice(of)) for _ in xrange(length))
 
 
+@enumerable(str_)
+def _enumerate_strs(of=None, min_length=1, max_length=64):
+    return _enumerate_strings(of, min_length, max_length, 256, chr, '')
+
+
+@has_boundaries(str_)
+def _str_boundaries(of=None, min_length=1, max_length=64):
+    return _string_boundaries(of, min_length, max_length, 255, chr, '')
+
+
 @arbitrary(unicode)
-def unicode_(of=int_(min=0, max=65535), min_length=1, max_length=64):
+def unicode_(of=None, min_length=1, max_length=64):
     """Generator for arbitrary Unicode strings.
 
     Parameters for this generator allow for adjusting the length
     of resulting strings and the set of characters they are composed of.
+    During a test run, the length is sized just like for :func:`str_`.
 
     :param of: Characters used to construct the strings.
                This can be either an iterable of characters
                (e.g. a string) or a generator that produces them.
+               By default, any character from the Basic Multilingual Plane
+               can be used.
     :param min_length: A minimum length of string to generate
     :param max_length: A maximum length of string to generate
     """
-    length = random.randint(min_length, max_length)
+    length = random.randint(min_length, sized_length(min_length, max_length))
     char = lambda ch: ch if isinstance(ch, basestring) else unichr(ch)
+    if of is None:
+        return u''.join(unichr(random.randint(0, 65535))
+                        for _ in xrange(length))
     if is_arbitrary(of):
         return u''.join(char(next(of)) for _ in xrange(length))
     return u''.join(char(random.choice(of)) for _ in xrange(length))
 
 
+@enumerable(unicode_)
+def _enumerate_unicodes(of=None, min_length=1, max_length=64):
+    return _enumerate_strings(of, min_length, max_length, 65536, unichr, u'')
+
+
+@has_boundaries(unicode_)
+def _unicode_boundaries(of=None, min_length=1, max_length=64):
+    return _string_boundaries(of, min_length, max_length,
+                              65535, unichr, u'')
+
+
+def _enumerate_strings(of, min_length, max_length,
+                       char_count, to_char, empty):
+    """Enumerates strings for :func:`str_` and :func:`unicode_`."""
+    if of is None:
+        chars = Enumeration(char_count,
+                            lambda: itertools.imap(to_char,
+                                                   xrange(char_count)))
+    else:
+        chars = enumeration_of(of)
+        if chars is None:
+            return None
+        chars = chars.map(
+            lambda ch: ch if isinstance(ch, basestring) else to_char(ch))
+    return sequences(chars, min_length, max_length).map(empty.join)
+
+
+def _string_boundaries(of, min_length, max_length,
+                       max_char, to_char, empty):
+    """Returns boundary values for :func:`str_` and :func:`unicode_`:
+    the shortest and the longest strings, and those of a single character,
+    made of the first and the last of possible characters.
+    """
+    if of is None:
+        chars = [to_char(0), to_char(max_char)]
+    else:
+        chars = boundaries_of(of)
+        if chars is None:
+            return None
+        chars = [ch if isinstance(ch, basestring) else to_char(ch)
+                 for ch in chars]
+
+    values = [empty + chars[0] * min_length]
+    if min_length <= 1 <= max_length:
+        values.extend(empty + ch for ch in chars)
+    values.append(empty + chars[-1] * max_length)
+    return values
+
+
 # Common patterns
 
 @arbitrary(str)
@@ -0,0 +1,198 @@
+"""
+Cache of test results, allowing to skip checking properties
+that haven't changed since they last passed.
+"""
+import hashlib
+import inspect
+import json
+import os
+import types
+
+from pyqcy.arbitraries import arbitrary_origin
+
+
+__all__ = ['ResultCache']
+
+
+#: Modes of using the cache
+MODES = ('skip', 'reduce')
+
+
+class ResultCache(object):
+    """Cache of results of checking properties, persisted in a file.
+
+    Properties are identified in the cache by a *key*, which is a hash
+    of everything that affects what they actually test:
+
+    * the pyqcy version,
+    * module and name of the property function,
+    * bytecode of the property function, together with its constants
+      and names of globals it refers to,
+    * (recursively) every function whose closure the property function
+      is wrapped in, e.g. by currying the property,
+    * values of property arguments that aren't generated (constants),
+      and fixture functions providing resources for the property,
+    * configuration of every generator used by the property: the function
+      which has created it, its bytecode, and arguments it was invoked with
+      (recursively, for nested generators and :func:`data` schemas),
+    * an optional ``salt`` given to the cache.
+
+    Crucially, the key doesn't cover *code under test*, i.e. functions
+    and objects that the property refers to through global names. The key
+    will also not change if a generator calls another function which has
+    changed, as long as its own bytecode remains the same. To have the cache
+    invalidated when the tested code changes, pass a ``salt`` which identifies
+    it, like a hash of the source tree or VCS revision.
+
+    Objects other than functions, generators and built-in values are
+    included through their attributes or, if they define a custom
+    ``__repr__``, their representation. Keys of properties which refer
+    to objects whose representation isn't stable (e.g. contains a memory
+    address) or to values computed at import time (e.g. by :func:`apply`)
+    change with every run, so such properties are never skipped.
+
+    :param path: Path to the cache file
+    :param mode: What to do with properties that have already passed
+                 at least the required number of tests:
+
+                 * ``'skip'`` - don't check them at all (default),
+                   which requires a ``salt``
+                 * ``'reduce'`` - check only a ``fraction``
+                   of the usual number of tests
+
+    :param salt: Additional string to include in all keys
+    :param fraction: Fraction of tests to execute in ``'reduce'`` mode
+    """
+    def __init__(self, path='.pyqcy-cache', mode='skip', salt='',
+                 fraction=0.1):
+        if mode not in MODES:
+            raise ValueError("invalid cache mode: %r (expected one of: %s)"
+                             % (mode, ", ".join(MODES)))
+        if not (0 < fraction <= 1):
+            raise ValueError("fraction must be between 0 and 1")
+        # without a salt, properties would be skipped even after the code
+        # under test has changed, as long as they themselves haven't
+        if mode == 'skip' and not salt:
+            raise ValueError("salt is required to skip cached properties")
+
+        self.path = path
+        self.mode = mode
+        self.salt = salt
+        self.fraction = fraction
+
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def key(self, prop):
+        """Computes the cache key of given property."""
+        from pyqcy import __version__
+        parts = [__version__, self.salt,
+                 describe(prop.func), describe(prop.data),
+                 describe(dict((k, v.func)
+                               for k, v in prop.fixtures.iteritems()))]
+        return hashlib.sha1('\0'.join(parts)).hexdigest()
+
+    def passed_count(self, prop):
+        """Returns the number of tests for given property that have passed
+        since it last changed.
+        """
+        entry = self.entries.get(self.key(prop))
+        return entry['passed'] if entry else 0
+
+    def tests_count(self, prop):
+        """Returns the number of tests that should be executed
+        for given property, with 0 meaning it should be skipped.
+        """
+        if self.passed_count(prop) < prop.tests_count:
+            return prop.tests_count
+        if self.mode == 'skip':
+            return 0
+        return max(1, int(prop.tests_count * self.fraction))
+
+    def record(self, prop, results):
+        """Records the results of checking given property."""
+        key = self.key(prop)
+        if all(r.succeeded for r in results):
+            entry = self.entries.setdefault(key, {'name': prop_name(prop),
+                                                  'passed': 0})
+            entry['passed'] += len(results)
+        else:
+            self.entries.pop(key, None)
+
+    def save(self):
+        """Writes the cache to its file."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.rename(tmp_path, self.path)
+
+
+def prop_name(prop):
+    """Returns qualified name of given property."""
+    return "%s.%s" % (prop.func.__module__, prop.func.__name__)
+
+
+def describe(obj, _seen=None):
+    """Returns a string that describes given object for the purpose
+    of computing cache keys. Objects that behave the same
+    should have the same description across interpreter runs.
+    """
+    seen = _seen or set()
+    if id(obj) in seen:
+        return '<cycle>'
+
+    if isinstance(obj, (types.NoneType, bool, int, long, float, complex,
+                        basestring)):
+        return repr(obj)
+    if isinstance(obj, (type, types.ClassType, types.ModuleType,
+                        types.BuiltinFunctionType)):
+        return "%s.%s" % (getattr(obj, '__module__', ''), obj.__name__)
+
+    seen = seen | set([id(obj)])
+    desc = lambda o: describe(o, seen)
+
+    from pyqcy.properties import Property
+    if isinstance(obj, Property):
+        # (by its function, data, fixtures and options, but not private
+        # attributes - they cache what's computed while checking it)
+        return "property(%s)" % desc(dict((k, v) for k, v
+                                          in vars(obj).iteritems()
+                                          if not k.startswith('_')))
+
+    if isinstance(obj, (list, tuple)):
+        return "%s(%s)" % (type(obj).__name__, ",".join(map(desc, obj)))
+    if isinstance(obj, (set, frozenset)):
+        return "%s(%s)" % (type(obj).__name__,
+                           ",".join(sorted(map(desc, obj))))
+    if isinstance(obj, dict):
+        return "%s(%s)" % (type(obj).__name__, ",".join(sorted(
+            "%s:%s" % (desc(k), desc(v)) for k, v in obj.iteritems())))
+
+    if isinstance(obj, types.CodeType):
+        return "code(%s,%s,%s)" % (obj.co_code.encode('hex'),
+                                   desc(obj.co_consts), desc(obj.co_names))
+    if isinstance(obj, types.FunctionType):
+        closure = [cell.cell_contents for cell in obj.func_closure or ()]
+        return "function(%s.%s,%s,%s,%s)" % (
+            obj.__module__, obj.__name__, desc(obj.func_code),
+            desc(obj.func_defaults), desc(closure))
+    if isinstance(obj, types.MethodType):
+        return "method(%s,%s)" % (desc(obj.im_func), desc(obj.im_self))
+    if inspect.isgenerator(obj):
+        origin = arbitrary_origin(obj)
+        if origin is not None:
+            return "arbitrary(%s)" % ",".join(map(desc, origin))
+        code = obj.gi_code
+        frame_locals = obj.gi_frame.f_locals if obj.gi_frame else {}
+        args = [frame_locals.get(name)
+                for name in code.co_varnames[:code.co_argcount]]
+        return "generator(%s,%s)" % (desc(code), desc(args))
+
+    # objects without custom representation are described by their
+    # attributes; others fall back to representation, which may
+    # or may not be stable between runs
+    if type(obj).__repr__ is object.__repr__ and hasattr(obj, '__dict__'):
+        return "%s(%s)" % (desc(type(obj)), desc(vars(obj)))
+    return "%s(%r)" % (desc(type(obj)), obj)
@@ -0,0 +1,198 @@
+"""
+Discovery of properties within modules and packages,
+and splitting them into shards.
+"""
+import fnmatch
+import hashlib
+import inspect
+import os
+import pkgutil
+import sys
+
+from pyqcy.integration import TestCase
+from pyqcy.properties import Property
+
+
+__all__ = ['discover', 'shard']
+
+
+def discover(*targets, **kwargs):
+    """Finds all properties defined within given modules,
+    packages (recursively) or directories.
+
+    :param targets: Names of modules or packages, or paths to files
+                    or directories. Directories that are not packages
+                    are searched for packages and modules whose name
+                    matches ``pattern``.
+    :param pattern: Pattern for names of modules to look for
+                    in directories. By default, it's ``'test*'``.
+
+    Properties are also found inside :class:`TestCase` subclasses.
+    Every module is imported only once, even if it's already been loaded
+    under a different name (e.g. as ``__main__``), and properties
+    which are imported by other modules are only found once as well.
+    Properties in a :func:`property_group` are found individually,
+    rather than as the group.
+
+    :return: List of (name, property) tuples, where name is a qualified
+             name of the property. The list is sorted by name.
+    """
+    pattern = kwargs.pop('pattern', 'test*')
+    if kwargs:
+        raise TypeError("unexpected keyword arguments: %s" %
+                        ", ".join(kwargs))
+
+    modules = []
+    for target in targets or ['.']:
+        if os.path.exists(target):
+            modules.extend(_modules_at_path(target, pattern))
+        else:
+            modules.extend(_modules_in_package(_import(target)))
+
+    # properties imported from elsewhere are named after
+    # the module they are defined in, if it's been found too
+    found = {}
+    for module in modules:
+        for name, prop in _properties_in_module(module):
+            if (id(prop) not in found or
+                    prop.func.__module__ == module.__name__):
+                found[id(prop)] = (name, prop)
+    return sorted(found.itervalues(), key=lambda (name, _): name)
+
+
+def _properties_in_module(module):
+    """Yields qualified names and properties defined in given module,
+    including those inside :class:`TestCase` subclasses.
+    """
+    for name, obj in vars(module).items():
+        if isinstance(obj, Property):
+            yield "%s.%s" % (module.__name__, name), obj
+        elif (inspect.isclass(obj) and issubclass(obj, TestCase)
+                and obj is not TestCase):
+            for attr, value in vars(obj).items():
+                if isinstance(value, Property):
+                    yield "%s.%s.%s" % (obj.__module__, name, attr), value
+
+
+def _modules_in_package(module):
+    """Returns a list containing given module and, if it's a package,
+    all of its modules and subpackages (recursively).
+    """
+    modules = [module]
+    if hasattr(module, '__path__'):
+        prefix = module.__name__ + '.'
+        for _, name, _ in pkgutil.walk_packages(module.__path__, prefix):
+            modules.append(_import(name))
+    return modules
+
+
+def _modules_at_path(path, pattern):
+    """Returns a list of modules from given file or directory."""
+    path = os.path.abspath(path)
+    if os.path.isfile(path):
+        return [_import(_module_name(path))]
+
+    if os.path.isfile(os.path.join(path, '__init__.py')):
+        return _modules_in_package(_import(_module_name(path)))
+
+    modules = []
+    for entry in sorted(os.listdir(path)):
+        entry_path = os.path.join(path, entry)
+        name, ext = os.path.splitext(entry)
+        if os.path.isdir(entry_path):
+            modules.extend(_modules_at_path(entry_path, pattern))
+        elif ext == '.py' and fnmatch.fnmatch(name, pattern):
+            modules.append(_import(_module_name(entry_path)))
+    return modules
+
+
+def _module_name(path):
+    """Determines the full name of module at given path,
+    and makes sure it can be imported under that name.
+    """
+    path = os.path.splitext(path)[0]
+    if os.path.basename(path) == '__init__':
+        path = os.path.dirname(path)
+
+    parts = [os.path.basename(path)]
+    root = os.path.dirname(path)
+    while os.path.isfile(os.path.join(root, '__init__.py')):
+        parts.insert(0, os.path.basename(root))
+        root = os.path.dirname(root)
+
+    if root not in map(os.path.abspath, sys.path):
+        sys.path.insert(0, root)
+    return '.'.join(parts)
+
+
+def _import(name):
+    """Imports module of given name, unless it has already been loaded
+    from the same file under a different name.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    try:
+        path = _module_file(pkgutil.get_loader(name).get_filename())
+    except (AttributeError, ImportError):
+        path = None
+    if path is not None:
+        for module in sys.modules.values():
+            if _module_file(getattr(module, '__file__', None)) == path:
+                return module
+
+    __import__(name)
+    return sys.modules[name]
+
+
+def _module_file(filename):
+    """Normalizes the filename of a module, so that
+    its source and compiled files can be compared.
+    """
+    if not filename:
+        return None
+    filename = os.path.abspath(filename)
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    return filename
+
+
+def shard(props, index, count, durations=None):
+    """Selects the properties that belong to given shard,
+    when properties are split between ``count`` shards.
+
+    The split is deterministic, so every shard can compute it independently
+    and all of them together cover every property exactly once.
+
+    :param props: List of (name, property) tuples, e.g. from :func:`discover`
+    :param index: Index of the shard, from 1 to ``count``
+    :param count: Total number of shards
+    :param durations: Optional dictionary mapping property names to
+                      the time it took to check them, in seconds.
+                      If provided, properties are distributed so that
+                      shards take similar time to run.
+
+    :return: List of (name, property) tuples in given shard
+    """
+    if not (1 <= index <= count):
+        raise ValueError("shard index must be between 1 and %s" % count)
+
+    if not durations:
+        def shard_of(name):
+            return int(hashlib.md5(name).hexdigest(), 16) % count
+        return [(name, prop) for name, prop in props
+                if shard_of(name) == index - 1]
+
+    # assign the longest running properties first, each one
+    # to the shard which is the least loaded at that time
+    default = sum(durations.itervalues()) / len(durations)
+    duration = lambda name: durations.get(name, default)
+    loads = [(0.0, i) for i in xrange(count)]
+    selected = []
+    for name, prop in sorted(props, key=lambda (n, _): (-duration(n), n)):
+        load, i = min(loads)
+        loads[i] = (load + duration(name), i)
+        if i == index - 1:
+            selected.append((name, prop))
+    return sorted(selected, key=lambda (name, _): name)
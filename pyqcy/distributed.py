@@ -0,0 +1,342 @@
+"""
+Distributed checking of properties by workers
+running on many machines.
+
+Test cases of every property are split into *work units*,
+each covering a range of test cases. Since every block of test cases
+has its own seed for random number generator, derived from the seed
+of the whole run, test data doesn't depend on how the test cases
+are split into units, or which worker executes them. The coordinator
+hands the units out to workers connected over TCP, reassigns units
+of workers that have died, and reports the results just like
+:func:`run_tests` would.
+
+Properties are never checked exhaustively (or adaptively) though,
+and ``unique`` ones only skip inputs that are duplicate within
+a single work unit.
+
+.. warning::
+
+   Messages are exchanged as pickles, so the coordinator and workers
+   should only ever be run within a trusted network.
+"""
+import cPickle as pickle
+import Queue
+import random
+import socket
+import struct
+import threading
+import time
+import traceback
+
+from pyqcy.results import CheckResults, TestResult
+from pyqcy.runner import report_results
+
+
+__all__ = ['Coordinator', 'work']
+
+
+class RemoteError(Exception):
+    """Exception that has failed a test case executed by remote worker."""
+
+    def __init__(self, type_name, text, traceback_text):
+        super(RemoteError, self).__init__(type_name, text)
+        self.type_name = type_name
+        self.text = text
+        self.traceback_text = traceback_text
+
+    def __str__(self):
+        return "%s: %s\nRemote traceback:\n%s" % (
+            self.type_name, self.text, self.traceback_text.rstrip())
+
+
+class Coordinator(object):
+    """Coordinator of distributed checking of properties.
+
+    :param props: List of (name, property) tuples to check,
+                  e.g. as returned by :func:`discover`.
+                  Workers should have the same properties available.
+    :param address: Tuple of (host, port) to listen on for workers
+    :param seed: Seed that all test data is derived from.
+                 If omitted, a random one is chosen.
+    :param unit_size: Number of test cases in a single work unit
+    :param timeout: Time (in seconds) after which a worker
+                    that hasn't finished its unit is considered dead
+    """
+    def __init__(self, props, address=('', 0), seed=None, unit_size=1000,
+                 timeout=600):
+        self.props = props
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.unit_size = unit_size
+        self.timeout = timeout
+
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(address)
+        self.server.listen(16)
+
+    @property
+    def address(self):
+        """Address that the coordinator is listening on."""
+        return self.server.getsockname()
+
+    def run(self, verbosity=1, reporters=()):
+        """Hands out work units to workers until all properties
+        have been checked, reporting their results as they are completed.
+
+        :param reporters: :class:`Reporter`\ s to notify about every
+                          property. As its duration, they are given
+                          the time since the previous property
+                          has been reported (or checking has started).
+        :return: Whether all the tests have passed
+        """
+        self.__units = Queue.Queue()
+        self.__done = Queue.Queue()
+        self.__finished = threading.Event()
+
+        pending = {}
+        for name, prop in self.props:
+            total = prop.tests_count
+            starts = range(0, total, self.unit_size)
+            for start in starts:
+                count = min(self.unit_size, total - start)
+                self.__units.put((name, start, count, total))
+            pending[name] = len(starts)
+
+        acceptor = threading.Thread(target=self.__accept_workers)
+        acceptor.daemon = True
+        acceptor.start()
+
+        success = True
+        results = dict((name, {}) for name, _ in self.props)
+        to_report = list(self.props)
+        last_report = time.time()
+        try:
+            while to_report:
+                try:
+                    # (timeout keeps the main thread interruptible)
+                    unit, unit_results = self.__done.get(timeout=1)
+                except Queue.Empty:
+                    continue
+                name, start, _, _ = unit
+                results[name][start] = unit_results
+                pending[name] -= 1
+
+                while to_report and pending[to_report[0][0]] == 0:
+                    name, prop = to_report.pop(0)
+                    prop_results = _merge(
+                        unit_results for _, unit_results
+                        in sorted(results.pop(name).items()))
+                    prop_results.seed = self.seed
+
+                    now = time.time()
+                    for reporter in reporters:
+                        reporter.report(prop, prop_results, now - last_report)
+                    last_report = now
+                    success &= report_results(prop, prop_results, verbosity)
+        finally:
+            self.__finished.set()
+            acceptor.join()
+            self.server.close()
+
+        return success
+
+    def __accept_workers(self):
+        """Accepts connections from workers,
+        serving every one of them in a separate thread.
+        """
+        self.server.settimeout(0.5)
+        while not self.__finished.is_set():
+            try:
+                conn, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            handler = threading.Thread(target=self.__serve_worker,
+                                       args=(conn,))
+            handler.daemon = True
+            handler.start()
+
+    def __serve_worker(self, conn):
+        """Hands out work units to a single worker.
+        If the worker dies, its current unit is handed to another one.
+        """
+        conn.setblocking(True)
+        conn.settimeout(self.timeout)
+        try:
+            while not self.__finished.is_set():
+                try:
+                    unit = self.__units.get(timeout=0.1)
+                except Queue.Empty:
+                    continue
+
+                name, start, count, total = unit
+                try:
+                    send_message(conn, ('unit', name, start, count, total,
+                                        self.seed))
+                    reply = recv_message(conn)
+                except (socket.error, EOFError):
+                    self.__units.put(unit)
+                    return
+                self.__done.put((unit, self.__unit_results(reply)))
+
+            send_message(conn, ('stop',))
+        except socket.error:
+            pass
+        finally:
+            conn.close()
+
+    def __unit_results(self, reply):
+        """Converts worker's reply into :class:`CheckResults`."""
+        results = CheckResults()
+        if reply[0] == 'error':
+            result = TestResult({})
+            result.exception = RemoteError(*reply[1:])
+            result.traceback = None
+            results.append(result)
+            return results
+
+        _, serialized, statistics = reply
+        for attr, value in statistics.iteritems():
+            setattr(results, attr, value)
+        for tags, replay_token, failure in serialized:
+            result = TestResult({})
+            result.tags = tags
+            result.replay_token = replay_token
+            if failure is not None:
+                data, type_name, message, traceback_text = failure
+                result.data = dict((k, _Repr(v))
+                                   for k, v in data.iteritems())
+                result.exception = RemoteError(type_name, message,
+                                               traceback_text)
+                result.traceback = None
+            results.append(result)
+        return results
+
+
+def work(address, props, connect_timeout=30):
+    """Works on units handed out by the coordinator at given address,
+    until it tells the worker to stop or goes away.
+
+    :param address: Tuple of (host, port) of the coordinator
+    :param props: List of (name, property) tuples, e.g. as returned
+                  by :func:`discover`; should be the same as coordinator's
+    :param connect_timeout: Time (in seconds) to keep trying to connect
+                            to the coordinator, if it's not up yet
+    """
+    props = dict(props)
+
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection(address)
+            break
+        except socket.error:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.5)
+
+    try:
+        while True:
+            try:
+                message = recv_message(sock)
+            except EOFError:
+                break
+            if message[0] == 'stop':
+                break
+
+            _, name, start, count, total, seed = message
+            prop = props.get(name)
+            if prop is None:
+                send_message(sock, ('error', 'LookupError',
+                                    "unknown property: %s" % name, ''))
+                continue
+
+            # errors which aren't failures of test cases (like generators
+            # unable to generate test data) are reported to the coordinator,
+            # since another worker would run into them as well
+            try:
+                results = prop.check(count, seed=seed, start=start,
+                                     total=total)
+            except Exception as e:
+                send_message(sock, ('error', type(e).__name__, str(e),
+                                    traceback.format_exc()))
+                continue
+            statistics = dict((attr, getattr(results, attr))
+                              for attr in _MERGED_STATISTICS)
+            send_message(sock, ('results', map(_serialize_result, results),
+                                statistics))
+    finally:
+        sock.close()
+
+
+#: Attributes of :class:`CheckResults` of work units
+#: that are merged into results of the whole property
+_MERGED_STATISTICS = ('duplicates', 'discards', 'disk_written', 'disk_peak')
+
+
+def _merge(units_results):
+    """Merges :class:`CheckResults` of consecutive work units
+    into results of the whole property.
+    """
+    merged = CheckResults()
+    for results in units_results:
+        merged.extend(results)
+        merged.duplicates += results.duplicates
+        merged.discards += results.discards
+        merged.disk_written += results.disk_written
+        merged.disk_peak = max(merged.disk_peak, results.disk_peak)
+    return merged
+
+
+def _serialize_result(result):
+    """Converts :class:`TestResult` into a tuple of
+    (tags, replay token, failure) that can be sent to the coordinator.
+    """
+    if result.succeeded:
+        return result.tags, result.replay_token, None
+
+    exc = result.exception
+    traceback_text = ''.join(traceback.format_exception(
+        type(exc), exc, result.traceback))
+    data = dict((k, repr(v)) for k, v in result.data.iteritems())
+    return result.tags, result.replay_token, (data, type(exc).__name__,
+                                              str(exc), traceback_text)
+
+
+class _Repr(str):
+    """String which is its own representation,
+    for displaying test data received from workers.
+    """
+    def __repr__(self):
+        return self
+
+
+# Messages
+
+HEADER = struct.Struct('!I')
+
+
+def send_message(sock, message):
+    """Sends a message through given socket."""
+    payload = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    """Receives a message from given socket.
+    Raises :exc:`EOFError` if the connection has been closed.
+    """
+    size, = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    return pickle.loads(_recv_exactly(sock, size))
+
+
+def _recv_exactly(sock, size):
+    """Receives exactly given number of bytes from a socket."""
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return ''.join(chunks)
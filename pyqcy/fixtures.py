@@ -0,0 +1,194 @@
+"""
+Fixtures, i.e. resources used by properties
+that are not generated as test data.
+"""
+from contextlib import contextmanager
+import inspect
+import sys
+import threading
+
+from pyqcy.utils import optional_args
+
+
+__all__ = ['fixture']
+
+
+#: Scopes that a fixture can have, i.e. how often it is set up
+SCOPES = ('case', 'property', 'worker')
+
+
+@optional_args
+class fixture(object):
+    """Decorator for functions that set up resources
+    needed by test properties, like database connections
+    or temporary directories.
+
+    :param scope: How often the resource is set up:
+
+                  * ``'case'`` - anew for every test case (default)
+                  * ``'property'`` - once for every check of a property
+                  * ``'worker'`` - once for every thread executing
+                    test cases of the property
+                    (see the ``threads`` argument of :func:`qc`)
+
+    :param reset: Optional function which is called with the resource
+                  after every test case that has used it. It allows
+                  to restore the resource to a pristine state
+                  when it's not set up anew for every test case.
+
+    The decorated function can either return the resource or ``yield``
+    it, in which case the code after ``yield`` will be executed
+    to tear the resource down. Fixtures are used by specifying them
+    as default values for property arguments, just like generators::
+
+        @fixture(scope='property', reset=lambda conn: conn.rollback())
+        def database():
+            conn = sqlite3.connect(':memory:')
+            create_schema(conn)
+            yield conn
+            conn.close()
+
+        @qc
+        def inserted_user_can_be_found(db=database, login=str_()):
+            insert_user(db, login)
+            assert find_user(db, login) is not None
+    """
+    def __init__(self, scope='case', reset=None):
+        if scope not in SCOPES:
+            raise ValueError("invalid fixture scope: %r (expected one of: %s)"
+                             % (scope, ", ".join(SCOPES)))
+        if reset is not None and not callable(reset):
+            raise TypeError("reset hook must be callable")
+        self.scope = scope
+        self.reset = reset
+
+    def __call__(self, func):
+        """Applies the @fixture decorator to given function."""
+        return Fixture(func, scope=self.scope, reset=self.reset)
+
+
+class Fixture(object):
+    """A resource that can be provided to properties."""
+
+    def __init__(self, func, scope='case', reset=None):
+        self.func = func
+        self.scope = scope
+        self.reset = reset
+
+    def setup(self):
+        """Sets up the resource.
+        :return: Tuple of (resource, teardown function or None)
+        """
+        if not inspect.isgeneratorfunction(self.func):
+            return self.func(), None
+
+        gen = self.func()
+        resource = next(gen)
+
+        def teardown():
+            try:
+                next(gen)
+            except StopIteration:
+                return
+            raise RuntimeError(
+                "fixture %s yielded more than once" % self.func.__name__)
+        return resource, teardown
+
+    def __repr__(self):
+        return "<fixture %s (scope: %s)>" % (self.func.__name__, self.scope)
+
+
+class FixtureSession(object):
+    """Keeps track of fixture resources set up
+    while checking a single property.
+
+    Resources with ``'property'`` scope are set up upon entering
+    the session (as context manager), while ``'worker'`` ones
+    are set up lazily by every thread that executes test cases.
+    All of them are torn down when the session is exited.
+    """
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.__shared = {}
+        self.__local = threading.local()
+        self.__teardowns = []
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        try:
+            for name, fixture in self.fixtures.iteritems():
+                if fixture.scope == 'property':
+                    self.__shared[name] = self.__setup(fixture)
+        except:
+            # resources set up so far are torn down, as the session
+            # won't be exited; it's the setup error that is propagated
+            exc_info = sys.exc_info()
+            try:
+                self.__tear_down()
+            except Exception:
+                pass
+            raise exc_info[0], exc_info[1], exc_info[2]
+        return self
+
+    def __exit__(self, *exc_info):
+        self.__tear_down()
+
+    def __tear_down(self):
+        """Tears down all the long-lived resources, even if some
+        of the teardowns fail. The first error is re-raised afterwards.
+        """
+        error = None
+        while self.__teardowns:
+            teardown = self.__teardowns.pop()
+            try:
+                teardown()
+            except:
+                if error is None:
+                    error = sys.exc_info()
+        if error is not None:
+            raise error[0], error[1], error[2]
+
+    def __setup(self, fixture):
+        """Sets up a long-lived resource, remembering to tear it down
+        when the session ends.
+        """
+        resource, teardown = fixture.setup()
+        if teardown is not None:
+            with self.__lock:
+                self.__teardowns.append(teardown)
+        return resource
+
+    def __worker_resources(self):
+        """Returns the dictionary of worker-scoped resources
+        for current thread, setting them up if necessary.
+        """
+        resources = getattr(self.__local, 'resources', None)
+        if resources is None:
+            resources = self.__local.resources = dict(
+                (name, self.__setup(fixture))
+                for name, fixture in self.fixtures.iteritems()
+                if fixture.scope == 'worker')
+        return resources
+
+    @contextmanager
+    def case(self):
+        """Provides resources for a single test case
+        as a dictionary mapping argument names to them.
+        """
+        resources = dict(self.__shared)
+        resources.update(self.__worker_resources())
+
+        teardowns = []
+        try:
+            for name, fixture in self.fixtures.iteritems():
+                if fixture.scope == 'case':
+                    resources[name], teardown = fixture.setup()
+                    if teardown is not None:
+                        teardowns.append(teardown)
+            yield resources
+        finally:
+            while teardowns:
+                teardowns.pop()()
+            for name, fixture in self.fixtures.iteritems():
+                if fixture.scope != 'case' and fixture.reset is not None:
+                    fixture.reset(resources[name])
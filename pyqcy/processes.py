@@ -0,0 +1,239 @@
+"""
+Generation of test data in a pool of worker processes,
+which hand large values back through shared memory.
+"""
+from __future__ import absolute_import
+
+import array
+import collections
+import cPickle as pickle
+import glob
+import itertools
+import mmap
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from cStringIO import StringIO
+
+from pyqcy.arbitraries import discard, discard_count
+
+
+__all__ = []
+
+
+#: Size (in bytes) of strings, bytearrays and arrays which are passed
+#: through shared memory, rather than pickled along with the rest of data
+SHARED_MIN_SIZE = 1 << 16
+
+
+def dump_shared(obj, prefix='pyqcy-'):
+    """Pickles given object, except for large strings, bytearrays
+    and arrays within it, which are written to a file in shared memory.
+
+    :param prefix: Prefix of the name of the file
+    :return: Tuple of (pickle, path of the file), where the path
+             is ``None`` if there was nothing large enough to share
+    """
+    buffers = []
+    offset = [0]
+
+    def persistent_id(value):
+        cls = type(value)
+        if cls is str or cls is bytearray:
+            length = len(value)
+            typecode = None
+        elif cls is array.array:
+            length = len(value) * value.itemsize
+            typecode = value.typecode
+        else:
+            return None
+        if length < SHARED_MIN_SIZE:
+            return None
+        buffers.append(value)
+        pid = (cls.__name__, offset[0], length, typecode)
+        offset[0] += length
+        return pid
+
+    stream = StringIO()
+    pickler = pickle.Pickler(stream, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = persistent_id
+    pickler.dump(obj)
+    if not buffers:
+        return stream.getvalue(), None
+
+    fd, path = tempfile.mkstemp(prefix=prefix, dir=_shared_memory_dir())
+    with os.fdopen(fd, 'wb') as f:
+        for buf in buffers:
+            f.write(buffer(buf))
+    return stream.getvalue(), path
+
+
+def load_shared(payload, path):
+    """Unpickles an object pickled by :func:`dump_shared`,
+    removing the file in shared memory afterwards.
+    """
+    if path is None:
+        return pickle.loads(payload)
+
+    try:
+        with open(path, 'rb') as f:
+            memory = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        os.unlink(path)
+
+    def persistent_load((kind, start, length, typecode)):
+        chunk = memory[start:start + length]
+        if kind == 'str':
+            return chunk
+        if kind == 'bytearray':
+            return bytearray(chunk)
+        value = array.array(typecode)
+        value.fromstring(chunk)
+        return value
+
+    try:
+        unpickler = pickle.Unpickler(StringIO(payload))
+        unpickler.persistent_load = persistent_load
+        return unpickler.load()
+    finally:
+        memory.close()
+
+
+def _shared_memory_dir():
+    """Returns the directory where files in shared memory can be created,
+    falling back to the one for temporary files if there's none.
+    """
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+class GeneratorPool(object):
+    """Pool of processes which generate test data for given test cases,
+    keeping at most ``depth`` of them (but at least a chunk for every
+    process) generated ahead of the one taken.
+
+    Worker processes are forked, so ``next_data`` (a function returning
+    test data of the test case with given index) is inherited by them
+    rather than pickled. It should seed the random number generator
+    for every test case (or every ``chunk`` of them, whose indexes start
+    at a multiple of ``chunk``), so that its data doesn't depend
+    on the process it's been generated in. Every chunk of test cases
+    is generated by a single process.
+    """
+    def __init__(self, next_data, cases, processes, depth, chunk=1):
+        self.execution_blocked = 0.0    # seconds waiting for data
+
+        # (files in shared memory are named after the pool, so that
+        # those of workers terminated in the middle of a chunk can be found)
+        self.__prefix = 'pyqcy-%d-%d-' % (os.getpid(), next(_pool_ids))
+        self.__pool = multiprocessing.Pool(processes, _init_worker,
+                                           (next_data, self.__prefix))
+        self.__chunks = (list(chunk_cases) for _, chunk_cases
+                         in itertools.groupby(cases, lambda i: i // chunk))
+        self.__pending = collections.deque()
+        self.__taken = collections.deque()  # generated data of a chunk
+        for _ in xrange(max(processes, -(-depth // chunk))):
+            self.__submit()
+
+    def __submit(self):
+        chunk_cases = next(self.__chunks, None)
+        if chunk_cases is not None:
+            self.__pending.append(
+                self.__pool.apply_async(_generate, (chunk_cases,)))
+
+    def next_data(self, index=None):
+        """Returns test data of the next test case, or ``None``
+        if there are no more test cases.
+
+        Exceptions raised while generating the data are re-raised here,
+        although without their original tracebacks.
+        """
+        if not self.__taken:
+            if not self.__pending:
+                return None
+            pending = self.__pending.popleft()
+            self.__submit()
+            if not pending.ready():
+                started = time.time()
+                pending.wait()
+                self.execution_blocked += time.time() - started
+            self.__taken.extend(pending.get())
+
+        payload, path, discards = self.__taken.popleft()
+        if discards:
+            discard(discards)
+        return load_shared(payload, path)
+
+    def close(self):
+        """Stops the worker processes, discarding test data
+        which has been generated but not taken.
+
+        Workers still generating test data are terminated
+        rather than waited for, as generating it may take long
+        (or never finish).
+        """
+        finished = True
+        while self.__pending:
+            pending = self.__pending.popleft()
+            if not pending.ready():
+                finished = False
+            elif pending.successful():
+                self.__taken.extend(pending.get())
+        while self.__taken:
+            _, path, _ = self.__taken.popleft()
+            if path is not None:
+                os.unlink(path)
+
+        if finished:
+            self.__pool.close()
+        else:
+            self.__pool.terminate()
+        self.__pool.join()
+        for path in glob.glob(os.path.join(
+                _shared_memory_dir() or tempfile.gettempdir(),
+                self.__prefix + '*')):
+            os.unlink(path)
+
+
+_pool_ids = itertools.count()
+
+
+# Worker processes
+
+_next_data = None
+_prefix = None
+
+
+def _init_worker(next_data, prefix):
+    global _next_data, _prefix
+    _next_data, _prefix = next_data, prefix
+    # interrupting is handled by the parent process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _generate(indexes):
+    """Generates test data for test cases of given indexes.
+    :return: List of tuples of (pickle, path of the file in shared memory,
+             number of generated values discarded meanwhile),
+             for every test case
+    """
+    generated = []
+    try:
+        for index in indexes:
+            discards = discard_count()
+            data = _next_data(index)
+            if data.cleanups:
+                while data.cleanups:
+                    data.cleanups.pop()()
+                raise ValueError("test data holding resources (like "
+                                 "temporary files) cannot be generated "
+                                 "in other processes")
+            payload, path = dump_shared(data, _prefix)
+            generated.append((payload, path, discard_count() - discards))
+    except Exception:
+        for _, path, _ in generated:
+            if path is not None:
+                os.unlink(path)
+        raise
+    return generated
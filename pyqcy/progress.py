@@ -0,0 +1,201 @@
+"""
+Progress of long test runs, reported periodically
+as it happens rather than once properties have been checked.
+"""
+from __future__ import absolute_import
+
+import datetime
+import os
+import sys
+import threading
+import time
+
+
+__all__ = ['ProgressMonitor']
+
+
+class Progress(object):
+    """Progress of checking properties within the current process.
+
+    Properties update it as they are checked, which costs them
+    a single increment of :attr:`done` per test case; everything else
+    is computed only when somebody looks at the progress.
+    """
+    def __init__(self):
+        self.name = None        # of the property being checked
+        self.planned = 0        # test cases of the current property
+        self.done = 0           # test cases executed of the current property
+        self.started = None     # time when checking the property has started
+
+        self.finished_cases = 0     # of properties that are done
+        self.passed = 0             # properties
+        self.failed = 0             # properties
+
+    def start(self, prop, planned):
+        """Marks the beginning of checking given property
+        with at most ``planned`` test cases.
+        """
+        self.name = prop.func.__name__
+        self.planned = planned
+        self.done = 0
+        self.started = time.time()
+
+    def finish(self, results):
+        """Marks the end of checking the current property,
+        with given list of :class:`TestResult`\ s.
+        """
+        self.finished_cases += self.done
+        self.done = 0
+        self.name = None
+        # (rather than calling TestResult.succeeded for every test case)
+        if all([r.exception is None for r in results]):
+            self.passed += 1
+        else:
+            self.failed += 1
+
+    @property
+    def cases(self):
+        """Total number of test cases executed so far."""
+        return self.finished_cases + self.done
+
+    def eta(self):
+        """Estimates the time (in seconds) until checking
+        the current property is finished, or returns ``None``.
+        """
+        if self.name is None or not self.done:
+            return None
+        elapsed = time.time() - self.started
+        return (self.planned - self.done) * elapsed / self.done
+
+
+#: Progress of checking properties within this process
+progress = Progress()
+
+
+class ProgressMonitor(object):
+    """Context manager which reports the :data:`progress` of checking
+    properties periodically, from a background thread, while its block
+    is being executed::
+
+        with ProgressMonitor(interval=30, metrics_file='pyqcy.prom'):
+            run_tests(props)
+
+    :param interval: Time (in seconds) between reports
+    :param stream: File object to print the current property, number
+                   of its test cases executed so far, throughput and
+                   estimated time of finishing it to. If ``None``,
+                   nothing is printed.
+    :param metrics_file: Optional path to a file to periodically (over)write
+                         with metrics in the text format of Prometheus,
+                         e.g. for the textfile collector of node exporter
+    """
+    def __init__(self, interval=10, stream=sys.stderr, metrics_file=None):
+        if not (interval > 0):
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.stream = stream
+        self.metrics_file = metrics_file
+
+        self.rate = 0.0     # test cases per second, within the last interval
+        self.__last = None
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+    def __enter__(self):
+        self.__last = (time.time(), progress.cases)
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__monitor)
+        self.__thread.daemon = True
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.__stopped.set()
+        self.__thread.join()
+        self.update(final=True)
+
+    def __monitor(self):
+        while not self.__stopped.wait(self.interval):
+            self.update()
+
+    def update(self, final=False):
+        """Reports the current progress, and writes the metrics file."""
+        now, cases = time.time(), progress.cases
+        last_time, last_cases = self.__last
+        if now > last_time:
+            self.rate = (cases - last_cases) / (now - last_time)
+        self.__last = (now, cases)
+
+        if self.stream is not None and not final:
+            line = self.format_progress()
+            if line:
+                print >>self.stream, line
+                self.stream.flush()
+        if self.metrics_file:
+            self.write_metrics()
+
+    def format_progress(self):
+        """Returns a line describing the progress of checking
+        the current property, or ``None`` if there's none.
+        """
+        name, done, planned = progress.name, progress.done, progress.planned
+        if name is None:
+            return None
+        line = "%s: %s/%s test cases (%.1f/s" % (name, done, planned,
+                                                 self.rate)
+        eta = progress.eta()
+        if eta is not None:
+            line += ", ETA %s" % datetime.timedelta(seconds=int(eta))
+        return line + ")"
+
+    def write_metrics(self):
+        """Writes the metrics file, replacing it atomically
+        so that it's never read half-written.
+        """
+        metrics = [
+            ('cases_total', 'counter',
+             "Number of test cases executed.", [('', progress.cases)]),
+            ('cases_per_second', 'gauge',
+             "Test cases executed per second, recently.",
+             [('', self.rate)]),
+            ('properties_total', 'counter',
+             "Number of properties checked.",
+             [('{result="passed"}', progress.passed),
+              ('{result="failed"}', progress.failed)]),
+            ('last_update_timestamp_seconds', 'gauge',
+             "Time of the last update of these metrics.",
+             [('', time.time())]),
+        ]
+        name = progress.name
+        if name is not None:
+            label = '{property="%s"}' % _escape_label(name)
+            metrics.extend([
+                ('property_cases_done', 'gauge',
+                 "Test cases executed of the property being checked.",
+                 [(label, progress.done)]),
+                ('property_cases_planned', 'gauge',
+                 "Test cases planned for the property being checked.",
+                 [(label, progress.planned)]),
+            ])
+
+        lines = []
+        for metric, metric_type, help_text, samples in metrics:
+            metric = 'pyqcy_' + metric
+            lines.append("# HELP %s %s" % (metric, help_text))
+            lines.append("# TYPE %s %s" % (metric, metric_type))
+            lines.extend("%s%s %s" % (metric, labels, _format_value(value))
+                         for labels, value in samples)
+
+        temp_path = '%s.%s.tmp' % (self.metrics_file, os.getpid())
+        with open(temp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.rename(temp_path, self.metrics_file)
+
+
+def _escape_label(value):
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
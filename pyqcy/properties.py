@@ -2,17 +2,48 @@
 Properties to be tested.
 Also known as "tests".
 """
+import copy
 import inspect
 import functools
+import hashlib
+import itertools
+import math
+import os
+import pickle
+import Queue
+import random
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 
-from pyqcy.arbitraries import arbitrary, is_arbitrary, to_arbitrary
-from pyqcy.results import TestResult
-from pyqcy.statistics import Tag
-from pyqcy.utils import optional_args
+from pyqcy.arbitraries import (arbitrary, is_arbitrary, to_arbitrary,
+                               discard, discard_count, generating_cases,
+                               MAX_SIZE)
+from pyqcy.arbitraries.boundaries import boundaries, combinations
+from pyqcy.arbitraries.enumeration import Enumeration, enumeration, product
+from pyqcy.arbitraries.files import disk_limit, disk_usage
+from pyqcy.cache import describe
+from pyqcy.fixtures import Fixture, FixtureSession
+from pyqcy.processes import GeneratorPool
+from pyqcy.progress import progress
+from pyqcy.results import CheckResults, TestResult
+from pyqcy.statistics import Tag, tags_distance, tests_for_confidence
+from pyqcy.utils import SeenSet, derive_seed, optional_args
 
 
-__all__ = ['qc']
+__all__ = ['qc', 'property_group']
+
+
+#: Number of tests after which adaptive checking first considers stopping
+FIRST_CHECKPOINT = 100
+
+#: Number of consecutive test cases whose data is generated together,
+#: seeding the random number generator once for all of them.
+#: (It divides :data:`FIRST_CHECKPOINT`, so adaptive checking
+#: never stops in the middle of a block.)
+SEEDING_BLOCK = 20
 
 
 @optional_args
@@ -33,9 +64,86 @@ class qc(object):
         ):
             assert len(l) == l.__len__()
 
+    Properties whose test cases spend most of their time waiting
+    on I/O (e.g. database or filesystem access) can have them executed
+    concurrently by a pool of threads::
+
+        @qc(threads=16)
+        def record_roundtrips(rec=data({'id': int, 'name': str})):
+            db.save(rec)
+            assert db.load(rec['id']) == rec
+
+    Test data is still generated on the main thread, so generators
+    don't have to be thread-safe; only the property function has to be.
+
+    Conversely, when generating test data takes about as long as checking
+    it (and either of them releases the GIL, e.g. in NumPy or I/O),
+    test data can be generated by a background thread, up to ``prefetch``
+    test cases ahead of the one being executed::
+
+        @qc(prefetch=8)
+        def compression_roundtrips(f=binary_file(max_size=1 << 24)):
+            assert decompress(compress(f.read())) == f.read()
+
+    Time that generation and execution spent waiting for each other is
+    reported, telling which of them limits the speed of checking.
+    Since generators use the global random number generator, properties
+    which use it as well would make their test data irreproducible,
+    and shouldn't be prefetched.
+
+    If generating test data takes longer than checking it, and doesn't
+    release the GIL (like with :func:`regex` or deeply nested :func:`data`),
+    it can be done by a pool of forked ``processes`` instead::
+
+        @qc(processes=4)
+        def parser_accepts_queries(q=regex(QUERY_PATTERN)):
+            parse_query(q)
+
+    Test data is then pickled, except for large strings, bytearrays and
+    arrays which are passed through shared memory, and is the same as if
+    it was generated in a single process. It cannot hold resources that
+    would need releasing, like temporary files, though.
+
+    Resources which are expensive to set up can be provided
+    through :func:`fixture`\ s. If test cases modify such resources,
+    passing ``fork=True`` makes every test case run in a forked
+    child process, operating on a copy-on-write snapshot of all the
+    resources prepared beforehand.
+
+    Instead of a fixed number of ``tests``, the required ``confidence``
+    in the property can be given, along with the ``failure_rate``
+    that tests should rule out::
+
+        @qc(confidence=0.99, failure_rate=0.001)
+        def parse_inverts_format(d=data({'id': int, 'tags': [str]})):
+            assert parse(format(d)) == d
+
+    The property is then checked with as many tests as needed to be
+    99% confident that less than 0.1% of test cases would fail (4603),
+    or fewer if the distribution of tags it yields stops changing.
+    If ``tests`` are given as well, they limit the number of tests.
+
+    Properties over small domains can pass ``unique=True``
+    to have inputs which have already been tested skipped::
+
+        @qc(unique=True)
+        def weekday_names_roundtrip(day=int_(min=0, max=6)):
+            assert day_number(day_name(day)) == day
+
+    If untested inputs cannot be found anymore, the domain is considered
+    exhausted and checking stops, even before reaching the number of tests.
     """
-    def __init__(self, tests=None):
+    def __init__(self, tests=None, threads=None, fork=False,
+                 confidence=None, failure_rate=None, unique=False,
+                 prefetch=None, processes=None):
         self.tests_count = tests
+        self.threads = threads
+        self.fork = fork
+        self.confidence = confidence
+        self.failure_rate = failure_rate
+        self.unique = unique
+        self.prefetch = prefetch
+        self.processes = processes
 
     def __call__(self, func):
         """Applies the @qc decorator to given function,
@@ -49,23 +157,96 @@ class qc(object):
                 func_args[:free_args_count])
         return Property(func=func,
                         data=dict(zip(func_args, func_defaults)),
-                        tests_count=self.tests_count)
+                        tests_count=self.tests_count,
+                        threads=self.threads,
+                        fork=self.fork,
+                        confidence=self.confidence,
+                        failure_rate=self.failure_rate,
+                        unique=self.unique,
+                        prefetch=self.prefetch,
+                        processes=self.processes)
 
 
 class Property(object):
     """A property that can be QuickChecked."""
     tests_count = 100   # used if not overridden on per-property basis
+    threads = None      # test cases are executed serially by default
+    fork = False        # and within the current process
+
+    confidence = None       # fixed number of tests is used by default
+    failure_rate = 0.01     # rate of failures ruled out with confidence
+    convergence = 0.05      # max. tags distance to consider them converged
+
+    unique = False          # inputs may be tested more than once
+    seen_limit = 100000     # inputs remembered exactly, before Bloom filter
+    max_duplicates = 100    # consecutive duplicates exhausting the domain
+
+    disk_limit = 1 << 34    # bytes that temporary files can take at once
+
+    boundary_cases = 32     # max. test cases with boundary values first
+
+    prefetch = 0            # test cases whose data is generated ahead
+    processes = None        # test data is generated by the main process
 
-    def __init__(self, func, data, tests_count=None):
+    _seed_key = None        # what seeds are derived from, if not the name
+
+    def __init__(self, func, data, tests_count=None, threads=None,
+                 fork=False, confidence=None, failure_rate=None,
+                 unique=False, prefetch=None, processes=None):
         """Constructor. Callers should specify the function
         which encodes the testing property, and arbitrary values'
         generator for test data (function arguments).
+
+        Arguments whose values are :class:`Fixture`\ s
+        will receive resources set up by those fixtures.
         """
         self.func = self.__coerce_to_generator_func(func)
+        self.fixtures = dict((k, v) for k, v in data.iteritems()
+                             if isinstance(v, Fixture))
         self.data = dict((k, to_arbitrary(v) if is_arbitrary(v) else v)
-                           for k, v in data.iteritems())
+                           for k, v in data.iteritems()
+                           if k not in self.fixtures)
         if tests_count is not None:
             self.tests_count = tests_count
+        if threads is not None:
+            if not (threads > 0):
+                raise ValueError("number of threads must be positive")
+            self.threads = threads
+        if fork:
+            if not hasattr(os, 'fork'):
+                raise ValueError("forking is not supported on this platform")
+            if self.threads:
+                raise ValueError("test cases cannot be both forked "
+                                 "and executed in threads")
+            self.fork = True
+        if failure_rate is not None:
+            if not (0 < failure_rate < 1):
+                raise ValueError("failure rate must be between 0 and 1")
+            self.failure_rate = failure_rate
+        if confidence is not None:
+            if not (0 < confidence < 1):
+                raise ValueError("confidence must be between 0 and 1")
+            self.confidence = confidence
+            needed = tests_for_confidence(confidence, self.failure_rate)
+            self.tests_count = min(tests_count or needed, needed)
+        if unique:
+            self.unique = True
+        if prefetch is not None:
+            if not (prefetch > 0):
+                raise ValueError("prefetch depth must be positive")
+            if self.threads or self.fork:
+                raise ValueError("test cases cannot be prefetched when "
+                                 "executed in threads or forked")
+            self.prefetch = prefetch
+        if processes is not None:
+            if not (processes > 0):
+                raise ValueError("number of processes must be positive")
+            if not hasattr(os, 'fork'):
+                raise ValueError("forking is not supported on this platform")
+            if self.unique:
+                raise ValueError("unique inputs cannot be generated "
+                                 "in other processes")
+            self.processes = processes
 
     def __coerce_to_generator_func(self, func):
         """Ensures that given function is a generator function,
@@ -80,24 +261,380 @@ class Property(object):
         def generator_func(*args, **kwargs):
             func(*args, **kwargs)
             yield
+        generator_func._plain_func = func
         return generator_func
 
-    def check(self, count=None):
+    def domain(self):
+        """Returns :class:`Enumeration` of all possible test data
+        for this property, or ``None`` if some of its arguments
+        cannot be enumerated.
+        """
+        names = sorted(self.data)
+        values = []
+        for name in names:
+            value = self.data[name]
+            if is_arbitrary(value):
+                values.append(enumeration(value))
+            else:
+                values.append(Enumeration.of([value]))
+        if None in values:
+            return None
+
+        # enumerated values are shared between combinations,
+        # so every test case gets its own copy of them
+        def to_data(combination):
+            return dict((name, copy.deepcopy(value)
+                               if is_arbitrary(self.data[name]) else value)
+                        for name, value in zip(names, combination))
+        return product(values).map(to_data)
+
+    def can_exhaust(self, count=None):
+        """Checks whether all possible test data for this property
+        can be checked within given number of tests, i.e. whether
+        it makes sense to check it exhaustively.
+        """
+        domain = self.domain()
+        return (domain is not None and
+                0 < domain.size <= (count or self.tests_count))
+
+    def check(self, count=None, failfast=False, seed=None,
+              start=0, total=None, exhaustive=False):
         """Executes given number of tests for this property
         and gathers statistics about all test runs.
 
         :param count: Number of tests to execute.
                       If omitted, the default number of tests
                       for this property is executed.
+        :param failfast: Whether to stop executing tests
+                         as soon as one of them fails
+        :param seed: Optional seed of the run, to make generated test
+                     data reproducible. If omitted, a random one is drawn,
+                     and recorded in :attr:`CheckResults.seed`.
+        :param start: Index of the first test case to execute,
+                      if only a part of the whole run is to be executed
+        :param total: Number of test cases in the whole run.
+                      By default, it's ``start + count``.
+        :param exhaustive: Whether to check the property on all possible
+                           test data, enumerated from the smallest,
+                           rather than on random one. By default,
+                           the whole :meth:`domain` is checked.
+
+        Returns :class:`CheckResults`, a list of :class:`TestResult`
+        objects for each test case that was executed.
+
+        Test data of every block of :data:`SEEDING_BLOCK` test cases is
+        generated with its own seed for random number generator, derived
+        from the seed of the run, the property and the index of the block
+        (and generated before any of the test cases is executed).
+        A single test case can be thus executed again with :meth:`replay`,
+        given its :attr:`TestResult.replay_token`.
 
-        Returns a list containing a set of "tags"
-        for each test case that was executed.
+        Test data is sized, i.e. generated values are small
+        for the first test cases and grow as the checking progresses
+        (or, with required ``confidence``, as it approaches every point
+        where it may stop early).
+        Before random test data, however, the property is checked on
+        combinations of boundary values of its arguments (see
+        :attr:`boundary_cases`), up to half of the whole run.
+
+        If the property has required ``confidence``, checking the whole
+        run may stop early once the distribution of tags converges.
+        For ``unique`` properties, it stops when their domain is exhausted.
         """
+        domain = None
+        if exhaustive:
+            domain = self.domain()
+            if domain is None:
+                raise ValueError("test data of the property "
+                                 "cannot be enumerated")
+            if count is None:
+                count = domain.size - start
+                if count > sys.maxint:
+                    raise ValueError("test data of the property has too "
+                                     "many values to check exhaustively")
+
+        adaptive = (self.confidence is not None and count is None
+                    and start == 0 and total is None)
         if count is None:
             count = self.tests_count
         if not (count > 0):
             raise ValueError("test count must be positive")
-        return [self.test_one() for _ in xrange(count)]
+        if total is None:
+            total = start + count
+
+        if seed is None:
+            seed = random.getrandbits(32)
+
+        results = CheckResults()
+        results.seed = seed
+        case_data = None
+        if domain is not None:
+            enumerated = itertools.islice(domain, start, None)
+
+            def next_data(index):
+                data = next(enumerated, None)
+                if data is None:
+                    return None
+                data = _TestData(data)
+                data.replay_token = 'e.%x' % index
+                return data
+        else:
+            case_data = self.__case_data(seed, total)
+            next_data = self.__data_source(results, case_data, count)
+
+        discards, written = discard_count(), disk_usage.written
+        progress.start(self, count)
+        try:
+            with disk_limit(self.disk_limit), \
+                    FixtureSession(self.fixtures) as fixtures, \
+                    self.__prefetched(next_data, xrange(start, start + count),
+                                      results, domain is not None) \
+                    as next_data:
+                if not adaptive:
+                    results.extend(self.__check_cases(
+                        xrange(start, start + count), next_data, failfast,
+                        fixtures))
+                    results.exhaustive = (domain is not None and start == 0
+                                          and len(results) == domain.size)
+                    return results
+
+                for checkpoint in self.__checkpoints(count):
+                    results.extend(self.__check_cases(
+                        xrange(len(results), checkpoint), next_data, failfast,
+                        fixtures))
+                    if results.exhausted:
+                        break
+                    if not all(r.succeeded for r in results):
+                        if failfast:
+                            break
+                    elif self.__tags_converged(results):
+                        break
+                return results
+        finally:
+            if case_data is not None:
+                case_data.close()
+            results.discards = discard_count() - discards
+            results.disk_written = disk_usage.written - written
+            results.disk_peak = disk_usage.peak
+            progress.finish(results)
+
+    @contextmanager
+    def __prefetched(self, next_data, cases, results, sequential=False):
+        """Context manager which, if the property prefetches its test data,
+        has ``next_data`` called for given test cases in a background
+        thread (or worker processes) and returns a function taking their
+        data in turn. Otherwise, ``next_data`` is returned as is.
+
+        Time that generation and execution have spent waiting
+        for each other is recorded in ``results``.
+
+        :param sequential: Whether ``next_data`` has to be called
+                           for test cases in order, by a single thread
+                           (and thus cannot be called in other processes)
+        """
+        if self.processes and not sequential:
+            pool = GeneratorPool(next_data, cases, self.processes,
+                                 self.prefetch or 2 * self.processes,
+                                 SEEDING_BLOCK)
+            try:
+                yield pool.next_data
+            finally:
+                pool.close()
+                results.execution_blocked = pool.execution_blocked
+            return
+
+        if not self.prefetch:
+            yield next_data
+            return
+
+        prefetcher = _Prefetcher(next_data, cases, self.prefetch)
+        try:
+            yield prefetcher.next_data
+        finally:
+            prefetcher.close(self.__clean_up)
+            results.generation_blocked = prefetcher.generation_blocked
+            results.execution_blocked = prefetcher.execution_blocked
+
+    def __data_source(self, results, case_data, count):
+        """Returns a function which takes test data for the test case
+        of given index from ``case_data``, or returns ``None`` if there
+        is no more data to test with. Skipped duplicate inputs are counted
+        in ``results``.
+        """
+        if not self.unique:
+            return case_data.data
+
+        seen = SeenSet(self.seen_limit, count)
+
+        def next_unique_data(index):
+            for attempt in xrange(self.max_duplicates):
+                data = case_data.data(index, attempt)
+                digest = hashlib.sha1(repr(sorted(data.items()))).digest()
+                if seen.add(digest):
+                    return data
+                self.__clean_up(data)
+                results.duplicates += 1
+            results.exhausted = True
+            return None
+
+        return next_unique_data
+
+    def __case_data(self, seed, total):
+        """Returns :class:`_CaseData` which generates test data
+        for test cases within a run of given seed and length.
+        """
+        constants, generators = self.__arguments()
+        if not generators:
+            # (test data doesn't depend on random numbers,
+            # so it's not worth seeding the generator for it)
+            return _CaseData(lambda *args: _TestData(constants), None,
+                             seed, total, self.__clean_up)
+
+        cases = self.__boundary_cases(total)
+        boundary_count = len(cases)
+        case_size = self.__case_size
+        max_duplicates = self.max_duplicates
+
+        def generate(start_case, index, attempt):
+            size = case_size(index, total)
+            fixed = None
+            if attempt:
+                # retries quickly grow in size, so that the domain
+                # of small values is not mistaken for an exhausted one
+                size = min(MAX_SIZE, size + (MAX_SIZE - size) *
+                           4 * attempt // max_duplicates)
+            elif index < boundary_count:
+                fixed = cases[index]
+            return _generate_data(constants, generators, start_case, size,
+                                  fixed)
+
+        return _CaseData(generate, self.__seed_of_run(seed), seed, total,
+                         self.__clean_up)
+
+    def __seed_of_run(self, seed):
+        """Returns the seed of this property within a run of given seed,
+        which seeds of its test cases are derived from.
+        """
+        key = self._seed_key or (self.func.__module__, self.func.__name__)
+        cached = self.__dict__.get('_seed_of_run')
+        if cached is None or cached[:2] != (seed, key):
+            cached = self._seed_of_run = (seed, key, derive_seed(seed, *key))
+        return cached[2]
+
+    def __boundary_cases(self, total):
+        """Returns the list of boundary values of property arguments,
+        combined for test cases which are executed first in a run
+        of given length, as dictionaries mapping argument names
+        to their values.
+
+        Arguments without known boundary values are omitted,
+        and thus generated at random in those test cases.
+        """
+        limit = min(self.boundary_cases, total // 2)
+        cache = self.__dict__.setdefault('_boundary_cases', {})
+        if limit not in cache:
+            cache[limit] = self.__combine_boundaries(limit)
+        return cache[limit]
+
+    def __combine_boundaries(self, limit):
+        names, values = [], []
+        for name in sorted(self.data):
+            if is_arbitrary(self.data[name]):
+                name_values = boundaries(self.data[name])
+                if name_values:
+                    names.append(name)
+                    values.append(name_values)
+        if not names:
+            return []
+        return [dict(zip(names, combination))
+                for combination in combinations(values, limit)]
+
+    def __checkpoints(self, count):
+        """Returns the numbers of tests after which adaptive checking
+        considers stopping early, doubling from 100 up to ``count``.
+        """
+        checkpoints = []
+        checkpoint = FIRST_CHECKPOINT
+        while checkpoint < count:
+            checkpoints.append(checkpoint)
+            checkpoint *= 2
+        checkpoints.append(count)
+        return checkpoints
+
+    def __tags_converged(self, results):
+        """Checks whether tags of given test results are distributed
+        the same way in both halves of the results, suggesting that
+        further tests would not exercise the property any differently.
+
+        Since halves of a small sample can happen to look alike,
+        the distance between them has to be within :attr:`convergence`
+        even after adding the sampling error expected for their size.
+        """
+        if not any(r.tags for r in results):
+            return False    # nothing to judge convergence by
+        half = len(results) // 2
+        distance = tags_distance(results[:half], results[half:])
+        tag_sets = len(set(frozenset(r.tags) for r in results))
+        error = math.sqrt(float(tag_sets) / len(results))
+        return distance + error < self.convergence
+
+    def __check_cases(self, cases, next_data, failfast, fixtures):
+        """Executes given test cases, serially or concurrently,
+        with test data obtained from ``next_data`` function.
+        :return: List of :class:`TestResult` objects
+        """
+        if self.threads:
+            return self.__check_concurrently(cases, next_data, failfast,
+                                             fixtures)
+
+        results = []
+        for i in cases:
+            data = next_data(i)
+            if data is None:
+                break
+            result = self.__run_test(data, fixtures)
+            results.append(result)
+            progress.done += 1
+            if failfast and not result.succeeded:
+                break
+        return results
+
+    def __check_concurrently(self, cases, next_data, failfast, fixtures):
+        """Executes given test cases using a pool of threads.
+
+        Test data is generated on the calling thread, and only
+        a bounded number of test cases is waiting for execution
+        at any given time. Results are returned in the order
+        their test cases were generated.
+        """
+        pool = ThreadPool(self.threads)
+        slots = threading.BoundedSemaphore(2 * self.threads)
+        failed = threading.Event()
+
+        def test_done(result):
+            progress.done += 1
+            if not result.succeeded:
+                failed.set()
+            slots.release()
+
+        pending = []
+        try:
+            for i in cases:
+                slots.acquire()
+                data = None
+                if not (failfast and failed.is_set()):
+                    data = next_data(i)
+                if data is None:
+                    slots.release()
+                    break
+                pending.append(pool.apply_async(self.__run_test,
+                                                (data, fixtures),
+                                                callback=test_done))
+        finally:
+            pool.close()
+            pool.join()
+
+        return [p.get() for p in pending]
 
     def test(self, count=None):
         """Executes given number of tests for this property
@@ -120,37 +657,212 @@ class Property(object):
 
     def test_one(self):
         """Executes a single test for this property."""
-        data = self.__generate_data()
+        with FixtureSession(self.fixtures) as fixtures:
+            with generating_cases() as start_case:
+                data = _generate_data(*self.__arguments() + (start_case,))
+            return self.__run_test(data, fixtures)
+
+    def replay(self, token):
+        """Executes again a single test case of an earlier run,
+        with the same test data, without executing any other test cases.
+
+        :param token: :attr:`TestResult.replay_token` of the test case,
+                      e.g. as printed in the report of a failed property
+        :return: :class:`TestResult` of the test case
+
+        Test data is the same provided that the property,
+        generators of its arguments, and the code they call
+        haven't changed since the token has been obtained.
+        """
+        if not isinstance(token, basestring):
+            raise TypeError("replay token must be a string")
+        # (tokens of exhaustively checked test cases are just their index
+        # within the property's domain, marked by an 'e.' prefix)
+        exhaustive = token.startswith('e.')
+        try:
+            parts = [int(p, 16)
+                     for p in token.split('.')[1 if exhaustive else 0:]]
+        except ValueError:
+            raise ValueError("invalid replay token: %r" % (token,))
+
+        if exhaustive:
+            domain = self.domain() if len(parts) == 1 else None
+            data = None
+            if domain is not None:
+                data = next(itertools.islice(domain, parts[0], None), None)
+            if data is None:
+                raise ValueError("invalid replay token: %r" % (token,))
+            data = _TestData(data)
+            data.replay_token = token
+        else:
+            if len(parts) not in (3, 4) or not (parts[1] < parts[2]):
+                raise ValueError("invalid replay token: %r" % (token,))
+            case_data = self.__case_data(parts[0], parts[2])
+            try:
+                data = case_data.data(*parts[1:2] + parts[3:])
+            finally:
+                case_data.close()
+
+        with FixtureSession(self.fixtures) as fixtures:
+            return self.__run_test(data, fixtures)
+
+    def _test_case(self, data):
+        """Executes a single test of this property on given test data,
+        without fixtures, and without releasing resources held by the data.
+        Used by :class:`PropertyGroup`, which shares the data.
+        """
         result = TestResult(data)
         try:
-            coroutine = self.func(**data)
-            result.tags = self.__execute_test(coroutine)
+            result.tags = self.__call_func(data)
         except:
             result.register_failure()
+        return result
+
+    def __run_test(self, data, fixtures):
+        """Executes a single test for this property
+        using given test data and resources from fixtures.
 
+        Resources held by the test data (like temporary files)
+        are released afterwards.
+        """
+        try:
+            if self.fork:
+                result = self.__run_forked_test(data, fixtures)
+            else:
+                result = TestResult(data)
+                try:
+                    if fixtures.fixtures:
+                        result.tags = self.__execute(data, fixtures)
+                    else:
+                        result.tags = self.__call_func(data)
+                except:
+                    result.register_failure()
+
+            result.replay_token = data.replay_token
+            return result
+        finally:
+            if data.cleanups:
+                self.__clean_up(data)
+
+    def __execute(self, data, fixtures):
+        """Calls the property function with given test data,
+        and resources from fixtures.
+        :return: Tags that the property has yielded
+        """
+        with fixtures.case() as resources:
+            kwargs = dict(data)
+            kwargs.update(resources)
+            return self.__call_func(kwargs)
+
+    def __call_func(self, kwargs):
+        # properties which don't yield tags are called directly,
+        # rather than through the generator they have been wrapped in
+        # (looked up in function's __dict__, as getattr() with a default
+        # is slow for the functions that don't have it)
+        plain_func = self.func.__dict__.get('_plain_func')
+        if plain_func is not None:
+            plain_func(**kwargs)
+            return _NO_TAGS
+        return self.__execute_test(self.func(**kwargs))
+
+    def __clean_up(self, data):
+        """Releases resources held by given test data,
+        as registered by generators through :func:`on_cleanup`.
+        """
+        cleanups = getattr(data, 'cleanups', ())
+        while cleanups:
+            cleanups.pop()()
+
+    def __run_forked_test(self, data, fixtures):
+        """Executes a single test for this property in a forked
+        child process, so that any changes it makes to the resources
+        set up by fixtures are discarded after the test.
+
+        Exceptions which caused the test to fail are passed back
+        to the parent process without their tracebacks.
+        """
+        # flush output buffers so that the child doesn't output
+        # their contents for the second time
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self.fork = False
+            try:
+                child_result = self.__run_test(data, fixtures)
+                exception = getattr(child_result, 'exception', None)
+                try:
+                    payload = pickle.dumps((child_result.tags, exception))
+                except Exception:
+                    exception = RuntimeError("%s: %s" % (
+                        type(exception).__name__, exception))
+                    payload = pickle.dumps((child_result.tags, exception))
+                with os.fdopen(write_fd, 'wb') as f:
+                    f.write(payload)
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as f:
+            payload = f.read()
+        _, status = os.waitpid(pid, 0)
+
+        result = TestResult(data)
+        if payload:
+            result.tags, exception = pickle.loads(payload)
+        else:
+            exception = RuntimeError(
+                "forked test process died (exit status: %s)" % status)
+        if exception is not None:
+            result.exception, result.traceback = exception, None
         return result
 
-    def __generate_data(self):
-        """Returns a dictionary of test data
-        to be passed as keyword arguments to property function.
+    def __case_size(self, index, total):
+        """Returns the size of test data for given test case,
+        growing linearly from zero for the first test case
+        to :data:`MAX_SIZE` for the last one.
+
+        For properties with required ``confidence``, which can stop
+        at any of the :meth:`__checkpoints`, the size grows up to
+        :data:`MAX_SIZE` before every checkpoint instead, so that values
+        of all sizes have been tested whenever checking stops.
+        """
+        if self.confidence is not None:
+            # (the checkpoint following the test case, computed
+            # rather than looked up, as this is done for every test case)
+            end = min(FIRST_CHECKPOINT << (index // FIRST_CHECKPOINT)
+                      .bit_length(), total)
+            return MAX_SIZE * index // (end - 1 or 1)
+        return MAX_SIZE * index // (total - 1 or 1)
+
+    def __arguments(self):
+        """Returns the dictionary of constant arguments of the property,
+        and the list of (name, generator) pairs for the other ones.
+
+        They are sorted out once rather than for every test case,
+        and again only if :attr:`data` is replaced.
         """
-        return dict((k, next(v) if is_arbitrary(v) else v)
-                    for k, v in self.data.iteritems())
+        cached = self.__dict__.get('_arguments')
+        if cached is None or cached[0] is not self.data:
+            constants = dict((k, v) for k, v in self.data.iteritems()
+                             if not is_arbitrary(v))
+            generators = [(k, v) for k, v in self.data.iteritems()
+                          if is_arbitrary(v)]
+            cached = self._arguments = (self.data, constants, generators)
+        return cached[1:]
 
     def __execute_test(self, coroutine):
         """Executes given test coroutine and returns
         a set of "tags" that have been assigned to
         the test case by the property.
         """
-        res = []
-        try:
-            while True:
-                obj = next(coroutine)
-                if obj is not None:
-                    value = obj.value if isinstance(obj, Tag) else obj
-                    res.append(value)
-        except StopIteration:
-            return frozenset(res)
+        return frozenset([obj.value if isinstance(obj, Tag) else obj
+                          for obj in coroutine if obj is not None])
 
     @property
     def parametrized(self):
@@ -170,6 +882,381 @@ class Property(object):
             final_kwargs.update(kwargs_)
             return self.func(**final_kwargs)
 
-        data = dict((k, v) for (k, v) in self.data.iteritems()
-                    if k not in kwargs)
-        return Property(curried_func, data, self.tests_count)
+        plain_func = getattr(self.func, '_plain_func', None)
+        if plain_func is not None:
+            curried_func._plain_func = functools.partial(plain_func, **kwargs)
+
+        prop = copy.copy(self)
+        prop._boundary_cases = {}
+        prop.func = curried_func
+        prop.data = dict((k, v) for (k, v) in self.data.iteritems()
+                         if k not in kwargs)
+        prop.fixtures = dict((k, v) for (k, v) in self.fixtures.iteritems()
+                             if k not in kwargs)
+        return prop
+
+
+def property_group(*props):
+    """Groups properties with the same arguments, generated the same way,
+    so that they are checked on the same test data - generated only once
+    for all of them, rather than separately for every property.
+
+    Example::
+
+        @qc
+        def sorting_keeps_length(l=list_(of=int_(min=0))):
+            assert len(sorted(l)) == len(l)
+
+        @qc
+        def sorting_finds_minimum(l=list_(of=int_(min=0), min_length=1)):
+            assert sorted(l)[0] == min(l)
+
+        sorting = property_group(sorting_keeps_length, sorting_finds_minimum)
+
+    The group can be checked with :meth:`PropertyGroup.check`,
+    passed to :func:`run_tests`, or put in a module checked by :func:`main`
+    (instead of its properties). Results and statistics remain separate
+    for every property.
+
+    Test data is generated like for the first property in the group,
+    with its number of tests, ``unique`` inputs and boundary values.
+    Every test case executes all the properties, one after another,
+    passing them the very same objects, so properties in a group
+    should not modify their arguments. Fixtures and executing test cases
+    in threads or forked processes aren't supported in groups.
+
+    Properties in a group derive seeds of their test cases from the first one,
+    also when checked individually, so that they can :meth:`~Property.replay`
+    any test case of the group.
+
+    Groups are only recognized by :func:`main` and :func:`run_tests`, though.
+    :func:`discover` (and thus the ``pyqcy`` command) and the py.test plugin
+    find the properties of a group one by one, and check every one of them
+    separately - on the same test data, but generated for each of them anew.
+    """
+    return PropertyGroup(props)
+
+
+class PropertyGroup(object):
+    """Properties which are checked on the same test data.
+    See :func:`property_group`.
+    """
+    def __init__(self, props):
+        props = list(props)
+        if not props:
+            raise ValueError("group of properties cannot be empty")
+        for prop in props:
+            if not isinstance(prop, Property):
+                raise TypeError("%r is not a property" % (prop,))
+            if prop.fixtures:
+                raise ValueError("properties with fixtures cannot be grouped "
+                                 "(%s)" % prop.func.__name__)
+
+        first = props[0]
+        signature = describe(first.data)
+        for prop in props[1:]:
+            if describe(prop.data) != signature:
+                raise ValueError("%s doesn't have the same arguments as %s"
+                                 % (prop.func.__name__, first.func.__name__))
+
+        key = first._seed_key or (first.func.__module__, first.func.__name__)
+        for prop in props:
+            prop._seed_key = key
+
+        self.props = props
+        self.name = ", ".join(p.func.__name__ for p in props)
+        self.tests_count = first.tests_count
+
+    def can_exhaust(self, count=None):
+        """Checks whether the group can be checked exhaustively,
+        like :meth:`Property.can_exhaust`.
+        """
+        return self.props[0].can_exhaust(count)
+
+    def check(self, count=None, failfast=False, seed=None, exhaustive=False):
+        """Checks all the properties in the group on the same test data.
+
+        Parameters have the same meaning as for :meth:`Property.check`.
+
+        :return: List of :class:`CheckResults`,
+                 one for every property in the group, in order
+        """
+        outcomes = [[] for _ in self.props]
+
+        def check_all(**data):
+            failed = False
+            for prop, prop_outcomes in zip(self.props, outcomes):
+                result = prop._test_case(data)
+                prop_outcomes.append(result)
+                failed = failed or not result.succeeded
+            if failed:
+                raise AssertionError("some of the properties have failed")
+        check_all.__name__ = self.name
+
+        # test data is generated by a property which executes all others
+        first = self.props[0]
+        combined = Property(check_all, first.data,
+                            tests_count=self.tests_count)
+        for attr in ('unique', 'seen_limit', 'max_duplicates',
+                     'disk_limit', 'boundary_cases', 'prefetch',
+                     'processes', '_seed_key'):
+            setattr(combined, attr, getattr(first, attr))
+        results = combined.check(count, failfast=failfast, seed=seed,
+                                 exhaustive=exhaustive)
+
+        group_results = []
+        for prop_outcomes in outcomes:
+            prop_results = CheckResults(prop_outcomes)
+            for result, prop_result in zip(results, prop_results):
+                prop_result.replay_token = result.replay_token
+            for attr in ('seed', 'duplicates', 'exhausted', 'exhaustive',
+                         'discards', 'disk_written', 'disk_peak',
+                         'generation_blocked', 'execution_blocked'):
+                setattr(prop_results, attr, getattr(results, attr))
+            group_results.append(prop_results)
+        return group_results
+
+
+_NO_TAGS = frozenset()
+
+
+def _generate_data(constants, generators, start_case, size=None,
+                   fixed=None):
+    """Returns a dictionary of test data
+    to be passed as keyword arguments to property function.
+
+    :param constants: Dictionary of constant arguments
+    :param generators: List of (name, generator) pairs for the other ones
+    :param start_case: Function starting the test case,
+                       as returned by :class:`generating_cases`
+    :param size: Size of generated values, if they should be sized
+    :param fixed: Optional dictionary of values to use for some
+                  of the arguments (copied), instead of generating them
+    """
+    data = _TestData(constants)
+    if not generators:
+        return data
+    cleanups = start_case(size)
+    try:
+        for k, gen in generators:
+            if fixed and k in fixed:
+                data[k] = copy.deepcopy(fixed[k])
+            else:
+                data[k] = next(gen)
+    except:
+        while cleanups:
+            cleanups.pop()()
+        raise
+    if cleanups:
+        data.cleanups = cleanups
+    return data
+
+
+class _CaseData(object):
+    """Generates test data for test cases within a run of given seed
+    and length, using ``generate`` function (taking the function starting
+    a test case from :class:`generating_cases`, the index of the test case
+    and the number of the retry, if its data has turned out to be
+    a duplicate before).
+
+    Seeding the random number generator takes longer than generating
+    data of a typical test case, so rather than for every test case,
+    it's seeded for every block of :data:`SEEDING_BLOCK` of them,
+    whose data is then generated in one go, before any of them is executed
+    (and can make its own use of the generator). Data of a test case
+    thus depends only on the seed, its index and the run's length,
+    although generating it on its own means generating the data
+    preceding it in its block as well.
+
+    To keep no more resources (like temporary files) around
+    than necessary, generation pauses after data holding them,
+    saving the state of the random number generator until
+    the next test case is asked for.
+
+    :param run_seed: Seed of the property within the run, or ``None``
+                     if its test data doesn't depend on random numbers
+    :param clean_up: Function releasing resources held by test data
+    """
+    def __init__(self, generate, run_seed, seed, total, clean_up):
+        self.__generate = generate
+        self.__run_seed = run_seed
+        self.__total = total
+        self.__clean_up = clean_up
+        self.__token = '%x.%%x.%x' % (seed, total)
+        self.__ahead = {}       # data of the following test cases
+        self.__paused = None    # (index, state of the generator)
+
+    def data(self, index, attempt=0):
+        """Returns test data for the test case of given index,
+        or given retry of it.
+        """
+        if not attempt and self.__run_seed is not None:
+            data = self.__ahead.pop(index, None)
+            if data is None:
+                data = self.__generate_block(index)
+            elif data.discards:
+                discard(data.discards)
+            data.replay_token = self.__token % index
+            return data
+
+        if self.__run_seed is None:
+            data = self.__generate(None, index, attempt)
+        else:
+            # (the bits of the property's seed, index and attempt
+            # don't overlap, so every retry gets a distinct seed
+            # without hashing them all)
+            random.seed(self.__run_seed | index << 64 | attempt << 128)
+            with generating_cases() as start_case:
+                data = self.__generate(start_case, index, attempt)
+        data.replay_token = self.__token % index
+        if attempt:
+            data.replay_token += '.%x' % attempt
+        return data
+
+    def __generate_block(self, index):
+        """Generates data for the test case of given index,
+        and the rest of its block.
+        """
+        start = index - index % SEEDING_BLOCK
+        if self.__paused is not None and self.__paused[0] == index:
+            random.setstate(self.__paused[1])
+            first = index
+        else:
+            self.close()
+            random.seed(self.__run_seed | (start // SEEDING_BLOCK) << 64)
+            first = start
+        self.__paused = None
+
+        data = None
+        generate, ahead = self.__generate, self.__ahead
+        discards = discard_count()
+        with generating_cases() as start_case:
+            for i in xrange(first, min(start + SEEDING_BLOCK, self.__total)):
+                try:
+                    case = generate(start_case, i, 0)
+                except Exception:
+                    if i <= index:
+                        raise
+                    break   # to be raised for the test case it belongs to
+
+                if i == index:
+                    data = case
+                    discards = discard_count()
+                else:
+                    # (values discarded while generating data of other
+                    # test cases are counted once their data is taken, if ever)
+                    if discard_count() != discards:
+                        case.discards = discard_count() - discards
+                        discard(-case.discards)
+                    if i < index:
+                        self.__clean_up(case)
+                        continue
+                    ahead[i] = case
+                if case.cleanups:
+                    self.__paused = (i + 1, random.getstate())
+                    break
+        return data
+
+    def close(self):
+        """Releases resources of test data generated ahead,
+        which is not going to be taken.
+        """
+        for data in self.__ahead.itervalues():
+            self.__clean_up(data)
+        self.__ahead.clear()
+
+
+class _Prefetcher(object):
+    """Generates test data for given test cases in a background thread,
+    keeping at most ``depth`` of them ready for execution.
+    """
+    def __init__(self, next_data, cases, depth):
+        self.generation_blocked = 0.0   # seconds waiting for free slots
+        self.execution_blocked = 0.0    # seconds waiting for data
+
+        self.__queue = Queue.Queue(depth)
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__generate,
+                                         args=(next_data, cases))
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __generate(self, next_data, cases):
+        try:
+            for i in cases:
+                if self.__stopped.is_set():
+                    return
+                data = next_data(i)
+                self.__put(data)
+                if data is None:
+                    return
+            self.__put(None)
+        except Exception:
+            self.__put(_GenerationFailure(sys.exc_info()))
+
+    def __put(self, item):
+        try:
+            self.__queue.put_nowait(item)
+        except Queue.Full:
+            started = time.time()
+            self.__queue.put(item)
+            self.generation_blocked += time.time() - started
+
+    def next_data(self, index=None):
+        """Returns test data of the next test case, or ``None``
+        if there are no more test cases.
+
+        Exceptions raised while generating the data are re-raised here.
+        """
+        try:
+            item = self.__queue.get_nowait()
+        except Queue.Empty:
+            started = time.time()
+            item = self.__queue.get()
+            self.execution_blocked += time.time() - started
+        if isinstance(item, _GenerationFailure):
+            self.__queue.put(item)  # for any subsequent calls
+            raise item.exc_info[0], item.exc_info[1], item.exc_info[2]
+        if item is None:
+            self.__queue.put(None)
+        return item
+
+    def close(self, clean_up):
+        """Stops generating test data, and releases resources
+        of test data which has been generated but not taken,
+        using given ``clean_up`` function.
+        """
+        self.__stopped.set()
+        # (once the queue has been emptied, the generating thread can put
+        # at most one more item into it before noticing it should stop)
+        self.__discard(clean_up)
+        self.__thread.join()
+        self.__discard(clean_up)
+
+    def __discard(self, clean_up):
+        while True:
+            try:
+                item = self.__queue.get_nowait()
+            except Queue.Empty:
+                return
+            if isinstance(item, _TestData):
+                clean_up(item)
+
+
+class _GenerationFailure(object):
+    """Exception raised while generating prefetched test data,
+    passed on to the thread which executes test cases.
+    """
+    __slots__ = ['exc_info']
+
+    def __init__(self, exc_info):
+        self.exc_info = exc_info
+
+
+class _TestData(dict):
+    """Test data for a single test case, along with functions
+    which release resources held by it, and the token to replay it with.
+    """
+    cleanups = ()
+    replay_token = None
+    discards = 0    # values discarded while generating the data ahead
@@ -0,0 +1,166 @@
+"""
+Plugin for py.test which collects pyqcy properties
+as individual test items.
+
+It's enabled automatically when pyqcy is installed,
+and can be disabled with ``-p no:pyqcy``. Properties in
+a :func:`property_group` are collected (and checked) individually.
+"""
+import os
+import random
+
+import pytest
+
+import _pytest
+import pluggy
+
+import pyqcy
+from pyqcy.properties import Property
+
+
+#: Directories of packages whose frames are omitted from failure reports
+_NOISY_DIRS = tuple(os.path.dirname(package.__file__)
+                    for package in (pyqcy, _pytest, pluggy))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('pyqcy')
+    group.addoption('--pyqcy-split', type=int, metavar='N',
+                    help="split properties into items of at most N test "
+                         "cases, so that e.g. pytest-xdist can distribute "
+                         "them between processes")
+    group.addoption('--pyqcy-seed', type=int,
+                    help="seed that test data of all properties "
+                         "is derived from")
+
+
+def pytest_configure(config):
+    # xdist workers must all use the same seed as the master,
+    # or items split off a single property would overlap
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is not None and 'pyqcy_seed' in workerinput:
+        config.pyqcy_seed = workerinput['pyqcy_seed']
+    elif config.getoption('pyqcy_seed') is not None:
+        config.pyqcy_seed = config.getoption('pyqcy_seed')
+    else:
+        config.pyqcy_seed = random.getrandbits(32)
+
+    if config.pluginmanager.hasplugin('xdist'):
+        config.pluginmanager.register(XdistHooks())
+    config.pluginmanager.register(PropertyStats(config), 'pyqcy_stats')
+
+
+def pytest_report_header(config):
+    return "pyqcy: seed %s" % config.pyqcy_seed
+
+
+def pytest_pycollect_makeitem(collector, name, obj):
+    if not isinstance(obj, Property):
+        return None
+
+    # properties imported from other modules are collected there
+    module = collector.getparent(pytest.Module)
+    if module is not None and obj.func.__module__ != module.obj.__name__:
+        return []
+
+    # small domains are checked exhaustively, in ranges of their values
+    exhaustive = obj.can_exhaust()
+    total = obj.domain().size if exhaustive else obj.tests_count
+    split = collector.config.getoption('pyqcy_split') or total
+    items = []
+    for start in xrange(0, total, split):
+        count = min(split, total - start)
+        item_name = (name if count == total
+                     else "%s[%s-%s]" % (name, start, start + count - 1))
+        items.append(_make_item(collector, item_name, prop=obj,
+                                start=start, count=count, total=total,
+                                exhaustive=exhaustive))
+    return items
+
+
+def _make_item(parent, name, **kwargs):
+    """Creates a :class:`PropertyItem` in a way that's supported
+    by the current version of py.test.
+    """
+    if hasattr(PropertyItem, 'from_parent'):
+        return PropertyItem.from_parent(parent, name=name, **kwargs)
+    return PropertyItem(name, parent, **kwargs)
+
+
+class PropertyItem(pytest.Item):
+    """Test item which executes a range of test cases for a property."""
+
+    def __init__(self, name, parent=None, prop=None, start=0, count=None,
+                 total=None, exhaustive=False, **kwargs):
+        super(PropertyItem, self).__init__(name, parent, **kwargs)
+        self.prop = prop
+        self.start = start
+        self.count = count or prop.tests_count
+        self.total = total or prop.tests_count
+        self.exhaustive = exhaustive
+
+    def runtest(self):
+        # (test cases derive their seeds from the run's seed by themselves,
+        # so items covering parts of a property needn't have their own)
+        results = self.prop.check(self.count, failfast=True,
+                                  seed=self.config.pyqcy_seed,
+                                  start=self.start, total=self.total,
+                                  exhaustive=self.exhaustive)
+        self.user_properties.append(('pyqcy_tests', len(results)))
+
+        failure = next((r for r in results if not r.succeeded), None)
+        if failure:
+            failure.propagate_failure()
+
+    def repr_failure(self, excinfo):
+        # frames from pyqcy and py.test are only noise in failure reports
+        if not self.config.getoption('fulltrace', False):
+            traceback = excinfo.traceback.filter(
+                lambda entry: not str(entry.path).startswith(_NOISY_DIRS))
+            if traceback:
+                excinfo.traceback = traceback
+        return super(PropertyItem, self).repr_failure(excinfo)
+
+    def reportinfo(self):
+        func = self.prop.func
+        return (self.fspath, func.func_code.co_firstlineno - 1,
+                "[pyqcy] %s" % self.name)
+
+
+class XdistHooks(object):
+    """Hooks for pytest-xdist, registered only if it's installed."""
+
+    def pytest_configure_node(self, node):
+        node.workerinput['pyqcy_seed'] = node.config.pyqcy_seed
+
+
+class PropertyStats(object):
+    """Gathers the number of test cases executed for every property,
+    and the time it took, to display them at the end of the test session.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.stats = {}
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != 'call':
+            return
+        tests = dict(report.user_properties).get('pyqcy_tests')
+        if tests is None:
+            return
+
+        nodeid = report.nodeid.split('[')[0]
+        stats = self.stats.setdefault(nodeid, [0, 0.0])
+        stats[0] += tests
+        stats[1] += report.duration
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.stats or self.config.getoption('durations') is None:
+            return
+
+        terminalreporter.write_sep('=', "pyqcy properties")
+        by_duration = sorted(self.stats.iteritems(),
+                             key=lambda (_, (tests, secs)): -secs)
+        for nodeid, (tests, secs) in by_duration:
+            terminalreporter.write_line("%.2fs %8d tests   %s" % (
+                secs, tests, nodeid))
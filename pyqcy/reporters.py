@@ -0,0 +1,259 @@
+"""
+Reporters of results of checking properties in machine-readable formats,
+for continuous integration servers and other tools.
+"""
+import datetime
+import json
+import re
+import traceback
+from xml.sax.saxutils import escape, quoteattr
+
+
+__all__ = ['Reporter', 'JSONReporter', 'JUnitReporter']
+
+
+class Reporter(object):
+    """Base class for reporters, which are notified about every property
+    as soon as it has been checked (or skipped).
+
+    Reporters are passed to :func:`run_tests`. Subclasses should override
+    :meth:`report`, and possibly :meth:`skip` and :meth:`close`.
+    """
+    def report(self, prop, results, duration):
+        """Reports the results of checking a single property.
+
+        :param prop: :class:`Property` that has been checked
+        :param results: List of :class:`TestResult` objects,
+                        usually :class:`CheckResults`
+        :param duration: Time it took to check the property (in seconds)
+        """
+        raise NotImplementedError()
+
+    def skip(self, prop, reason):
+        """Reports that given property hasn't been checked at all.
+
+        :param reason: Human-readable reason for skipping it
+        """
+
+    def close(self):
+        """Finishes the report, once all the properties have been checked."""
+
+
+class StreamReporter(Reporter):
+    """Reporter that writes to a file, flushing it after every property
+    so that the report can be followed while the tests are still running.
+
+    :param stream: File object, or path to the file to (over)write
+    """
+    def __init__(self, stream):
+        self.owns_stream = isinstance(stream, basestring)
+        self.stream = open(stream, 'w') if self.owns_stream else stream
+
+    def write(self, text):
+        if isinstance(text, unicode):
+            text = text.encode('utf-8')
+        self.stream.write(text)
+        self.stream.flush()
+
+    def close(self):
+        if self.owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class JSONReporter(StreamReporter):
+    """Reporter which writes one JSON object per property,
+    each in a single line (the so-called *JSON lines* format).
+
+    Objects of checked properties have the following keys:
+
+    * ``name``, ``module`` - identify the property function
+    * ``status`` - ``"passed"`` or ``"failed"``
+    * ``tests``, ``failures`` - numbers of test cases executed and failed
+    * ``duration`` - time of checking the property (in seconds)
+    * ``seed`` - seed of the random number generator used for test data
+    * ``exhaustive``, ``exhausted``, ``duplicates``, ``discards``,
+      ``disk_written``, ``disk_peak`` - the respective attributes
+      of :class:`CheckResults`
+    * ``generation_blocked``, ``execution_blocked`` - likewise,
+      for properties with prefetched test data
+    * ``statistics`` - list of ``{"labels": [...], "count": n}`` objects
+      for tags that the property has yielded
+    * ``failure`` - for failed properties, an object with ``data``
+      (representations of arguments of the first failing test case),
+      ``replay_token``, ``exception``, ``message`` and ``traceback``
+
+    Skipped properties only have ``name``, ``module``, ``status``
+    (``"skipped"``) and ``reason``.
+    """
+    def report(self, prop, results, duration):
+        self.__write(result_record(prop, results, duration))
+
+    def skip(self, prop, reason):
+        self.__write(dict(property_id(prop), status='skipped', reason=reason))
+
+    def __write(self, record):
+        self.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+class JUnitReporter(StreamReporter):
+    """Reporter which writes a JUnit XML file, with a ``<testcase>``
+    for every property.
+
+    Elements are written as properties are checked, so the ``<testsuite>``
+    element doesn't have the (optional) totals of tests and failures,
+    which are only known at the end. Numbers of test cases, seed and other
+    figures are written as ``<properties>`` of test cases, while tags
+    that the property has yielded go into ``<system-out>``.
+
+    :param suite_name: Name of the ``<testsuite>`` element
+    """
+    def __init__(self, stream, suite_name='pyqcy'):
+        super(JUnitReporter, self).__init__(stream)
+        self.suite_name = suite_name
+        self.started = False
+
+    def report(self, prop, results, duration):
+        record = result_record(prop, results, duration)
+        lines = ['  <testcase classname=%s name=%s time="%.6f">' % (
+            _attr(record['module']), _attr(record['name']), duration)]
+
+        lines.append('    <properties>')
+        for key in ('tests', 'seed', 'exhaustive', 'duplicates', 'discards',
+                    'disk_written'):
+            lines.append('      <property name="%s" value=%s />' % (
+                key, _attr(json.dumps(record[key]))))
+        lines.append('    </properties>')
+
+        failure = record.get('failure')
+        if failure:
+            data = ''.join("  %s = %s\n" % item
+                           for item in sorted(failure['data'].items()))
+            if failure['replay_token'] is not None:
+                data += "Replay token: %s\n" % failure['replay_token']
+            lines.append('    <failure type=%s message=%s>%s</failure>' % (
+                _attr(failure['exception']), _attr(failure['message']),
+                _text("Failure encountered for data:\n%s%s" % (
+                    data, failure['traceback']))))
+        if record['statistics']:
+            stats = ''.join("%.2f%%: %s\n" % (
+                s['count'] * 100.0 / record['tests'], ", ".join(s['labels']))
+                for s in record['statistics'])
+            lines.append('    <system-out>%s</system-out>' % _text(stats))
+
+        lines.append('  </testcase>')
+        self.__write_testcase(lines)
+
+    def skip(self, prop, reason):
+        ident = property_id(prop)
+        self.__write_testcase([
+            '  <testcase classname=%s name=%s time="0">' % (
+                _attr(ident['module']), _attr(ident['name'])),
+            '    <skipped message=%s />' % _attr(reason),
+            '  </testcase>'])
+
+    def close(self):
+        self.__start()
+        self.write('</testsuite>\n')
+        super(JUnitReporter, self).close()
+
+    def __start(self):
+        if not self.started:
+            self.started = True
+            self.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                       '<testsuite name=%s timestamp="%s">\n' % (
+                           _attr(self.suite_name),
+                           datetime.datetime.now().replace(
+                               microsecond=0).isoformat()))
+
+    def __write_testcase(self, lines):
+        self.__start()
+        self.write('\n'.join(lines) + '\n')
+
+
+# Records of results
+
+def property_id(prop):
+    """Returns a dictionary with the ``name`` and ``module``
+    of given property's function.
+    """
+    return {'name': prop.func.__name__,
+            'module': getattr(prop.func, '__module__', None)}
+
+
+def result_record(prop, results, duration):
+    """Returns a dictionary describing the results of checking
+    given property, which can be serialized as JSON.
+    """
+    failed = [r for r in results if not r.succeeded]
+    record = property_id(prop)
+    record.update({
+        'status': 'failed' if failed else 'passed',
+        'tests': len(results),
+        'failures': len(failed),
+        'duration': round(duration, 6),
+        'seed': getattr(results, 'seed', None),
+        'statistics': tag_statistics(r.tags for r in results),
+    })
+    for attr in ('exhaustive', 'exhausted', 'duplicates', 'discards',
+                 'disk_written', 'disk_peak'):
+        record[attr] = getattr(results, attr, 0)
+    for attr in ('generation_blocked', 'execution_blocked'):
+        blocked = getattr(results, attr, None)
+        if blocked is not None:
+            record[attr] = round(blocked, 6)
+
+    if failed:
+        failure = failed[0]
+        exc = failure.exception
+        record['failure'] = {
+            'data': dict((k, _unicode(repr(v)))
+                         for k, v in failure.data.iteritems()),
+            'replay_token': failure.replay_token,
+            'exception': type(exc).__name__,
+            'message': _unicode(_safe_str(exc)),
+            'traceback': _unicode(''.join(traceback.format_exception(
+                type(exc), exc, failure.traceback))),
+        }
+    return record
+
+
+def tag_statistics(tags):
+    """Counts how many test cases have yielded every combination of tags.
+    :return: List of ``{"labels": [...], "count": n}`` dictionaries,
+             most frequent first
+    """
+    counts = {}
+    for labels in tags:
+        if labels:
+            counts[labels] = counts.get(labels, 0) + 1
+    return [{'labels': [_unicode(_safe_str(l)) for l in labels],
+             'count': count}
+            for labels, count in sorted(counts.iteritems(),
+                                        key=lambda (_, count): -count)]
+
+
+def _safe_str(obj):
+    try:
+        return unicode(obj)
+    except UnicodeError:
+        return str(obj)
+
+
+def _unicode(text):
+    if isinstance(text, str):
+        text = text.decode('utf-8', 'replace')
+    return text
+
+
+# (characters which cannot occur in XML documents at all, even escaped)
+_XML_INVALID = re.compile(u'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+def _text(text):
+    return escape(_XML_INVALID.sub(u'\ufffd', _unicode(text)))
+
+
+def _attr(text):
+    return quoteattr(_XML_INVALID.sub(u'\ufffd', _unicode(text or u'')))
@@ -11,9 +11,10 @@ class CheckError(Exception):
     It constains the original test data for which
     the test has failed.
     """
-    def __init__(self, data, cause=None):
+    def __init__(self, data, cause=None, replay_token=None):
         self.test_data = data
         self.cause = cause
+        self.replay_token = replay_token
 
     def __str__(self):
         msg = "test failed"
@@ -26,6 +27,8 @@ class CheckError(Exception):
         res = [msg]
         res.append("Failure encountered for data:")
         res.extend(["  %s = %s" % i for i in self.test_data.iteritems()])
+        if self.replay_token is not None:
+            res.append("Replay token: %s" % self.replay_token)
         return os.linesep.join(res)
 
 
@@ -35,15 +38,24 @@ class TestResult(object):
 
     Results include the original test data,
     all the tags generated by property,
-    and the exception that failed the test, if any.
+    the exception that failed the test, if any,
+    and ``replay_token`` identifying the test case within its run,
+    for passing to :meth:`Property.replay`.
     """
+    __test__ = False    # not a test class, despite the name
+
+    # (there is one for every test case, so they'd better be small)
+    __slots__ = ['data', 'tags', 'exception', 'traceback', 'replay_token']
+
     def __init__(self, data):
         self.data = data
-        self.tags = []
+        self.tags = frozenset()
+        self.exception = None
+        self.replay_token = None
 
     @property
     def succeeded(self):
-        return getattr(self, 'exception', None) is None
+        return self.exception is None
 
     def register_failure(self):
         """Saves the current exception info as a reason for test failure,
@@ -58,5 +70,47 @@ class TestResult(object):
         like it was never really captured to begin with.
         """
         # This form of 'raise' ensures the original traceback is preserved
-        exception = CheckError(data=self.data, cause=self.exception)
+        exception = CheckError(data=self.data, cause=self.exception,
+                               replay_token=self.replay_token)
         raise type(exception), exception, self.traceback
+
+
+class CheckResults(list):
+    """List of :class:`TestResult`\ s from checking a property,
+    along with information about the checking as a whole.
+    """
+    #: Number of generated inputs that were skipped
+    #: because they had already been tested
+    duplicates = 0
+
+    #: Whether checking has stopped because
+    #: no more untested inputs could be generated
+    exhausted = False
+
+    #: Whether the property has been checked
+    #: on all its possible test data
+    exhaustive = False
+
+    #: Number of generated values that were discarded
+    #: by filters, such as :func:`such_that`
+    discards = 0
+
+    #: Number of bytes written to temporary files of generated values
+    disk_written = 0
+
+    #: Largest number of bytes that those temporary files took at once
+    disk_peak = 0
+
+    #: Time (in seconds) that generating prefetched test data has spent
+    #: waiting for earlier test cases to be executed, or ``None``
+    #: if test data hasn't been prefetched (or has been generated
+    #: in other processes)
+    generation_blocked = None
+
+    #: Time (in seconds) that executing test cases has spent
+    #: waiting for their prefetched test data to be generated
+    execution_blocked = None
+
+    #: Seed of the random number generator that test data was generated
+    #: with, if one has been given
+    seed = None
@@ -1,23 +1,35 @@
 """
 Simple, built-in test runner.
 """
+import random
 import sys
+import time
 import traceback
 
-from pyqcy.properties import Property
+from pyqcy.progress import ProgressMonitor
+from pyqcy.properties import Property, PropertyGroup
+from pyqcy.statistics import confidence_of
 from pyqcy.utils import partition
 
 
 __all__ = ['main']
 
 
-def main(module='__main__', exit=True, verbosity=2, failfast=False):
+def main(module='__main__', exit=True, verbosity=2, failfast=False,
+         cache=None, progress=None):
     """Built-in test runner for properties.
 
     When called, it will look for all properties (i.e. functions with
-    :func:`qc` decorator) and run checks on them.
+    :func:`qc` decorator) and run checks on them. Properties which belong
+    to a :func:`property_group` defined in the module are checked
+    together with the rest of the group.
 
     Arguments are intended to mimic those from :func:`unittest.main`.
+    Additionally, ``cache`` can be a :class:`ResultCache` which allows
+    to skip properties that haven't changed since they last passed,
+    and ``progress`` can be an interval (in seconds) at which to print
+    the progress of checking the current property to standard error.
+
     Return value is the total number of properties checked,
     provided ``exit`` is ``False`` and program doesn't terminate.
     """
@@ -27,65 +39,158 @@ def main(module='__main__', exit=True, verbosity=2, failfast=False):
         for part in module_name.split('.')[1:]:
             module = getattr(module, part)
 
-    props = [v for v in module.__dict__.itervalues()
-             if isinstance(v, Property)]
+    groups = [v for v in module.__dict__.itervalues()
+              if isinstance(v, PropertyGroup)]
+    grouped = set(id(p) for group in groups for p in group.props)
+    props = groups + [v for v in module.__dict__.itervalues()
+                      if isinstance(v, Property) and id(v) not in grouped]
 
-    success = run_tests(props, verbosity=verbosity, failfast=failfast)
+    if progress is None:
+        success = run_tests(props, verbosity=verbosity, failfast=failfast,
+                            cache=cache)
+    else:
+        with ProgressMonitor(interval=progress):
+            success = run_tests(props, verbosity=verbosity,
+                                failfast=failfast, cache=cache)
     if exit:
         sys.exit(0 if success else 1)
-    return len(props)
+    return len(grouped) + len(props) - len(groups)
 
 
-def run_tests(props, verbosity=1, failfast=False, propagate_exc=False):
+def run_tests(props, verbosity=1, failfast=False, propagate_exc=False,
+              cache=None, reporters=()):
     """Executes tests for given list of properties.
     Returns boolean flag indicating if all the tests succeeded.
+
+    :param props: List of properties, and :class:`PropertyGroup`\ s
+                  whose properties should be checked together
+    :param cache: Optional :class:`ResultCache` to consult for properties
+                  that can be skipped, and to record the results in.
+                  Properties in groups are never skipped.
+    :param reporters: :class:`Reporter`\ s to notify about every property
+                      once it's been checked. They are not closed
+                      by this function.
+
+    Every property is checked with its own seed for random number
+    generator, drawn from the global one.
     """
     verbosity = verbosity or 0
     success = True
 
-    for p in props:
-        results = p.check()
-        failed = [r for r in results if not r.succeeded]
-        if failed:
-            failure = failed[0]
-
-            if verbosity >= 1:
-                success_count = p.tests_count - len(failed)
-                print "%s: failed (only %s out of %s tests passed)." % (
-                    p.func.__name__, success_count, p.tests_count)
-                print "Failure encountered for data:"
-                for k, arg in failure.data.iteritems():
-                    print "  %s = %s" % (k, repr(arg))
-
-                print "Exception:"
-                traceback.print_exception(type(failure.exception),
-                                          failure.exception, failure.traceback)
-
-            success = False
-            if failfast:
+    try:
+        for p in props:
+            checked = _check(p, verbosity, failfast, cache, reporters)
+            for prop, results, duration in checked:
+                if cache is not None:
+                    cache.record(prop, results)
+                for reporter in reporters:
+                    reporter.report(prop, results, duration)
+                if not report_results(prop, results, verbosity):
+                    success = False
+                    if propagate_exc and not failfast:
+                        failure = next(r for r in results if not r.succeeded)
+                        failure.propagate_failure()
+            if failfast and not success:
                 break
-            if propagate_exc:
-                failure.propagate_failure()
-        else:
-            if verbosity >= 2:
-                tags = (r.tags for r in results)
-                print_test_results(p, tags)
+    finally:
+        if cache is not None:
+            cache.save()
 
     return success
 
 
-def print_test_results(prop, results):
+def _check(prop, verbosity, failfast, cache, reporters):
+    """Checks a single property, or a group of them, unless it can be
+    skipped according to the ``cache``.
+
+    :return: List of (property, results, duration) tuples,
+             for every property that has been checked
+    """
+    if isinstance(prop, PropertyGroup):
+        exhaustive = prop.can_exhaust()
+        start = time.time()
+        group_results = prop.check(failfast=failfast, exhaustive=exhaustive,
+                                   seed=random.getrandbits(32))
+        duration = time.time() - start
+        return [(p, results, duration)
+                for p, results in zip(prop.props, group_results)]
+
+    count = None
+    if cache is not None:
+        count = cache.tests_count(prop)
+        if count == 0:
+            reason = "unchanged since %s tests passed" % (
+                cache.passed_count(prop),)
+            if verbosity >= 2:
+                print "%s: skipped (%s)." % (prop.func.__name__, reason)
+            for reporter in reporters:
+                reporter.skip(prop, reason)
+            return []
+
+    exhaustive = prop.can_exhaust(count)
+    start = time.time()
+    results = prop.check(None if exhaustive else count,
+                         failfast=failfast, exhaustive=exhaustive,
+                         seed=random.getrandbits(32))
+    return [(prop, results, time.time() - start)]
+
+
+def report_results(prop, results, verbosity=1):
+    """Prints results of checking a single property,
+    to the extent specified by ``verbosity``.
+
+    :param prop: :class:`Property` that has been checked
+    :param results: List of :class:`TestResult` objects
+    :return: Whether all the tests have passed
+    """
+    failed = [r for r in results if not r.succeeded]
+    if not failed:
+        if verbosity >= 2:
+            print_test_results(prop, (r.tags for r in results),
+                               getattr(results, 'exhaustive', False))
+            print_duplicates(results)
+            print_discards(results)
+            print_disk_usage(results)
+            print_prefetching(results)
+        return True
+
+    if verbosity >= 1:
+        failure = failed[0]
+        success_count = len(results) - len(failed)
+        print "%s: failed (only %s out of %s tests passed)." % (
+            prop.func.__name__, success_count, len(results))
+        print "Failure encountered for data:"
+        for k, arg in failure.data.iteritems():
+            print "  %s = %s" % (k, repr(arg))
+        if failure.replay_token is not None:
+            print "Replay token: %s" % failure.replay_token
+
+        print "Exception:"
+        traceback.print_exception(type(failure.exception),
+                                  failure.exception, failure.traceback)
+    return False
+
+
+def print_test_results(prop, results, exhaustive=False):
     """Prints results of testing a single property.
 
     Results include any statistical information that the property
     has generated though ``yield`` statements.
     """
-    print "%s: passed %s test%s." % (prop.func.__name__,
-                                     prop.tests_count,
-                                     "s" if prop.tests_count != 1 else "")
+    results = list(results)
+    summary = "%s: passed %s test%s" % (prop.func.__name__,
+                                        len(results),
+                                        "s" if len(results) != 1 else "")
+    if exhaustive:
+        summary = "%s: exhaustively verified (all %s inputs)" % (
+            prop.func.__name__, len(results))
+    elif prop.confidence is not None:
+        summary += " (%.2f%% confidence in failure rate below %g%%)" % (
+            100 * confidence_of(len(results), prop.failure_rate),
+            100 * prop.failure_rate)
+    print summary + "."
 
     # gather and display statistics
-    results = list(results)
     with_stats, without_stats = partition(lambda r: len(r) > 0, results)
     if len(with_stats) > 0:
         stats = {}
@@ -93,10 +198,69 @@ def print_test_results(prop, results):
             stats[s] = stats.get(s, 0) + 1
         stats = stats.items()
         if len(without_stats) > 0:
-            stats.append(("<rest>", len(without_stats)))
+            stats.append((("<rest>",), len(without_stats)))
 
         results_count = float(len(results))
         for labels, count in stats:
             percentage = "%.2f%%" % (count * 100 / results_count)
             summary = ", ".join(map(str, labels))
             print "%s: %s" % (percentage.rjust(5), summary)
+
+
+def print_duplicates(results):
+    """Prints how many duplicate inputs have been skipped
+    while checking a property with unique inputs.
+    """
+    duplicates = getattr(results, 'duplicates', 0)
+    if duplicates:
+        generated = float(duplicates + len(results))
+        print "Skipped %s duplicate inputs (%.2f%% of generated)." % (
+            duplicates, duplicates * 100 / generated)
+    if getattr(results, 'exhausted', False):
+        print "Domain exhausted after %s unique inputs." % len(results)
+
+
+def print_discards(results):
+    """Prints how many generated values have been discarded by filters
+    while checking a property, which is the cost of filtering them.
+    """
+    discards = getattr(results, 'discards', 0)
+    if discards:
+        print "Discarded %s generated values (%.2f per test)." % (
+            discards, discards / float(max(len(results), 1)))
+
+
+def print_disk_usage(results):
+    """Prints how much disk space has been used by temporary files
+    generated while checking a property.
+    """
+    written = getattr(results, 'disk_written', 0)
+    if written:
+        print "Wrote %s of temporary files (at most %s at once)." % (
+            format_bytes(written), format_bytes(results.disk_peak))
+
+
+def print_prefetching(results):
+    """Prints how long generation and execution of test cases
+    have been waiting for each other while checking a property
+    with prefetched test data, which tells the slower of them.
+    """
+    waits = []
+    for side, attr in (('generation', 'generation_blocked'),
+                       ('execution', 'execution_blocked')):
+        blocked = getattr(results, attr, None)
+        if blocked is not None:
+            waits.append("%s waited %.3fs" % (side, blocked))
+    if waits:
+        print "Prefetched test data: %s." % ", ".join(waits)
+
+
+def format_bytes(count):
+    """Formats given number of bytes in human-readable units."""
+    for unit in ('bytes', 'KB', 'MB', 'GB'):
+        if count < 1024:
+            break
+        count /= 1024.0
+    else:
+        unit = 'TB'
+    return ("%d %s" if unit == 'bytes' else "%.1f %s") % (count, unit)
@@ -2,6 +2,7 @@
 Statistics for test cases.
 """
 import collections
+import math
 
 
 __all__ = ['collect', 'classify']
@@ -18,8 +19,14 @@ class Tag(object):
     calls from other values that could be yielded
     from property function.
     """
+    __slots__ = ['value']
+
     def __init__(self, value):
-        if not isinstance(value, collections.Hashable):
+        # (hashing is faster than checking for collections.Hashable,
+        # and tags are created for every test case)
+        try:
+            hash(value)
+        except TypeError:
             raise TypeError("tag value must be hashable")
         self.value = value
 
@@ -93,3 +100,39 @@ def classify(condition, label):
     """
     satisfied = condition() if callable(condition) else bool(condition)
     return Tag(label) if satisfied else None
+
+
+# Confidence in test results
+
+def tests_for_confidence(confidence, failure_rate):
+    """Returns the number of passing tests which give given ``confidence``
+    that the probability of a test case failing is below ``failure_rate``.
+    """
+    return int(math.ceil(math.log(1 - confidence) /
+                         math.log(1 - failure_rate)))
+
+
+def confidence_of(tests_passed, failure_rate):
+    """Returns the confidence, given that ``tests_passed`` tests
+    have passed and none have failed, that the probability
+    of a test case failing is below ``failure_rate``.
+    """
+    return 1 - (1 - failure_rate) ** tests_passed
+
+
+def tags_distance(first, second):
+    """Computes the total variation distance between distributions
+    of tags in two lists of test results, i.e. the largest difference
+    in frequency of any set of tags that tests can be stamped with.
+    :return: Number between 0 (same distributions) and 1
+    """
+    def frequencies(results):
+        counts = collections.defaultdict(int)
+        for result in results:
+            counts[frozenset(result.tags)] += 1
+        return dict((tags, float(count) / len(results))
+                    for tags, count in counts.iteritems())
+
+    first, second = frequencies(first), frequencies(second)
+    return sum(abs(first.get(tags, 0.0) - second.get(tags, 0.0))
+               for tags in set(first) | set(second)) / 2
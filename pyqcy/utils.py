@@ -3,8 +3,11 @@ Utility module.
 """
 import itertools
 import functools
+import hashlib
 import inspect
 import collections
+import math
+import struct
 
 
 def partition(pred, iterable):
@@ -26,6 +29,87 @@ def partition(pred, iterable):
     return res
 
 
+def derive_seed(*parts):
+    """Derives a seed for random number generator from given values.
+    The result is the same on every platform and interpreter run,
+    as long as the string representations of values are.
+    :return: Non-negative 64-bit integer
+    """
+    digest = hashlib.md5(':'.join(map(str, parts))).hexdigest()
+    return int(digest[:16], 16)
+
+
+class BloomFilter(object):
+    """Probabilistic set of strings, which can tell that a string
+    is surely not in the set, or is in it with high probability.
+
+    :param capacity: Number of strings expected to be added
+    :param error_rate: Probability of false positives,
+                       once ``capacity`` strings have been added
+    """
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.bit_count = max(int(math.ceil(bits)), 8)
+        self.hash_count = max(int(round(
+            self.bit_count / float(capacity) * math.log(2))), 1)
+        self.bits = bytearray((self.bit_count + 7) // 8)
+
+    def __positions(self, item):
+        """Yields positions of bits that correspond to given string,
+        computed by double hashing.
+        """
+        digest = hashlib.md5(item).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in xrange(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, item):
+        for pos in self.__positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7))
+                   for pos in self.__positions(item))
+
+
+class SeenSet(object):
+    """Set of strings which keeps them exactly, until their number
+    reaches a limit. Beyond it, strings are kept in a :class:`BloomFilter`,
+    which bounds the memory used at the cost of occasional false positives.
+
+    :param limit: Maximum number of strings to keep exactly
+    :param capacity: Number of strings expected to be added in total,
+                     for sizing the Bloom filter
+    """
+    def __init__(self, limit, capacity):
+        self.limit = limit
+        self.capacity = capacity
+        self.exact = set()
+        self.bloom = None
+
+    def add(self, item):
+        """Adds given string to the set.
+        :return: Whether the string wasn't in the set before
+        """
+        if self.bloom is None:
+            if item in self.exact:
+                return False
+            self.exact.add(item)
+            if len(self.exact) > self.limit:
+                self.bloom = BloomFilter(max(self.capacity,
+                                             2 * len(self.exact)))
+                for seen in self.exact:
+                    self.bloom.add(seen)
+                self.exact = None
+            return True
+
+        if item in self.bloom:
+            return False
+        self.bloom.add(item)
+        return True
+
+
 # Decorators
 
 def optional_args(decor):
@@ -148,5 +148,8 @@ setup(
 
     platforms='any',
     packages=find_packages(),
+    entry_points={
+        'pytest11': ['pyqcy = pyqcy.pytest_plugin'],
+    },
     tests_require=read_requirements('test'),
 )
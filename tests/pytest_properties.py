@@ -0,0 +1,19 @@
+"""
+Properties collected by py.test in tests for the pytest plugin.
+"""
+from pyqcy import *
+
+
+@qc(tests=100)
+def addition_commutes(x=int_, y=int_):
+    assert x + y == y + x
+
+
+@qc(tests=20)
+def always_fails(x=int_):
+    assert False
+
+
+@qc
+def digits_are_small(d=int_(min=0, max=9)):
+    assert d < 10
@@ -3,9 +3,18 @@ Unit tests for arbitraries.
 """
 import unittest
 
+import os
+import math
 import random
 import json
 import string
+import sys
+
+from array import array
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 from pyqcy import *
 
@@ -67,6 +76,174 @@ class General(unittest.TestCase):
 
         sort_finds_minimum.test()
 
+    def test_arbitrary_with_function_args(self):
+        @arbitrary(functions=['func'])
+        def applied(gen, func):
+            return func(next(gen))
+
+        assert isinstance(next(applied(int, str)), str)
+        assert isinstance(next(applied(int, func=str)), str)
+
+
+class Sizing(unittest.TestCase):
+    """Test cases for sizing of generated values."""
+
+    def test_smallest_size(self):
+        from pyqcy.arbitraries import sized
+        with sized(0):
+            assert len(next(list_(int, min_length=3))) == 3
+            assert len(next(str_(min_length=2, max_length=8))) == 2
+            assert -1 <= next(int_()) <= 1
+            assert next(int_(min=1000, max=2000)) <= 1001
+
+    def test_unsized_values(self):
+        from pyqcy.arbitraries import current_size
+        assert current_size() is None
+        assert any(len(next(list_(int, min_length=1))) > 1
+                   for _ in xrange(10))
+
+    def test_sizes_grow_during_check(self):
+        from pyqcy.arbitraries import MAX_SIZE
+        results = collects_list_length.check(count=MAX_SIZE + 1)
+        lengths = [tuple(r.tags)[0] for r in results]
+        assert lengths[0] == 0
+        assert max(lengths[:10]) <= 10 * 1024 // MAX_SIZE
+
+
+@qc
+def collects_list_length(l=list_(of=int)):
+    yield collect(len(l))
+
+collects_list_length.boundary_cases = 0     # (only sizing is tested)
+
+
+class Enumerations(unittest.TestCase):
+    """Test cases for enumerating all values of generators."""
+
+    def test_ints_from_zero(self):
+        values = list(enumeration(int_(min=-2, max=3)))
+        assert values == [0, 1, -1, 2, -2, 3]
+
+    def test_elements(self):
+        assert list(enumeration(elements(1, 2, 3))) == [1, 2, 3]
+        subsets = enumeration(elements(range(5), count=2))
+        assert subsets.size == 10
+        assert len(set(map(tuple, subsets))) == 10
+
+    def test_tuples_breadth_first(self):
+        pairs = list(enumeration(two(int_(min=0, max=2))))
+        assert len(pairs) == 9
+        assert pairs[:3] == [(0, 0), (0, 1), (1, 0)]
+        assert pairs[-1] == (2, 2)
+
+    def test_lists_shortest_first(self):
+        lists = enumeration(list_(of=[0, 1], max_length=2))
+        assert lists.size == 7
+        assert list(lists)[:3] == [[], [0], [1]]
+
+    def test_strings(self):
+        strings = list(enumeration(str_(of='ab', max_length=2)))
+        assert strings == ['a', 'b', 'aa', 'ab', 'ba', 'bb']
+
+    def test_enumeration_is_lazy(self):
+        lists = enumeration(list_(of=int))
+        assert lists.size > 2 ** 64
+        first = next(iter(lists))
+        assert first == []
+
+    def test_not_enumerable(self):
+        assert enumeration(float_()) is None
+        assert enumeration(list_(of=float)) is None
+
+
+class Numbers(unittest.TestCase):
+    """Test cases for generators of arbitrary numbers."""
+
+    def test_float_magnitudes(self):
+        floats = [next(float_()) for _ in xrange(100)]
+        assert any(abs(x) < 1e-100 for x in floats)
+        assert any(abs(x) > 1.0 for x in floats)
+        assert all(abs(x) <= float(sys.maxint) for x in floats)
+
+    def test_float_special_values(self):
+        floats = [next(float_(min=-1.0, max=2.0, special=0.5))
+                  for _ in xrange(200)]
+        assert all(-1.0 <= x <= 2.0 for x in floats)
+        assert set([-1.0, 0.0, 2.0]) <= set(floats)
+        assert any(math.copysign(1, x) < 0 for x in floats if x == 0)
+
+        floats = [next(float_(special=0)) for _ in xrange(100)]
+        assert 0.0 not in floats
+
+    def test_float_nan_and_infinity(self):
+        @qc
+        def floats_are_finite(x=float_(min=0.0)):
+            assert not (math.isnan(x) or math.isinf(x))
+        floats_are_finite.test()
+
+        floats = [next(float_(special=1, nan=True, infinity=True))
+                  for _ in xrange(500)]
+        assert any(math.isnan(x) for x in floats)
+        assert any(math.isinf(x) for x in floats)
+
+    def test_complex_arbitrary(self):
+        @qc
+        def complex_parts_within_range(
+            z=complex_(min_real=-1.0, max_real=1.0,
+                       min_imag=0.0, max_imag=10.0)
+        ):
+            assert -1.0 <= z.real <= 1.0 and 0.0 <= z.imag <= 10.0
+
+        complex_parts_within_range.test()
+
+
+class Boundaries(unittest.TestCase):
+    """Test cases for boundary values of generators."""
+
+    def test_ints(self):
+        assert boundaries(int_(min=-3, max=10)) == [0, -3, 10, 1, -1]
+        assert boundaries(int_(min=5, max=6)) == [5, 6]
+
+    def test_collections(self):
+        assert boundaries(list_(of=elements(1, 2), max_length=3)) == [
+            [], [1], [2], [2, 2, 2]]
+        assert boundaries(str_(of='xy', min_length=2, max_length=4)) == [
+            'xx', 'yyyy']
+        assert (0, 'a') in boundaries(tuple_(int, str_(of='ab')))
+
+    def test_combinators(self):
+        assert boundaries(such_that(int_(min=0, max=9), lambda x: x > 0)) \
+            == [9, 1]
+        assert boundaries(map_(elements(1, 2), str)) == ['1', '2']
+        assert boundaries(one_of(elements(1, 2), elements('a'))) == [
+            1, 'a', 2]
+        assert boundaries(regex('a+')) is None
+
+    def test_elements_subsets(self):
+        assert boundaries(elements(1, 2, 3, count=2)) == [[1, 2], [2, 3]]
+        assert boundaries(elements(1, 2, 3, count=0)) == [[]]
+        assert boundaries(elements(1, 2, 3, count=5)) == [[1, 2, 3]]
+
+    def test_custom_boundaries(self):
+        @arbitrary
+        def evens(max=100):
+            return 2 * random.randint(0, max // 2)
+
+        @has_boundaries(evens)
+        def evens_boundaries(max=100):
+            return [0, max - max % 2]
+
+        assert boundaries(evens(max=9)) == [0, 8]
+
+    def test_pairwise_combinations(self):
+        from pyqcy.arbitraries.boundaries import combinations
+        values = [range(4)] * 4
+        rows = combinations(values, 20)
+        assert len(rows) <= 20 and rows[0] == (0, 0, 0, 0)
+        pairs = set((i, j, r[i], r[j]) for r in rows
+                    for i in xrange(4) for j in xrange(i + 1, 4))
+        assert len(pairs) == 6 * 16
+
 
 class Strings(unittest.TestCase):
     """Test cases for arbitrary generators producing strings."""
@@ -101,6 +278,89 @@ class Strings(unittest.TestCase):
         ipv4_is_within_range.test()
 
 
+class Binary(unittest.TestCase):
+    """Test cases for generators of arbitrary binary data."""
+
+    def test_bytes_arbitrary(self):
+        @qc
+        def bytes_have_right_length(
+            b=bytes_(min_length=16, max_length=4096),
+            ba=bytearray_(max_length=16)
+        ):
+            assert isinstance(b, str) and 16 <= len(b) <= 4096
+            assert isinstance(ba, bytearray) and len(ba) <= 16
+
+        bytes_have_right_length.test()
+
+    def test_bytes_of_alphabet(self):
+        @qc
+        def bytes_are_from_alphabet(
+            b=bytes_(of='0123456789', min_length=1000, max_length=1000),
+            c=bytes_(of=[0, 255], min_length=10, max_length=10)
+        ):
+            assert len(b) == 1000 and set(b) <= set('0123456789')
+            assert len(c) == 10 and set(c) <= set('\x00\xff')
+
+        bytes_are_from_alphabet.test()
+
+    def test_memoryview_arbitrary(self):
+        @qc
+        def memoryview_is_zero_copy(
+            m=memoryview_(min_length=1, max_length=64, writable=True)
+        ):
+            assert not m.readonly and 1 <= len(m) <= 64
+            m[0] = 'x'
+            assert m.tobytes()[0] == 'x'
+
+        memoryview_is_zero_copy.test()
+
+
+class Files(unittest.TestCase):
+    """Test cases for generators of temporary files."""
+
+    def test_binary_file(self):
+        paths = []
+
+        @qc
+        def binary_file_has_content(
+            path=binary_file(of='01', min_size=1, max_size=4096)
+        ):
+            paths.append(path)
+            with open(path, 'rb') as f:
+                content = f.read()
+            assert 1 <= len(content) <= 4096 and set(content) <= set('01')
+
+        results = binary_file_has_content.check()
+        assert all(r.succeeded for r in results)
+        assert results.disk_written >= len(results)
+        assert not any(os.path.exists(p) for p in paths)
+
+    def test_lines_file_mmap(self):
+        @qc(threads=2)
+        def lines_file_has_records(
+            m=lines_file(data({'id': int, 'tag': str_(of='abc')}),
+                         min_size=1, max_size=1 << 14, mmap=True)
+        ):
+            lines = m[:].splitlines()
+            assert lines and all(set(json.loads(l)) == set(['id', 'tag'])
+                                 for l in lines)
+
+        lines_file_has_records.test()
+
+    def test_disk_limit(self):
+        @qc
+        def files_exceed_disk_limit(
+            path=binary_file(min_size=1 << 16, max_size=1 << 16)
+        ):
+            pass
+
+        files_exceed_disk_limit.disk_limit = 1 << 15
+        self.assertRaises(GenerationError, files_exceed_disk_limit.check)
+
+        from pyqcy.arbitraries.files import disk_usage
+        assert disk_usage.current == 0
+
+
 class Collections(unittest.TestCase):
     """Test cases for generators producing arbitrary collections."""
 
@@ -130,6 +390,43 @@ class Collections(unittest.TestCase):
 
         set_inclusion_works.test()
 
+    def test_set_exact_length(self):
+        @qc
+        def set_has_min_length(s=set_(of=int_(min=0, max=9), min_length=8)):
+            assert 8 <= len(s) <= 10
+            assert s <= set(range(10))
+
+        set_has_min_length.test()
+
+    def test_set_of_wide_int_range(self):
+        @qc
+        def set_samples_int_range(
+            s=set_(of=int_(min=-10 ** 6, max=10 ** 6), min_length=500,
+                   max_length=500)
+        ):
+            assert len(s) == 500
+            assert all(-10 ** 6 <= x <= 10 ** 6 for x in s)
+
+        set_samples_int_range.test()
+
+    def test_set_too_long(self):
+        @qc
+        def set_cannot_be_long_enough(
+            s=set_(of=int_(min=0, max=2), min_length=4)
+        ):
+            pass
+
+        self.assertRaises(GenerationError, set_cannot_be_long_enough.check)
+
+    def test_dict_exact_length(self):
+        @qc
+        def dict_has_min_length(
+            d=dict_(keys=str_(max_length=1), values=int, min_length=50)
+        ):
+            assert len(d) >= 50
+
+        dict_has_min_length.test()
+
     def test_dict_arbitrary(self):
         @qc
         def dict_update_works(
@@ -244,3 +541,149 @@ class Combinators(unittest.TestCase):
             assert isinstance(x, (float, int))
 
         frequency_works.test()
+
+    def test_such_that(self):
+        @qc
+        def such_that_filters_values(
+            x=such_that(int_(min=0, max=1000), lambda x: x % 3 == 0)
+        ):
+            assert x % 3 == 0
+
+        results = such_that_filters_values.check()
+        assert all(r.succeeded for r in results)
+        assert results.discards > 0
+
+    def test_such_that_too_strict(self):
+        @qc
+        def such_that_never_satisfied(
+            x=such_that(int_(min=0, max=10), lambda x: x > 10)
+        ):
+            pass
+
+        self.assertRaises(GenerationError, such_that_never_satisfied.check)
+
+    def test_such_that_grows_size(self):
+        @qc
+        def such_that_needs_large_values(
+            x=such_that(int_(min=0), lambda x: x > 1000)
+        ):
+            assert x > 1000
+
+        such_that_needs_large_values.test()
+
+    def test_map(self):
+        @qc
+        def map_transforms_values(x=map_(int_(min=0, max=100), str)):
+            assert isinstance(x, str)
+            assert 0 <= int(x) <= 100
+
+        map_transforms_values.test()
+
+    def test_flat_map(self):
+        @qc
+        def flat_map_chains_generators(
+            p=flat_map(int_(min=1, max=16),
+                       lambda n: tuple_(elements([n]), list_(
+                           of=int, min_length=n, max_length=n)))
+        ):
+            n, l = p
+            assert len(l) == n
+
+        flat_map_chains_generators.test()
+
+    def test_recursive(self):
+        def depth_and_leaves(tree):
+            if not isinstance(tree, list):
+                return 0, 1
+            subtrees = map(depth_and_leaves, tree)
+            return (1 + max([d for d, _ in subtrees] or [0]),
+                    sum(l for _, l in subtrees))
+
+        @qc
+        def recursive_is_bounded(
+            tree=recursive_(int, lambda children: list_(of=children,
+                                                        max_length=3),
+                            max_depth=3, max_leaves=8)
+        ):
+            depth, leaves = depth_and_leaves(tree)
+            yield collect(depth)
+            assert depth <= 3
+            assert leaves <= 8
+
+        results = recursive_is_bounded.check(500)
+        assert all(r.succeeded for r in results)
+        depths = set(tag for r in results for tag in r.tags)
+        assert 0 in depths and 3 in depths
+
+    def test_recursive_doesnt_alias_subtrees(self):
+        @qc
+        def recursive_has_no_shared_lists(
+            tree=recursive_(int, lambda children: list_(of=children,
+                                                        max_length=4))
+        ):
+            seen = set()
+            stack = [tree]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, list):
+                    assert id(node) not in seen
+                    seen.add(id(node))
+                    stack.extend(node)
+
+        recursive_has_no_shared_lists.test()
+
+
+
+class Batches(unittest.TestCase):
+    """Test cases for columnar batches of records."""
+
+    def test_columns_of_tuples(self):
+        @qc
+        def columns_have_all_rows(
+            batch=columns(tuple_(int_(min=0, max=9), float_(min=0, max=1),
+                                 str_(max_length=4)), rows=50)
+        ):
+            ints, floats, strs = batch
+            assert isinstance(ints, array) and ints.typecode == 'l'
+            assert isinstance(floats, array) and floats.typecode == 'd'
+            assert isinstance(strs, list)
+            assert len(ints) == len(floats) == len(strs) == 50
+            assert all(0 <= i <= 9 for i in ints)
+            assert all(0.0 <= f <= 1.0 for f in floats)
+
+        columns_have_all_rows.test()
+
+    def test_columns_of_dicts(self):
+        @qc
+        def columns_are_named(
+            batch=columns({'id': int, 'kind': 'x',
+                           'tags': list_(of=str, max_length=4)}, rows=10)
+        ):
+            assert set(batch) == set(['id', 'kind', 'tags'])
+            assert batch['kind'] == ['x'] * 10
+            assert all(isinstance(t, list) for t in batch['tags'])
+
+        columns_are_named.test()
+
+    def test_columns_are_sized(self):
+        from pyqcy.arbitraries import sized, to_arbitrary
+        with sized(0):
+            batch = next(to_arbitrary(columns((int,), rows=100)))
+        assert all(abs(i) <= 1 for i in batch[0])
+
+    def test_columns_invalid_schema(self):
+        self.assertRaises(TypeError, columns, list_(of=int), rows=10)
+        self.assertRaises(ValueError, columns, (int,), rows=-1)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_columns(self):
+        @qc
+        def columns_are_numpy_arrays(
+            batch=columns((int, int_(min=-5, max=5), float), rows=1000,
+                          numpy=True)
+        ):
+            for col in batch:
+                assert isinstance(col, np.ndarray) and len(col) == 1000
+            assert -5 <= batch[1].min() <= batch[1].max() <= 5
+
+        columns_are_numpy_arrays.test()
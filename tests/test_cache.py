@@ -0,0 +1,90 @@
+"""
+Unit tests for the cache of test results.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyqcy import *
+from pyqcy.cache import ResultCache
+from pyqcy import runner
+
+
+class Cache(unittest.TestCase):
+    """Test cases for caching results of properties."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_key_is_stable(self):
+        cache = ResultCache(self.path, salt='rev1')
+        key = cache.key(sort_works)
+        sort_works.check(count=10)
+        assert cache.key(sort_works) == key
+        assert cache.key(sort_works(l=[])) != key
+
+    def test_key_of_curried_property_is_stable(self):
+        cache = ResultCache(self.path, salt='rev1')
+        curried = sort_works_on_floats(l=[1.0])
+        key = cache.key(curried)
+        sort_works_on_floats.check(count=10)
+        assert cache.key(curried) == key
+
+    def test_key_covers_generators(self):
+        cache = ResultCache(self.path, salt='rev1')
+        assert cache.key(sort_works) != cache.key(sort_works_on_floats)
+
+    def test_key_covers_salt(self):
+        assert (ResultCache(self.path, salt='rev1').key(sort_works) !=
+                ResultCache(self.path, salt='rev2').key(sort_works))
+
+    def test_skip_mode_requires_salt(self):
+        self.assertRaises(ValueError, ResultCache, self.path)
+        ResultCache(self.path, mode='reduce')
+
+    def test_skip_mode(self):
+        cache = ResultCache(self.path, salt='rev1')
+        assert runner.run_tests([sort_works], verbosity=0, cache=cache)
+        assert cache.passed_count(sort_works) == sort_works.tests_count
+
+        cache = ResultCache(self.path, salt='rev1')
+        assert cache.tests_count(sort_works) == 0
+
+    def test_reduce_mode(self):
+        runner.run_tests([sort_works], verbosity=0,
+                         cache=ResultCache(self.path, salt='rev1'))
+
+        cache = ResultCache(self.path, mode='reduce', salt='rev1',
+                            fraction=0.5)
+        assert cache.tests_count(sort_works) == sort_works.tests_count / 2
+        runner.run_tests([sort_works], verbosity=0, cache=cache)
+        assert cache.passed_count(sort_works) == \
+            sort_works.tests_count * 3 / 2
+
+    def test_failures_are_not_cached(self):
+        cache = ResultCache(self.path, salt='rev1')
+        assert not runner.run_tests([sort_fails], verbosity=0, cache=cache)
+        cache = ResultCache(self.path, salt='rev1')
+        assert cache.passed_count(sort_fails) == 0
+
+
+# Test properties
+
+@qc
+def sort_works(l=list_(of=int, max_length=64)):
+    assert len(sorted(l)) == len(l)
+
+
+@qc
+def sort_works_on_floats(l=list_(of=float, max_length=64)):
+    assert len(sorted(l)) == len(l)
+
+
+@qc
+def sort_fails(l=list_(of=int, max_length=64)):
+    assert False
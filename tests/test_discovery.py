@@ -0,0 +1,65 @@
+"""
+Unit tests for discovery and sharding of properties.
+"""
+import os
+import unittest
+
+from pyqcy.discovery import discover, shard
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Discovery(unittest.TestCase):
+    """Test cases for discovering properties."""
+
+    def test_discover_directory(self):
+        names = [name for name, _ in discover(TESTS_DIR)]
+        assert 'tests.test_properties.failing' in names
+        assert 'tests.test_statistics.sorting_short_lists' in names
+        assert names == sorted(names)
+
+    def test_discover_module(self):
+        from tests import test_properties
+        props = discover('tests.test_properties')
+        assert all(name.startswith('tests.test_properties.')
+                   for name, _ in props)
+        assert any(prop is test_properties.failing for _, prop in props)
+
+    def test_grouped_properties_found_individually(self):
+        from tests import test_properties
+        props = [prop for _, prop in discover('tests.test_properties')]
+        assert all(any(prop is p for p in props)
+                   for prop in test_properties.sorting.props)
+
+    def test_properties_found_once(self):
+        props = discover(TESTS_DIR, 'tests.test_properties')
+        assert len(props) == len(set(id(prop) for _, prop in props))
+
+
+class Sharding(unittest.TestCase):
+    """Test cases for splitting properties into shards."""
+
+    def setUp(self):
+        self.props = discover(TESTS_DIR)
+
+    def test_shards_cover_all_properties(self):
+        self._check_shards(3)
+
+    def test_shards_balanced_by_durations(self):
+        durations = dict((name, float(i))
+                         for i, (name, _) in enumerate(self.props))
+        shards = self._check_shards(2, durations)
+        loads = [sum(durations[name] for name, _ in s) for s in shards]
+        assert abs(loads[0] - loads[1]) <= max(durations.itervalues())
+
+    def test_invalid_shard(self):
+        self.assertRaises(ValueError, shard, self.props, 0, 2)
+        self.assertRaises(ValueError, shard, self.props, 3, 2)
+
+    def _check_shards(self, count, durations=None):
+        shards = [shard(self.props, i, count, durations)
+                  for i in xrange(1, count + 1)]
+        names = sorted(name for s in shards for name, _ in s)
+        assert names == [name for name, _ in self.props]
+        return shards
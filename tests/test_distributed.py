@@ -0,0 +1,142 @@
+"""
+Unit tests for distributed checking of properties.
+"""
+from StringIO import StringIO
+import json
+import multiprocessing
+import socket
+import threading
+import unittest
+
+from pyqcy import *
+from pyqcy.distributed import Coordinator, work, recv_message
+from pyqcy.reporters import JSONReporter, Reporter
+
+
+class Distributed(unittest.TestCase):
+    """Test cases for the coordinator and workers."""
+
+    def setUp(self):
+        self.props = [('sort_works', sort_works)]
+
+    def test_single_worker(self):
+        coordinator = Coordinator(self.props, ('127.0.0.1', 0), unit_size=7)
+        self._start_workers(coordinator, 1)
+        assert coordinator.run(verbosity=0)
+
+    def test_many_workers(self):
+        coordinator = Coordinator(self.props, ('127.0.0.1', 0), unit_size=3)
+        self._start_workers(coordinator, 4)
+        assert coordinator.run(verbosity=0)
+
+    def test_failures_are_reported(self):
+        props = self.props + [('sort_fails', sort_fails)]
+        coordinator = Coordinator(props, ('127.0.0.1', 0), unit_size=10)
+        self._start_workers(coordinator, 2, props)
+        assert not coordinator.run(verbosity=0)
+
+    def test_results_are_passed_to_reporters(self):
+        props = self.props + [('sort_fails', sort_fails)]
+        coordinator = Coordinator(props, ('127.0.0.1', 0), unit_size=10)
+        self._start_workers(coordinator, 2, props)
+        stream = StringIO()
+        coordinator.run(verbosity=0, reporters=[JSONReporter(stream)])
+
+        records = map(json.loads, stream.getvalue().splitlines())
+        assert [r['status'] for r in records] == ['passed', 'failed']
+        assert all(r['seed'] == coordinator.seed for r in records)
+
+    def test_results_equal_single_process(self):
+        props = [('sort_keeps_odd', sort_keeps_odd)]
+        coordinator = Coordinator(props, ('127.0.0.1', 0), unit_size=9)
+        self._start_workers(coordinator, 3, props)
+        reporter = CollectingReporter()
+        assert not coordinator.run(verbosity=0, reporters=[reporter])
+
+        (_, merged), = reporter.reported
+        expected = sort_keeps_odd.check(seed=coordinator.seed)
+        assert len(merged) == len(expected)
+        assert [r.tags for r in merged] == [r.tags for r in expected]
+        assert [r.replay_token for r in merged] == \
+            [r.replay_token for r in expected]
+        assert [r.succeeded for r in merged] == \
+            [r.succeeded for r in expected]
+
+        failures = [(m, e) for m, e in zip(merged, expected)
+                    if not e.succeeded]
+        assert failures
+        for m, e in failures:
+            assert m.data == dict((k, repr(v)) for k, v in e.data.items())
+        assert merged.discards == expected.discards > 0
+
+    def test_generation_errors_are_reported(self):
+        props = [('cannot_generate', cannot_generate)]
+        coordinator = Coordinator(props, ('127.0.0.1', 0), unit_size=10)
+        self._start_workers(coordinator, 2, props)
+        reporter = CollectingReporter()
+        assert not coordinator.run(verbosity=0, reporters=[reporter])
+
+        (_, results), = reporter.reported
+        failure = next(r for r in results if not r.succeeded)
+        assert failure.exception.type_name == 'GenerationError'
+        assert 'Traceback' in failure.exception.traceback_text
+
+    def test_units_of_dead_workers_are_reassigned(self):
+        coordinator = Coordinator(self.props, ('127.0.0.1', 0), unit_size=10)
+
+        def die_after_receiving_unit():
+            sock = socket.create_connection(coordinator.address)
+            recv_message(sock)
+            sock.close()
+            self._start_workers(coordinator, 1)
+        dying_worker = threading.Thread(target=die_after_receiving_unit)
+        dying_worker.daemon = True
+        dying_worker.start()
+
+        assert coordinator.run(verbosity=0)
+
+    def _start_workers(self, coordinator, count, props=None):
+        # (workers are processes of their own, like they would be
+        # in real use, rather than threads sharing the properties)
+        for _ in xrange(count):
+            worker = multiprocessing.Process(target=work,
+                                             args=(coordinator.address,
+                                                   props or self.props))
+            worker.daemon = True
+            worker.start()
+
+
+class CollectingReporter(Reporter):
+    """Reporter which keeps the results it's been given."""
+
+    def __init__(self):
+        self.reported = []
+
+    def report(self, prop, results, duration):
+        self.reported.append((prop, results))
+
+
+# Test properties
+
+@qc
+def sort_works(l=list_(of=int, max_length=64)):
+    assert len(sorted(l)) == len(l)
+
+
+@qc
+def sort_fails(l=list_(of=int, max_length=64)):
+    assert False
+
+
+@qc(tests=40)
+def sort_keeps_odd(l=list_(of=such_that(int_(min=0, max=100),
+                                         lambda x: x % 2),
+                           max_length=16)):
+    yield collect(repr(l))
+    assert len(l) < 12
+    assert all(x % 2 for x in sorted(l))
+
+
+@qc
+def cannot_generate(x=such_that(int_(min=0, max=10), lambda x: x > 10)):
+    pass
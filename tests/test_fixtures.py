@@ -0,0 +1,129 @@
+"""
+Unit tests for fixtures.
+"""
+import unittest
+from collections import OrderedDict
+from pyqcy import *
+from pyqcy.fixtures import FixtureSession
+
+
+class Fixtures(unittest.TestCase):
+    """Test cases for resources provided to properties by fixtures."""
+
+    def setUp(self):
+        del EVENTS[:]
+
+    def test_case_scope(self):
+        uses_case_resource.check(count=10)
+        assert EVENTS.count('setup') == 10
+        assert EVENTS.count('teardown') == 10
+
+    def test_property_scope(self):
+        results = uses_property_resource.check(count=10)
+        assert all(r.succeeded for r in results)
+        assert EVENTS.count('setup') == 1
+        assert EVENTS.count('teardown') == 1
+        assert EVENTS.count('reset') == 10
+
+    def test_worker_scope(self):
+        results = uses_worker_resource.check(count=50)
+        assert all(r.succeeded for r in results)
+        assert 1 <= EVENTS.count('setup') <= uses_worker_resource.threads
+        assert EVENTS.count('setup') == EVENTS.count('teardown')
+
+    def test_forked_cases(self):
+        results = mutates_forked_resource.check(count=10)
+        assert all(r.succeeded for r in results)
+
+    def test_failing_forked_case(self):
+        self.assertRaises(CheckError, fails_in_fork.test)
+
+    def test_currying(self):
+        results = uses_property_resource(x=42).check(count=5)
+        assert all(r.succeeded for r in results)
+        assert EVENTS.count('setup') == 1
+
+    def test_failed_setup_tears_down_resources(self):
+        session = FixtureSession(OrderedDict([
+            ('res', property_resource), ('broken', broken_setup)]))
+        self.assertRaises(ValueError, session.__enter__)
+        assert EVENTS == ['setup', 'teardown']
+
+    def test_failed_teardown_tears_down_the_rest(self):
+        session = FixtureSession(OrderedDict([
+            ('res', property_resource), ('broken', broken_teardown)]))
+        session.__enter__()
+        self.assertRaises(ValueError, session.__exit__, None, None, None)
+        assert EVENTS == ['setup', 'teardown']
+
+    def test_invalid_scope(self):
+        self.assertRaises(ValueError, fixture, scope='session')
+
+
+# Test fixtures & properties
+
+EVENTS = []
+
+
+@fixture
+def case_resource():
+    EVENTS.append('setup')
+    yield []
+    EVENTS.append('teardown')
+
+
+@fixture(scope='property', reset=lambda l: EVENTS.append('reset'))
+def property_resource():
+    EVENTS.append('setup')
+    yield []
+    EVENTS.append('teardown')
+
+
+@fixture(scope='property')
+def broken_setup():
+    raise ValueError("cannot set up")
+
+
+@fixture(scope='property')
+def broken_teardown():
+    yield None
+    raise ValueError("cannot tear down")
+
+
+@fixture(scope='worker')
+def worker_resource():
+    EVENTS.append('setup')
+    yield set()
+    EVENTS.append('teardown')
+
+
+@fixture(scope='property')
+def forked_resource():
+    return []
+
+
+@qc
+def uses_case_resource(res=case_resource, x=int):
+    res.append(x)
+    assert res == [x]
+
+
+@qc
+def uses_property_resource(res=property_resource, x=int):
+    assert isinstance(res, list)
+
+
+@qc(threads=4)
+def uses_worker_resource(res=worker_resource, x=int):
+    assert isinstance(res, set)
+
+
+@qc(fork=True)
+def mutates_forked_resource(res=forked_resource, x=int):
+    res.append(x)
+    assert res == [x]
+
+
+@qc(fork=True)
+def fails_in_fork(res=forked_resource, x=int):
+    assert False
@@ -20,6 +20,15 @@ class Integration(unittest.TestCase):
         ):
             assert min(l) == list(sorted(l))[0]
 
+    class SortingWithFixtures(TestCase):
+        @fixture(scope='property')
+        def sorted_range():
+            return range(128)
+
+        @qc(tests=1)
+        def sort_is_idempotent(l=sorted_range):
+            assert sorted(l) == l
+
     def setUp(self):
         loader = unittest.TestLoader()
         self.qc_suite = loader.loadTestsFromTestCase(Integration.Sorting)
@@ -31,6 +40,15 @@ class Integration(unittest.TestCase):
 
         assert results.wasSuccessful()
 
+    def test_running_testcase_with_fixtures(self):
+        loader = unittest.TestLoader()
+        suite = loader.loadTestsFromTestCase(Integration.SortingWithFixtures)
+        results = unittest.TextTestRunner(
+            stream=open(os.devnull, 'w'), verbosity=0).run(suite)
+
+        assert results.testsRun == 1
+        assert results.wasSuccessful()
+
     def test_property_names_in_test_description(self):
         from pyqcy.properties import Property
 
@@ -0,0 +1,110 @@
+"""
+Unit tests for generation of test data in worker processes.
+"""
+from array import array
+import glob
+import os
+import time
+import unittest
+
+from pyqcy import *
+from pyqcy.processes import (SHARED_MIN_SIZE, GeneratorPool, dump_shared,
+                             load_shared)
+from pyqcy.properties import Property
+
+
+class SharedMemory(unittest.TestCase):
+    """Test cases for passing test data through shared memory."""
+
+    def test_small_values_are_pickled(self):
+        data = {'s': 'foo', 'l': [1, 2.5, u'bar'], 'a': array('i', [1])}
+        payload, path = dump_shared(data)
+        assert path is None
+        assert load_shared(payload, path) == data
+
+    def test_large_values_are_shared(self):
+        big = 'x' * SHARED_MIN_SIZE
+        data = {'s': big, 'nested': [bytearray(big), ('y', big + 'z')],
+                'a': array('d', xrange(SHARED_MIN_SIZE))}
+        payload, path = dump_shared(data)
+        assert path is not None and os.path.exists(path)
+        assert len(payload) < SHARED_MIN_SIZE
+
+        loaded = load_shared(payload, path)
+        assert loaded == data
+        assert type(loaded['nested'][0]) is bytearray
+        assert not os.path.exists(path)
+
+
+class GeneratorProcesses(unittest.TestCase):
+    """Test cases for properties with test data generated in processes."""
+
+    def test_same_data_as_in_single_process(self):
+        results = in_processes.check(60, seed=3)
+        single = Property(in_processes.func, in_processes.data)
+        expected = single.check(60, seed=3)
+        assert [r.data for r in results] == [r.data for r in expected]
+        assert all(r.succeeded for r in results)
+        assert results.execution_blocked >= 0
+        assert results.discards == expected.discards > 0
+
+        replayed = in_processes.replay(results[-1].replay_token)
+        assert replayed.data == results[-1].data
+
+    def test_failfast(self):
+        results = failing_in_processes.check(1000, failfast=True)
+        assert len(results) < 1000
+        assert not results[-1].succeeded
+
+    def test_generation_error(self):
+        prop = qc(processes=2)(
+            lambda x=such_that(int_(min=0, max=10), lambda x: x > 10): 0)
+        self.assertRaises(GenerationError, prop.check)
+
+    def test_data_with_resources(self):
+        prop = qc(processes=2)(lambda f=binary_file(max_size=16): 0)
+        self.assertRaises(ValueError, prop.check)
+
+    def test_close_terminates_busy_workers(self):
+        files = lambda: glob.glob('/dev/shm/pyqcy-%d-*' % os.getpid())
+        pool = GeneratorPool(slow_data, xrange(6), 2, 2, chunk=2)
+        try:
+            assert pool.next_data()['s'] == 'x' * SHARED_MIN_SIZE
+            time.sleep(0.5)     # for the busy workers to create some files
+        finally:
+            started = time.time()
+            pool.close()
+        assert time.time() - started < 10
+        assert files() == []
+
+    def test_invalid_processes(self):
+        self.assertRaises(ValueError, qc(processes=0), lambda x=int: 0)
+        self.assertRaises(ValueError, qc(processes=2, unique=True),
+                          lambda x=int: 0)
+
+
+# Test data & properties
+
+class Data(dict):
+    cleanups = ()
+
+
+def slow_data(index):
+    """Returns large test data, taking forever for every test case
+    but the first few.
+    """
+    if index % 2 and index > 1:
+        time.sleep(60)
+    return Data(s='x' * SHARED_MIN_SIZE)
+
+
+@qc(processes=3)
+def in_processes(s=str_(max_length=SHARED_MIN_SIZE * 2),
+                 l=list_(of=int_(min=0, max=100)),
+                 x=such_that(int_(min=0, max=100), lambda x: x % 2)):
+    assert x % 2
+
+
+@qc(processes=2)
+def failing_in_processes(x=int_(min=0, max=100)):
+    assert x < 90
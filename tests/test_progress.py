@@ -0,0 +1,94 @@
+"""
+Unit tests for reporting progress of long test runs.
+"""
+from StringIO import StringIO
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pyqcy import *
+from pyqcy.progress import ProgressMonitor, progress
+
+
+class Progress(unittest.TestCase):
+    """Test cases for progress and metrics of test runs."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'pyqcy.prom')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cases_are_counted(self):
+        cases, passed = progress.cases, progress.passed
+        sort_works.check(count=50)
+        assert progress.cases == cases + 50
+        assert progress.passed == passed + 1
+        assert progress.name is None
+
+    def test_concurrent_cases_are_counted(self):
+        cases = progress.cases
+        sort_works(threads=4).check(count=50)
+        assert progress.cases == cases + 50
+
+    def test_failures_are_counted(self):
+        failed = progress.failed
+        always_fails.check(count=10)
+        assert progress.failed == failed + 1
+
+    def test_progress_is_printed(self):
+        stream = StringIO()
+        with ProgressMonitor(interval=0.01, stream=stream):
+            slow_property.check(count=40)
+        assert "slow_property: " in stream.getvalue()
+        assert "/40 test cases (" in stream.getvalue()
+
+    def test_metrics_file(self):
+        with ProgressMonitor(interval=0.01, stream=None,
+                             metrics_file=self.path) as monitor:
+            slow_property.check(count=20)
+
+            progress.start(slow_property, 20)
+            try:
+                monitor.update()
+            finally:
+                progress.finish([])
+            with open(self.path) as f:
+                metrics = self._parse_metrics(f.read())
+            assert metrics['pyqcy_property_cases_planned'
+                           '{property="slow_property"}'] == 20
+
+        with open(self.path) as f:
+            metrics = self._parse_metrics(f.read())
+        assert metrics['pyqcy_cases_total'] == progress.cases
+        assert 'pyqcy_properties_total{result="passed"}' in metrics
+        assert not any(k.startswith('pyqcy_property_') for k in metrics)
+        assert os.listdir(self.tmp_dir) == ['pyqcy.prom']
+
+    def _parse_metrics(self, text):
+        metrics = {}
+        for line in text.splitlines():
+            if not line.startswith('#'):
+                key, value = line.rsplit(' ', 1)
+                metrics[key] = float(value)
+        return metrics
+
+
+# Properties used in tests
+
+@qc
+def sort_works(l=list_(int)):
+    assert sorted(l) == sorted(sorted(l))
+
+
+@qc
+def always_fails(x=int):
+    assert False
+
+
+@qc
+def slow_property(x=int):
+    time.sleep(0.002)
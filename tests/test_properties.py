@@ -1,6 +1,7 @@
 """
 Unit tests from properties.
 """
+import random
 import unittest
 from pyqcy import *
 
@@ -25,6 +26,202 @@ class Properties(unittest.TestCase):
         assert len(results) == multiplication_works.tests_count
         assert len(results) == CUSTOM_TESTS_COUNT
 
+    def test_threaded_property(self):
+        results = threaded_multiplication_works.check()
+        assert len(results) == threaded_multiplication_works.tests_count
+        assert all(r.succeeded for r in results)
+
+    def test_failing_threaded_property(self):
+        self.assertRaises(CheckError, failing_in_threads.test)
+
+    def test_failfast(self):
+        results = failing.check(failfast=True)
+        assert len(results) == 1
+        assert not results[0].succeeded
+
+    def test_tests_count_from_confidence(self):
+        assert confident_addition.tests_count == 299
+        assert len(confident_addition.check()) == 299
+
+    def test_confidence_with_tests_limit(self):
+        assert limited_confident_addition.tests_count == 50
+
+    def test_converged_tags_stop_checking_early(self):
+        results = converging_parity.check()
+        assert len(results) < converging_parity.tests_count
+        assert all(r.succeeded for r in results)
+        # values of full size have been tested nevertheless
+        assert max(r.data['x'] for r in results) > 500
+
+    def test_unique_inputs(self):
+        results = unique_digits.check()
+        digits = [r.data['x'] for r in results]
+        assert sorted(digits) == range(10)
+        assert results.exhausted
+        assert results.duplicates > 0
+
+    def test_unique_inputs_in_threads(self):
+        prop = unique_digits(y=0)
+        prop.threads = 4
+        results = prop.check()
+        assert sorted(r.data['x'] for r in results) == range(10)
+
+    def test_unique_inputs_beyond_exact_limit(self):
+        prop = unique_digits(y=0)
+        prop.seen_limit = 3
+        results = prop.check()
+        assert len(set(r.data['x'] for r in results)) == len(results)
+
+    def test_exhaustive_check(self):
+        results = small_domain.check(exhaustive=True)
+        assert results.exhaustive
+        assert len(results) == 2 * 3
+        inputs = set((r.data['flag'], r.data['x']) for r in results)
+        assert len(inputs) == 2 * 3
+
+    def test_exhaustive_check_of_range(self):
+        results = small_domain.check(2, start=3, exhaustive=True)
+        assert len(results) == 2
+        assert not results.exhaustive
+
+    def test_can_exhaust(self):
+        assert small_domain.can_exhaust()
+        assert not small_domain.can_exhaust(5)
+        assert not subtraction_doesnt_break.can_exhaust()
+        self.assertRaises(ValueError, multiplication_works.check,
+                          exhaustive=True)
+
+    def test_boundaries_come_first(self):
+        results = edge_cases_fail.check(failfast=True)
+        assert len(results) <= 3
+        assert not results[-1].succeeded
+
+    def test_boundary_cases_are_bounded(self):
+        results = many_boundaries.check(20)
+        firsts = [r.data for r in results[:10]]
+        assert firsts[0] == dict(a=0, b=0, c=0, d=0)
+        assert len(set(tuple(sorted(d.items())) for d in firsts)) == 10
+
+    def test_replay(self):
+        results = edge_cases_fail.check(200, seed=42)
+        failure = next(r for r in reversed(results) if not r.succeeded)
+        replayed = edge_cases_fail.replay(failure.replay_token)
+        assert not replayed.succeeded
+        assert replayed.data == failure.data
+
+    def test_replay_executes_single_case(self):
+        results = records_calls.check(500)
+        del CALLS[:]
+        replayed = records_calls.replay(results[-1].replay_token)
+        assert CALLS == [results[-1].data['l']]
+        assert replayed.data == results[-1].data
+
+    def test_cases_independent_of_split(self):
+        whole = records_calls.check(20, seed=7)
+        part = records_calls.check(10, seed=7, start=5, total=20)
+        assert [r.data for r in part] == [r.data for r in whole[5:15]]
+        assert whole.seed == part.seed == 7
+
+    def test_cases_independent_of_random_use(self):
+        whole = uses_random.check(50, seed=3)
+        part = uses_random.check(10, seed=3, start=33, total=50)
+        assert [r.data for r in part] == [r.data for r in whole[33:43]]
+        assert uses_random.replay(whole[27].replay_token).data == \
+            whole[27].data
+
+    def test_resources_generated_ahead_are_released(self):
+        from pyqcy.arbitraries.files import disk_usage
+        results = failing_with_files.check(100, failfast=True)
+        assert not results[-1].succeeded
+        assert disk_usage.current == 0
+
+    def test_replay_unique(self):
+        results = unique_digits.check()
+        for result in results:
+            assert unique_digits.replay(result.replay_token).data == \
+                result.data
+
+    def test_replay_exhaustive(self):
+        results = small_domain.check(exhaustive=True)
+        for result in results:
+            assert small_domain.replay(result.replay_token).data == \
+                result.data
+
+    def test_invalid_replay_token(self):
+        for token in ('', 'x.y.z', '1.2', '2a.64.64', 'e.1.2', 'e.6'):
+            self.assertRaises(ValueError, small_domain.replay, token)
+
+    def test_curried_plain_property(self):
+        del CALLS[:]
+        results = records_calls(l=[1]).check(5)
+        assert CALLS == [[1]] * 5
+        assert all(r.tags == frozenset() for r in results)
+
+    def test_property_group_shares_data(self):
+        del CALLS[:]
+        first, second = sorting.check(30)
+        assert len(first) == len(second) == 30
+        assert [r.data for r in first] == [r.data for r in second]
+        assert CALLS == [r.data['l'] for r in first]
+        assert first.seed == second.seed
+
+    def test_property_group_results_per_property(self):
+        keeps_length, finds_minimum = sorting.check()
+        assert all(r.succeeded for r in keeps_length)
+        failures = [r for r in finds_minimum if not r.succeeded]
+        assert failures
+        assert all(r.data['l'] == [] for r in failures)
+
+        replayed = sorting_finds_minimum.replay(failures[0].replay_token)
+        assert replayed.data == failures[0].data
+        assert not replayed.succeeded
+
+    def test_property_group_in_run_tests(self):
+        from pyqcy import runner
+        assert runner.run_tests([property_group(sorting_keeps_length)],
+                                verbosity=0)
+        assert not runner.run_tests([sorting], verbosity=0)
+
+    def test_invalid_property_group(self):
+        self.assertRaises(ValueError, property_group)
+        self.assertRaises(TypeError, property_group, sorting_keeps_length,
+                          lambda l=list_(of=int): 0)
+        self.assertRaises(ValueError, property_group, sorting_keeps_length,
+                          records_calls)
+
+    def test_prefetched_property(self):
+        del CALLS[:]
+        results = prefetched_calls.check(200)
+        assert len(results) == 200
+        assert CALLS == [r.data['l'] for r in results]
+        assert results.generation_blocked >= 0
+        assert results.execution_blocked >= 0
+        for result in results[::20]:
+            assert prefetched_calls.replay(result.replay_token).data == \
+                result.data
+
+    def test_prefetched_property_stops(self):
+        from pyqcy.arbitraries.files import disk_usage
+        results = prefetched_failing.check(1000, failfast=True)
+        assert len(results) < 1000
+        assert not results[-1].succeeded
+        assert disk_usage.peak > 0
+        assert disk_usage.current == 0
+
+    def test_prefetched_generation_error(self):
+        prop = qc(prefetch=2)(
+            lambda x=such_that(int_(min=0, max=10), lambda x: x > 10): 0)
+        self.assertRaises(GenerationError, prop.check)
+
+    def test_invalid_prefetch(self):
+        self.assertRaises(ValueError, qc(prefetch=0), lambda x=int: 0)
+        self.assertRaises(ValueError, qc(prefetch=2, threads=2),
+                          lambda x=int: 0)
+
+    def test_invalid_confidence(self):
+        self.assertRaises(ValueError, qc(confidence=1.5), lambda x=int: 0)
+        self.assertRaises(ValueError, qc(failure_rate=0), lambda x=int: 0)
+
 
 # Test properties
 
@@ -38,6 +235,11 @@ def failing(a=int, b=int):
     assert False
 
 
+@qc(threads=4)
+def failing_in_threads(a=int, b=int):
+    assert False
+
+
 @qc
 def adding_to(x=0, y=int_(min=0, max=10)):
     assert x + y >= x
@@ -46,3 +248,88 @@ def adding_to(x=0, y=int_(min=0, max=10)):
 @qc(tests=CUSTOM_TESTS_COUNT)
 def multiplication_works(x=int):
     assert x * 1 == x
+
+
+@qc(threads=8)
+def threaded_multiplication_works(x=int):
+    assert x * 1 == x
+
+
+@qc(confidence=0.95)
+def confident_addition(x=int, y=int):
+    assert x + y == y + x
+
+
+@qc(confidence=0.95, tests=50)
+def limited_confident_addition(x=int, y=int):
+    assert x + y == y + x
+
+
+@qc(confidence=0.9999, failure_rate=0.0001)
+def converging_parity(x=int_(min=0, max=1000)):
+    yield classify(x % 2 == 0, "even")
+
+
+@qc(unique=True)
+def unique_digits(x=int_(min=0, max=9), y=0):
+    assert 0 <= x <= 9
+
+
+@qc
+def small_domain(flag=elements(True, False), x=int_(min=0, max=2), y=1):
+    assert x + y > 0
+
+
+@qc
+def edge_cases_fail(x=int_(min=0, max=10 ** 9),
+                    l=list_(of=str, min_length=1, max_length=50)):
+    assert x < 10 ** 9 and len(l) < 50
+
+
+CALLS = []
+
+
+@qc
+def records_calls(l=list_(of=int)):
+    CALLS.append(l)
+
+
+@qc
+def uses_random(x=int_(min=0, max=10 ** 6)):
+    random.random()
+
+
+@qc
+def failing_with_files(x=int_(min=0, max=100), f=binary_file(max_size=64)):
+    assert x < 50
+
+
+@qc
+def many_boundaries(a=int_(min=-5, max=5), b=int_(min=-5, max=5),
+                    c=int_(min=-5, max=5), d=int_(min=-5, max=5)):
+    pass
+
+
+@qc
+def sorting_keeps_length(l=list_(of=int_(min=0), min_length=0)):
+    CALLS.append(l)
+    assert len(sorted(l)) == len(l)
+
+
+@qc
+def sorting_finds_minimum(l=list_(of=int_(min=0), min_length=0)):
+    assert sorted(l)[0] == min(l)
+
+
+sorting = property_group(sorting_keeps_length, sorting_finds_minimum)
+
+
+@qc(prefetch=4)
+def prefetched_calls(l=list_(of=int)):
+    CALLS.append(l)
+
+
+@qc(prefetch=2)
+def prefetched_failing(path=binary_file(min_size=1, max_size=64),
+                       x=int_(min=0, max=100)):
+    assert x < 90
@@ -0,0 +1,56 @@
+"""
+Unit tests for the py.test plugin.
+"""
+import os
+import unittest
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+
+PROPERTIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'pytest_properties.py')
+
+
+@unittest.skipIf(pytest is None, "py.test is not installed")
+class PytestPlugin(unittest.TestCase):
+    """Test cases for collecting and running properties with py.test."""
+
+    def test_property_per_item(self):
+        reports = self._run_pytest()
+        assert sorted(reports) == ['addition_commutes', 'always_fails',
+                                   'digits_are_small']
+        assert reports['addition_commutes'] == ('passed', 100)
+        assert reports['digits_are_small'] == ('passed', 10)
+        assert reports['always_fails'][0] == 'failed'
+
+    def test_split_into_case_ranges(self):
+        reports = self._run_pytest('--pyqcy-split', '30')
+        passed = [(name, tests) for name, (outcome, tests)
+                  in sorted(reports.items()) if outcome == 'passed']
+        assert passed == [('addition_commutes[0-29]', 30),
+                          ('addition_commutes[30-59]', 30),
+                          ('addition_commutes[60-89]', 30),
+                          ('addition_commutes[90-99]', 10),
+                          ('digits_are_small', 10)]
+        assert reports['always_fails'][0] == 'failed'
+
+    def _run_pytest(self, *args):
+        """Runs py.test on sample properties and returns a dictionary
+        mapping item names to their outcome and number of tests executed.
+        """
+        reports = {}
+
+        class Recorder(object):
+            def pytest_runtest_logreport(self, report):
+                if report.when == 'call':
+                    name = report.nodeid.split('::')[-1]
+                    tests = dict(report.user_properties).get('pyqcy_tests')
+                    reports[name] = (report.outcome, tests)
+
+        argv = ['-q', '-p', 'pyqcy.pytest_plugin', '-p', 'no:cacheprovider']
+        pytest.main(argv + list(args) + [PROPERTIES_FILE],
+                    plugins=[Recorder()])
+        return reports
@@ -0,0 +1,127 @@
+"""
+Unit tests for reporters of results in machine-readable formats.
+"""
+from StringIO import StringIO
+import json
+import unittest
+from xml.etree import ElementTree
+
+from pyqcy import *
+from pyqcy.reporters import JSONReporter, JUnitReporter
+from pyqcy import runner
+
+
+class Reporters(unittest.TestCase):
+    """Test cases for JSON and JUnit XML reporters."""
+
+    def test_json_records(self):
+        stream = StringIO()
+        reporter = JSONReporter(stream)
+        assert not runner.run_tests([tags_work, fails_on_negatives],
+                                    verbosity=0, reporters=[reporter])
+        reporter.close()
+
+        passed, failed = map(json.loads, stream.getvalue().splitlines())
+        assert passed['name'] == 'tags_work'
+        assert passed['module'] == __name__
+        assert passed['status'] == 'passed'
+        assert passed['tests'] == tags_work.tests_count
+        assert passed['failures'] == 0
+        assert isinstance(passed['seed'], int)
+        assert passed['duration'] >= 0
+        assert 'failure' not in passed
+
+        stats = dict((tuple(s['labels']), s['count'])
+                     for s in passed['statistics'])
+        assert set(stats) <= set([(u'small',), (u'large',)])
+        assert sum(stats.values()) == passed['tests']
+
+        assert failed['status'] == 'failed'
+        assert failed['failures'] > 0
+        assert failed['failure']['exception'] == 'AssertionError'
+        assert int(failed['failure']['data']['x']) < 0
+        assert 'Traceback' in failed['failure']['traceback']
+
+    def test_json_records_are_streamed(self):
+        stream = StringIO()
+        reporter = JSONReporter(stream)
+        runner.run_tests([tags_work], verbosity=0, reporters=[reporter])
+        assert len(stream.getvalue().splitlines()) == 1
+        runner.run_tests([tags_work], verbosity=0, reporters=[reporter])
+        assert len(stream.getvalue().splitlines()) == 2
+
+    def test_seed_reproduces_results(self):
+        stream = StringIO()
+        runner.run_tests([fails_on_negatives], verbosity=0,
+                         reporters=[JSONReporter(stream)])
+        record = json.loads(stream.getvalue())
+
+        results = fails_on_negatives.check(seed=record['seed'])
+        failure = next(r for r in results if not r.succeeded)
+        assert repr(failure.data['x']) == record['failure']['data']['x']
+
+        replayed = fails_on_negatives.replay(
+            record['failure']['replay_token'])
+        assert repr(replayed.data['x']) == record['failure']['data']['x']
+
+    def test_junit_xml(self):
+        stream = StringIO()
+        reporter = JUnitReporter(stream)
+        runner.run_tests([tags_work, fails_on_negatives], verbosity=0,
+                         reporters=[reporter])
+        reporter.skip(tags_work, "just because")
+        reporter.close()
+
+        suite = ElementTree.fromstring(stream.getvalue())
+        assert suite.tag == 'testsuite'
+        passed, failed, skipped = suite.findall('testcase')
+
+        assert passed.get('name') == 'tags_work'
+        assert passed.get('classname') == __name__
+        assert passed.find('failure') is None
+        properties = dict((p.get('name'), p.get('value'))
+                          for p in passed.find('properties'))
+        assert int(properties['tests']) == tags_work.tests_count
+        assert int(properties['seed']) >= 0
+        assert '%' in passed.find('system-out').text
+
+        failure = failed.find('failure')
+        assert failure.get('type') == 'AssertionError'
+        assert 'Failure encountered for data' in failure.text
+
+        assert skipped.find('skipped').get('message') == "just because"
+
+    def test_junit_xml_escaping(self):
+        stream = StringIO()
+        reporter = JUnitReporter(stream)
+        runner.run_tests([fails_on_markup], verbosity=0,
+                         reporters=[reporter])
+        reporter.close()
+
+        suite = ElementTree.fromstring(stream.getvalue())
+        failure = suite.find('testcase').find('failure')
+        assert '<&>' in failure.get('message')
+
+    def test_empty_junit_xml(self):
+        stream = StringIO()
+        JUnitReporter(stream).close()
+        suite = ElementTree.fromstring(stream.getvalue())
+        assert suite.findall('testcase') == []
+
+
+# Properties used in tests
+
+@qc
+def tags_work(x=int_(min=0, max=100)):
+    yield "small" if x < 50 else "large"
+    assert x >= 0
+
+
+@qc
+def fails_on_negatives(x=int):
+    assert x >= 0
+
+
+@qc
+def fails_on_markup(s=str_(max_length=4)):
+    assert False, "<&>\x01\n" + s
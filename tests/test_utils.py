@@ -0,0 +1,41 @@
+"""
+Unit tests for utility functions and classes.
+"""
+import unittest
+
+from pyqcy.utils import BloomFilter, SeenSet
+
+
+class Bloom(unittest.TestCase):
+    """Test cases for the Bloom filter."""
+
+    def test_added_items_are_found(self):
+        bloom = BloomFilter(1000)
+        items = [str(i) for i in xrange(1000)]
+        for item in items:
+            bloom.add(item)
+        assert all(item in bloom for item in items)
+
+    def test_false_positives_are_rare(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in xrange(1000):
+            bloom.add(str(i))
+        false_positives = sum(str(i) in bloom for i in xrange(1000, 11000))
+        assert false_positives < 300
+
+
+class Seen(unittest.TestCase):
+    """Test cases for the set of seen items."""
+
+    def test_exact(self):
+        seen = SeenSet(limit=10, capacity=10)
+        assert seen.add('a')
+        assert not seen.add('a')
+        assert seen.add('b')
+
+    def test_beyond_limit(self):
+        seen = SeenSet(limit=10, capacity=100)
+        for i in xrange(100):
+            assert seen.add(str(i))
+        assert seen.bloom is not None
+        assert not any(seen.add(str(i)) for i in xrange(100))